@@ -0,0 +1,91 @@
+import glob
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from recommender import SchemeRecommender
+
+
+def publish(rec: SchemeRecommender, path: str, keep: int = 3, float32: bool = False) -> str:
+	"""Save rec as a new version of the artifact at ``path`` and make ``path`` serve it.
+
+	The version is saved (atomically) as ``<stem>.<UTC timestamp>.joblib`` next to
+	``path``, then ``path`` is replaced in one rename by a hard link to it. A process
+	polling ``path`` sees the old file or the new one, never a partial one, and one that
+	has the old version memory-mapped keeps reading it undisturbed. Only the newest
+	``keep`` versions are kept (0 keeps all). Returns the version's path.
+	"""
+	stem, ext = os.path.splitext(path)
+	stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+	version_path = f"{stem}.{stamp}{ext}"
+	rec.save(version_path, float32=float32)
+	tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+	try:
+		os.link(version_path, tmp)
+	except OSError:
+		# No hard links on this filesystem: publish a copy instead
+		shutil.copy2(version_path, tmp)
+	os.replace(tmp, path)
+	# The model now lives at path; deltas saved from it should be against path
+	rec.base_path = path
+	if keep > 0:
+		for old in versions(path)[:-keep]:
+			os.remove(old)
+	return version_path
+
+
+def versions(path: str) -> List[str]:
+	"""Published versions of the artifact at ``path``, oldest first."""
+	stem, ext = os.path.splitext(path)
+	found = glob.glob(f"{glob.escape(stem)}.*{ext}")
+	# <stem>.<timestamp><ext> only (not deltas or other artifacts sharing the stem)
+	stamps = [p for p in found if _is_stamp(p[len(stem) + 1:len(p) - len(ext)])]
+	return sorted(stamps)
+
+
+def _is_stamp(text: str) -> bool:
+	try:
+		datetime.strptime(text, "%Y%m%dT%H%M%S%fZ")
+	except ValueError:
+		return False
+	return True
+
+
+def signature(path: str) -> Optional[Tuple[int, int, int]]:
+	"""(inode, size, mtime in ns) of the file at path, or None if it does not exist."""
+	try:
+		st = os.stat(path)
+	except OSError:
+		return None
+	return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class ArtifactWatcher:
+	"""Notices when the artifact at a path has been replaced or rewritten.
+
+	poll() is cheap (one stat). It reports a change only once the file's signature has
+	stayed the same for two polls in a row, so a writer that rewrites the file in place
+	(rather than publishing it) is not read half way. After handling a change, call
+	seen() so the same file is not reported again.
+	"""
+
+	def __init__(self, path: str):
+		self.path = path
+		self._seen = signature(path)
+		self._pending: Optional[Tuple[int, int, int]] = None
+
+	def poll(self) -> bool:
+		current = signature(self.path)
+		if current is None or current == self._seen:
+			self._pending = None
+			return False
+		if current != self._pending:
+			self._pending = current
+			return False
+		return True
+
+	def seen(self, current: Optional[Tuple[int, int, int]] = None) -> None:
+		self._seen = current if current is not None else signature(self.path)
+		self._pending = None
@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# score_batch(profiles, top_k, timings, hard_filter, lean) -> one result per profile, in order
+BatchScorer = Callable[[List[Dict[str, Any]], int, bool, bool, bool], List[Any]]
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    """Coalesces concurrent recommendation requests into batched scoring passes.
+
+    Requests wait on an asyncio queue owned by a background event loop. A batch is flushed
+    once ``max_batch_size`` requests are waiting or ``max_wait_ms`` after its first request
+    arrived, whichever comes first, and scored by one ``score_batch`` call per distinct
+    set of options (top_k, timings, hard_filter, lean) in it on a single scoring thread. While a batch is being scored the
+    next one keeps filling, so batches grow with load instead of the queue backing up.
+    Submitting to a full queue (``max_queue`` waiting requests) raises QueueFull. If a
+    batch fails, its profiles are scored one at a time and only the failing ones error.
+    """
+
+    def __init__(
+        self,
+        score_batch: BatchScorer,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 1024,
+        metrics_window: int = 10000,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue = max_queue
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+        self.flushed_full = 0
+        self.flushed_timeout = 0
+        # Batches whose scoring failed and were retried one profile at a time
+        self.split_batches = 0
+        # Recent per-request queueing delays (ms) and batch sizes for the percentiles in stats()
+        self._delays_ms: deque = deque(maxlen=metrics_window)
+        self._sizes: deque = deque(maxlen=metrics_window)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-batch")
+        self._started = threading.Event()
+
+    def start(self) -> "MicroBatcher":
+        """Run the batching loop on its own daemon thread (for callers that are not async)."""
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run_loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._attach(loop)
+        self._started.set()
+        try:
+            loop.run_until_complete(self._collect())
+        finally:
+            loop.close()
+
+    def _attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+
+    async def run(self) -> None:
+        """Run the batching loop on the current event loop until cancelled."""
+        self._attach(asyncio.get_running_loop())
+        self._started.set()
+        await self._collect()
+
+    def stop(self) -> None:
+        """Finish the batches already queued, then stop the loop thread."""
+        if self._loop is not None and self._thread is not None:
+            asyncio.run_coroutine_threadsafe(self._enqueue_stop(), self._loop).result()
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
+
+    async def _enqueue_stop(self) -> None:
+        await self._queue.put(None)
+
+    async def submit(self, profile: Dict[str, Any], top_k: int = 10, timings: bool = False, hard_filter: bool = False, lean: bool = False) -> Any:
+        """Queue one profile from a coroutine on the batcher's loop and await its result."""
+        future = self._loop.create_future()
+        self._put((profile, (top_k, timings, hard_filter, lean), future, time.perf_counter()))
+        return await future
+
+    def submit_threadsafe(self, profile: Dict[str, Any], top_k: int = 10, timings: bool = False, hard_filter: bool = False, lean: bool = False) -> Future:
+        """Queue one profile from any thread; returns a concurrent.futures.Future."""
+        if self._loop is None:
+            raise RuntimeError("MicroBatcher is not running; call start() first")
+        result: Future = Future()
+        entry = (profile, (top_k, timings, hard_filter, lean), result, time.perf_counter())
+        # Enqueue on the loop thread; a full queue fails the future instead of blocking
+        self._loop.call_soon_threadsafe(self._put_or_fail, entry)
+        return result
+
+    def _put_or_fail(self, entry) -> None:
+        try:
+            self._put(entry)
+        except QueueFull as e:
+            entry[2].set_exception(e)
+
+    def _put(self, entry) -> None:
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull(f"more than {self.max_queue} requests waiting to be scored") from None
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = False
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    entry = self._queue.get_nowait()
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._flush(batch, loop)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[tuple], loop: asyncio.AbstractEventLoop) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            if len(batch) >= self.max_batch_size:
+                self.flushed_full += 1
+            else:
+                self.flushed_timeout += 1
+            self._sizes.append(len(batch))
+            self._delays_ms.extend((started - entry[3]) * 1000 for entry in batch)
+
+        # Entries are (profile, (top_k, timings, hard_filter, lean), future, enqueued_at)
+        groups: Dict[Tuple[int, bool, bool, bool], List[tuple]] = {}
+        for entry in batch:
+            groups.setdefault(entry[1], []).append(entry)
+        for options, entries in groups.items():
+            profiles = [entry[0] for entry in entries]
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_batch, profiles, *options)
+                outcome = [(True, r) for r in results]
+            except Exception as e:
+                if len(entries) == 1:
+                    outcome = [(False, e)]
+                else:
+                    # One bad profile must not fail the requests batched with it: score
+                    # each on its own so only the ones that fail again get the error
+                    with self._lock:
+                        self.split_batches += 1
+                    outcome = [await self._score_one(loop, profile, options) for profile in profiles]
+            for entry, (ok, value) in zip(entries, outcome):
+                _resolve(entry[2], ok, value)
+
+    async def _score_one(self, loop: asyncio.AbstractEventLoop, profile: Dict[str, Any], options: tuple) -> Tuple[bool, Any]:
+        try:
+            return True, (await loop.run_in_executor(self._executor, self.score_batch, [profile], *options))[0]
+        except Exception as e:
+            return False, e
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            delays = np.array(self._delays_ms) if self._delays_ms else np.zeros(1)
+            sizes = np.array(self._sizes) if self._sizes else np.zeros(1)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "batches": self.batches,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "flushed_full": self.flushed_full,
+                "flushed_timeout": self.flushed_timeout,
+                "split_batches": self.split_batches,
+                "mean_batch_size": round(float(sizes.mean()), 2),
+                "fill_rate": round(float(sizes.mean()) / self.max_batch_size, 4),
+                "queue_delay_ms": {
+                    "p50": round(float(np.percentile(delays, 50)), 3),
+                    "p95": round(float(np.percentile(delays, 95)), 3),
+                    "max": round(float(delays.max()), 3),
+                },
+            }
+
+
+def _resolve(future, ok: bool, value: Any) -> None:
+    # asyncio futures belong to submit() callers on the loop; concurrent ones to other threads
+    if future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
@@ -0,0 +1,99 @@
+"""Artifact size, load time and resident memory of a saved model before and after conversion.
+
+Run from the repository root:  python -m benchmarks.bench_artifact --model artifacts/scheme_recommender.joblib \\
+    --profiles_file benchmarks/data/profiles_1000.jsonl --float32
+
+The model is converted to the current compact format (and with --float32 also to the
+float32 variant) in a temporary directory. Each artifact is then measured in a fresh
+process: load time (median of --repeat loads, memory-mapped as served), RSS after the
+load, after lean requests (which never rebuild the catalogue frame) and after full
+requests. With --float32, also how far its rankings and scores drift from the original.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import inference
+from recommender import convert_artifact
+
+
+def _rss_mb() -> float:
+	# Current (not peak) resident set size, Linux only
+	with open("/proc/self/status", encoding="ascii") as f:
+		for line in f:
+			if line.startswith("VmRSS:"):
+				return round(int(line.split()[1]) / 1024, 1)
+	return float("nan")
+
+
+def _measure(path: str, profiles_file: str, requests: int, repeat: int) -> dict:
+	times = []
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		model = inference.load_model(path)
+		times.append(time.perf_counter() - t0)
+	out = {"artifact_mb": round(os.path.getsize(path) / 1e6, 2), "load_ms": round(statistics.median(times) * 1000, 1)}
+	out["rss_after_load_mb"] = _rss_mb()
+	profiles = inference.read_profiles_jsonl(profiles_file)[:requests]
+	for profile in profiles:
+		inference.recommend(model, profile, lean=True)
+	out["rss_after_lean_mb"] = _rss_mb()
+	for profile in profiles:
+		inference.recommend(model, profile)
+	out["rss_after_full_mb"] = _rss_mb()
+	return out
+
+
+def _drift(original: str, converted: str, profiles_file: str, requests: int) -> dict:
+	a, b = inference.load_model(original), inference.load_model(converted)
+	profiles = inference.read_profiles_jsonl(profiles_file)[:requests]
+	same, diff = 0, 0.0
+	for profile in profiles:
+		x, y = inference.recommend(a, profile, lean=True), inference.recommend(b, profile, lean=True)
+		same += [r["slug"] for r in x] == [r["slug"] for r in y]
+		diff = max([diff] + [abs(r["score_hybrid"] - s["score_hybrid"]) for r, s in zip(x, y)])
+	return {"identical_rankings": f"{same}/{len(profiles)}", "max_hybrid_score_diff": diff}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles_file", required=True)
+	parser.add_argument("--requests", type=int, default=50)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--float32", action="store_true", help="Also measure the float32 variant")
+	parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+	if args.measure:
+		print(json.dumps(_measure(args.measure, args.profiles_file, args.requests, args.repeat)))
+		return
+
+	report = {}
+	with tempfile.TemporaryDirectory() as tmp:
+		artifacts = {"original": args.model, "compact": os.path.join(tmp, "compact.joblib")}
+		convert_artifact(args.model, artifacts["compact"])
+		if args.float32:
+			artifacts["compact_float32"] = os.path.join(tmp, "compact_float32.joblib")
+			convert_artifact(args.model, artifacts["compact_float32"], float32=True)
+		for name, path in artifacts.items():
+			cmd = [
+				sys.executable, "-m", "benchmarks.bench_artifact", "--measure", path, "--profiles_file", args.profiles_file,
+				"--requests", str(args.requests), "--repeat", str(args.repeat),
+			]
+			report[name] = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+			print(json.dumps({"artifact": name, **report[name]}), flush=True)
+		for name in ("compact", "compact_float32"):
+			if name in artifacts:
+				report[name]["drift"] = _drift(args.model, artifacts[name], args.profiles_file, args.requests)
+				print(json.dumps({"artifact": name, **report[name]["drift"]}), flush=True)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,59 @@
+"""Per-request recommend() latency as the catalogue grows.
+
+Run from the repository root:  python -m benchmarks.bench_catalogue_scaling --rows 1000 10000 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import DEFAULT_CANDIDATE_BUDGET, SchemeRecommender, UserProfile
+
+
+def _time_recommend(rec: SchemeRecommender, profiles, top_k: int, candidate_budget) -> dict:
+	latencies, scored, exact = [], [], []
+	for profile in profiles:
+		t0 = time.perf_counter()
+		out = rec.recommend(profile, top_k=top_k, candidate_budget=candidate_budget)
+		latencies.append(time.perf_counter() - t0)
+		scored.append(out.attrs["candidates_scored"])
+		exact.append(out.attrs["exact"])
+	lat_ms = np.array(latencies) * 1000
+	return {
+		"p50_ms": round(float(np.percentile(lat_ms, 50)), 2),
+		"p95_ms": round(float(np.percentile(lat_ms, 95)), 2),
+		"mean_candidates_scored": round(float(np.mean(scored)), 1),
+		"exact_fraction": round(float(np.mean(exact)), 3),
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+	parser.add_argument("--profiles", type=int, default=30)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--candidate_budget", type=int, default=DEFAULT_CANDIDATE_BUDGET)
+	parser.add_argument("--exhaustive_max_rows", type=int, default=5000, help="Also time full scoring up to this size")
+	args = parser.parse_args()
+
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=1)]
+	results = []
+	for rows in args.rows:
+		t0 = time.perf_counter()
+		rec = SchemeRecommender().fit(make_catalogue(rows))
+		entry = {
+			"rows": rows,
+			"fit_s": round(time.perf_counter() - t0, 2),
+			"pruned": _time_recommend(rec, profiles, args.top_k, args.candidate_budget),
+		}
+		if rows <= args.exhaustive_max_rows:
+			entry["exhaustive"] = _time_recommend(rec, profiles, args.top_k, None)
+		results.append(entry)
+		print(json.dumps(entry), flush=True)
+	print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,75 @@
+"""Payload size and serialisation time of full vs lean recommendation responses.
+
+Run from the repository root:  python -m benchmarks.bench_lean --model artifacts/scheme_recommender.joblib \\
+    --profiles_file benchmarks/data/profiles_1000.jsonl
+
+For each profile the ranking is computed once; then the full response (every record
+field) and the lean one (slugs, names, scores) are each built and JSON-encoded the way
+the serve protocol does it. Also times get_schemes() fetching the detail fields of a lean
+result's slugs, the lookup a client makes for the schemes it actually shows.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+import inference
+from scheme_store import RECORD_FIELDS
+
+
+def _p(values, q):
+	return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles_file", required=True)
+	parser.add_argument("--requests", type=int, default=200)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	model = inference.load_model(args.model)
+	source = inference.read_profiles_jsonl(args.profiles_file)
+	profiles = [source[i % len(source)] for i in range(args.requests)]
+	report = {"requests": args.requests, "top_k": args.top_k}
+	for mode, lean in (("full", False), ("lean", True)):
+		rank_s, encode_s, sizes = [], [], []
+		for profile in profiles:
+			t0 = time.perf_counter()
+			df = model.recommend(inference.to_user_profile(profile), top_k=args.top_k, lean=lean)
+			t1 = time.perf_counter()
+			line = json.dumps({"id": 1, "ok": True, "result": inference.to_records(df, lean)}, ensure_ascii=False, default=str)
+			t2 = time.perf_counter()
+			rank_s.append(t1 - t0)
+			encode_s.append(t2 - t1)
+			sizes.append(len(line.encode("utf-8")))
+		report[mode] = {
+			"recommend_p50_ms": _p(rank_s, 50),
+			"recommend_p99_ms": _p(rank_s, 99),
+			"records_json_p50_ms": _p(encode_s, 50),
+			"records_json_p99_ms": _p(encode_s, 99),
+			"payload_bytes_mean": round(float(np.mean(sizes)), 1),
+		}
+		print(json.dumps({"mode": mode, **report[mode]}), flush=True)
+
+	details = [f for f in RECORD_FIELDS if f not in ("slug", "scheme_name")]
+	lookup_s = []
+	for profile in profiles:
+		slugs = [r["slug"] for r in inference.recommend(model, profile, top_k=args.top_k, lean=True)]
+		t0 = time.perf_counter()
+		model.get_schemes(slugs, details)
+		lookup_s.append(time.perf_counter() - t0)
+	report["get_schemes_p50_ms"] = _p(lookup_s, 50)
+	report["store_mb"] = round(model.scheme_store.nbytes / 1e6, 2)
+	print(json.dumps({"get_schemes_p50_ms": report["get_schemes_p50_ms"], "store_mb": report["store_mb"]}))
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,66 @@
+"""Compare SchemeRecommender.load() with and without the persisted TF-IDF matrix.
+
+Run from the repository root:  python -m benchmarks.bench_load --rows 10000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import joblib
+
+from benchmarks.synthetic import make_catalogue
+from recommender import SchemeRecommender
+
+
+def _save_legacy(rec: SchemeRecommender, path: str) -> None:
+	# Artifact layout from before the matrix was persisted; load() has to re-vectorize
+	joblib.dump({
+		"vectorizer": rec.vectorizer,
+		"columns": rec.text_columns,
+		"scheme_df": rec.scheme_df,
+		"tfidf_shape": rec.tfidf_matrix.shape,
+		"popularity_col": rec.popularity_col,
+	}, path)
+
+
+def _time_load(path: str, repeat: int, mmap_mode) -> dict:
+	times = []
+	for _ in range(repeat):
+		t0 = time.perf_counter()
+		SchemeRecommender.load(path, mmap_mode=mmap_mode)
+		times.append(time.perf_counter() - t0)
+	return {
+		"median_s": round(statistics.median(times), 4),
+		"min_s": round(min(times), 4),
+		"artifact_bytes": os.path.getsize(path),
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+	parser.add_argument("--repeat", type=int, default=3)
+	args = parser.parse_args()
+
+	results = []
+	with tempfile.TemporaryDirectory() as tmp:
+		for rows in args.rows:
+			rec = SchemeRecommender().fit(make_catalogue(rows))
+			legacy_path = os.path.join(tmp, f"legacy_{rows}.joblib")
+			new_path = os.path.join(tmp, f"mmap_{rows}.joblib")
+			_save_legacy(rec, legacy_path)
+			rec.save(new_path)
+			results.append({
+				"rows": rows,
+				"legacy_rebuild": _time_load(legacy_path, args.repeat, mmap_mode=None),
+				"persisted_matrix": _time_load(new_path, args.repeat, mmap_mode=None),
+				"persisted_matrix_mmap": _time_load(new_path, args.repeat, mmap_mode="r"),
+			})
+	print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+	main()
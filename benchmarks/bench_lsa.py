@@ -0,0 +1,95 @@
+"""Compare the LSA content scorer with the sparse TF-IDF scorer: recall@k and scoring time.
+
+Run from the repository root:  python -m benchmarks.bench_lsa --rows 10000 --dims 64 128 256
+Optionally pass --data path/to/catalogue.csv to measure a real catalogue.
+
+The TF-IDF model is fitted once; for each dimensionality an SVD is fitted on its matrix
+and swapped in as the content scorer. recall@k is the fraction of the sparse scorer's
+top k that the LSA scorer also returns, both for the content scores alone and for the
+final recommend() ranking (where eligibility and popularity dilute the difference).
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import SchemeRecommender, UserProfile, load_dataset
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[set]:
+	order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+	return [set(row) for row in order]
+
+
+def _recall(expected: List[set], got: List[set]) -> Dict[str, float]:
+	recall = [len(e & g) / len(e) for e, g in zip(expected, got) if e]
+	return {"mean": round(float(np.mean(recall)), 4), "min": round(float(np.min(recall)), 4)}
+
+
+def _score(rec: SchemeRecommender, profiles: List[UserProfile], k: int) -> Dict[str, Any]:
+	t0 = time.perf_counter()
+	content = rec._content_scores(profiles)
+	content_s = time.perf_counter() - t0
+	frames = rec.recommend_batch(profiles, top_k=k)
+	return {
+		"content_top": _top_k(content, k),
+		"final_top": [set(frame["slug"]) for frame in frames],
+		"content_ms_per_query": round(content_s * 1000 / len(profiles), 3),
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--data", default=None, help="Optional CSV to measure instead of a synthetic catalogue")
+	parser.add_argument("--rows", type=int, default=10000)
+	parser.add_argument("--profiles", type=int, default=200)
+	parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	df = load_dataset(args.data) if args.data else make_catalogue(args.rows, seed=args.seed)
+	rec = SchemeRecommender().fit(df)
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=args.seed)]
+	baseline = _score(rec, profiles, args.top_k)
+	report = {
+		"rows": len(rec.scheme_df),
+		"vocabulary": len(rec.vectorizer.vocabulary_),
+		"top_k": args.top_k,
+		"tfidf": {"content_ms_per_query": baseline["content_ms_per_query"]},
+		"lsa": [],
+	}
+	print(json.dumps(report["tfidf"]), flush=True)
+
+	for dims in args.dims:
+		t0 = time.perf_counter()
+		rec.lsa_components = dims
+		rec.lsa_term_vectors = rec._fit_lsa(rec.tfidf_matrix, dims)
+		rec.lsa_embeddings = rec._lsa_project(rec.tfidf_matrix)
+		fit_s = time.perf_counter() - t0
+		rec.content_scorer = "lsa"
+		result = _score(rec, profiles, args.top_k)
+		rec.content_scorer = "tfidf"
+		entry = {
+			"dims": rec.lsa_term_vectors.shape[1],
+			"svd_fit_s": round(fit_s, 3),
+			"embeddings_mb": round((rec.lsa_embeddings.nbytes + rec.lsa_term_vectors.nbytes) / 1e6, 2),
+			"content_ms_per_query": result["content_ms_per_query"],
+			"content_recall": _recall(baseline["content_top"], result["content_top"]),
+			"final_recall": _recall(baseline["final_top"], result["final_top"]),
+		}
+		report["lsa"].append(entry)
+		print(json.dumps(entry), flush=True)
+
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
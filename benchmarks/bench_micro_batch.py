@@ -0,0 +1,91 @@
+"""Throughput of the micro-batching coalescer as the maximum batch size grows.
+
+Run from the repository root:  python -m benchmarks.bench_micro_batch --model artifacts/scheme_recommender.joblib \\
+    --profiles_file benchmarks/data/profiles_1000.jsonl --batch_sizes 1 8 32 64
+
+--clients threads each send their share of the profiles one request at a time through a
+RecommendationService with batching enabled, the way concurrent API calls reach the
+persistent inference process. Reports requests/sec, latency percentiles, batch fill rate
+and queueing delay per batch size.
+"""
+import argparse
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+import inference
+import serving
+
+
+def run(service: serving.RecommendationService, profiles: List[Dict[str, Any]], clients: int, top_k: int) -> Dict[str, Any]:
+	latencies: List[float] = []
+	lock = threading.Lock()
+
+	def client(share: List[Dict[str, Any]]) -> None:
+		mine = []
+		for profile in share:
+			t0 = time.perf_counter()
+			service.recommend(profile, top_k=top_k)
+			mine.append(time.perf_counter() - t0)
+		with lock:
+			latencies.extend(mine)
+
+	threads = [threading.Thread(target=client, args=(profiles[i::clients],)) for i in range(clients)]
+	t0 = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	wall = time.perf_counter() - t0
+	ms = np.array(latencies) * 1000
+	return {
+		"requests_per_sec": round(len(latencies) / wall, 1),
+		"p50_ms": round(float(np.percentile(ms, 50)), 2),
+		"p95_ms": round(float(np.percentile(ms, 95)), 2),
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles_file", required=True, help="JSONL profiles, reused round-robin")
+	parser.add_argument("--requests", type=int, default=2000)
+	parser.add_argument("--clients", type=int, default=64, help="Concurrent requesting threads")
+	parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+	parser.add_argument("--max_wait_ms", type=float, default=5.0)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	source = inference.read_profiles_jsonl(args.profiles_file)
+	# Vary the age so repeated profiles are distinct requests rather than copies of a few
+	profiles = [dict(source[i % len(source)], age=18 + i % 60) for i in range(args.requests)]
+	report = {"requests": args.requests, "clients": args.clients, "max_wait_ms": args.max_wait_ms, "runs": []}
+	for batch_size in args.batch_sizes:
+		service = serving.RecommendationService(args.model, batching={
+			"max_batch_size": batch_size, "max_wait_ms": args.max_wait_ms, "max_queue": args.requests,
+		})
+		service.load()
+		service.recommend(profiles[0], top_k=args.top_k)
+		entry = {"max_batch_size": batch_size, **run(service, profiles, args.clients, args.top_k)}
+		stats = service.batcher.stats()
+		entry.update({
+			"mean_batch_size": stats["mean_batch_size"],
+			"fill_rate": stats["fill_rate"],
+			"queue_delay_ms": stats["queue_delay_ms"],
+		})
+		service.close()
+		report["runs"].append(entry)
+		print(json.dumps(entry), flush=True)
+
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,87 @@
+"""Cost of "show more": cursor pages sliced from a kept ranking vs re-ranking with a larger top_k.
+
+Run from the repository root:  python -m benchmarks.bench_pagination --model artifacts/scheme_recommender.joblib \\
+    --profiles_file benchmarks/data/profiles_1000.jsonl --pages 5
+
+For each profile, --pages pages of --top_k results are fetched both ways. Re-ranking
+calls recommend() with top_k = page x top_k and keeps the last page_size rows, as the
+client did before cursors. Paginating ranks once (--depth deep) and reads every later
+page through its cursor. Reports the first and later page latencies of each, how many
+re-ranked pages repeat or skip schemes an earlier page showed, and the ranking cache's
+size and eviction counters.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+import inference
+from ranking_cache import RankingCache
+
+
+def _p(values, q):
+	return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles_file", required=True)
+	parser.add_argument("--requests", type=int, default=50)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--pages", type=int, default=5)
+	parser.add_argument("--depth", type=int, default=200)
+	parser.add_argument("--cache_mb", type=float, default=64.0)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	model = inference.load_model(args.model)
+	model.ranking_cache = RankingCache(max_bytes=int(args.cache_mb * (1 << 20)), depth=args.depth)
+	source = inference.read_profiles_jsonl(args.profiles_file)
+	profiles = [inference.to_user_profile(source[i % len(source)]) for i in range(args.requests)]
+	k = args.top_k
+	report = {"requests": args.requests, "top_k": k, "pages": args.pages, "depth": args.depth}
+
+	first, later, unstable = [], [], 0
+	for profile in profiles:
+		shown = []
+		for page in range(args.pages):
+			t0 = time.perf_counter()
+			df = model.recommend(profile, top_k=(page + 1) * k, lean=True, hard_filter=True)
+			(later if page else first).append(time.perf_counter() - t0)
+			slugs = list(df["slug"])
+			# Pages are consistent only if every earlier page is still the prefix
+			unstable += slugs[:page * k] != shown
+			shown += slugs[page * k:]
+	report["rerank"] = {
+		"first_page_p50_ms": _p(first, 50), "later_page_p50_ms": _p(later, 50), "later_page_p99_ms": _p(later, 99),
+		"pages_reshuffled": unstable,
+	}
+	print(json.dumps({"mode": "rerank", **report["rerank"]}), flush=True)
+
+	first, later = [], []
+	for profile in profiles:
+		t0 = time.perf_counter()
+		df = model.recommend(profile, top_k=k, lean=True, hard_filter=True, paginate=True)
+		first.append(time.perf_counter() - t0)
+		cursor = df.attrs["next_cursor"]
+		for _ in range(args.pages - 1):
+			if cursor is None:
+				break
+			t0 = time.perf_counter()
+			cursor = model.recommend_page(cursor, top_k=k, lean=True).attrs["next_cursor"]
+			later.append(time.perf_counter() - t0)
+	report["cursor"] = {
+		"first_page_p50_ms": _p(first, 50), "later_page_p50_ms": _p(later, 50), "later_page_p99_ms": _p(later, 99),
+		"cache": model.ranking_cache.stats(),
+	}
+	print(json.dumps({"mode": "cursor", **report["cursor"]}), flush=True)
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
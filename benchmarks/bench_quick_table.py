@@ -0,0 +1,80 @@
+"""Build a quick-recommendation table and compare lookups with live ranking.
+
+Run from the repository root:  python -m benchmarks.bench_quick_table --model artifacts/scheme_recommender.joblib
+
+Reports the build time and table size, per-request latency of recommend_quick() against
+recommend(), and agreement between the two for random quick profiles: how often the
+top-k is identical and the mean top-k overlap. Profiles at a bucket's representative
+age match exactly; other ages can differ where scheme text mentions the age itself.
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from quick_table import AGE_BUCKETS, CASTE_GROUPS, GENDERS, OCCUPATIONS, QUICK_INCOME, QUICK_INTERESTS
+from recommender import SchemeRecommender, UserProfile
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--depth", type=int, default=50)
+	parser.add_argument("--states", nargs="*", default=None, help="Limit the table to these states (default: all)")
+	parser.add_argument("--samples", type=int, default=200, help="Random quick profiles to compare")
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	rec = SchemeRecommender.load(args.model)
+	axes = {"states": args.states} if args.states else {}
+	t0 = time.perf_counter()
+	table = rec.build_quick_table(depth=args.depth, **axes)
+	build_s = time.perf_counter() - t0
+
+	rng = random.Random(args.seed)
+	quick_s, live_s, identical, overlap = [], [], 0, []
+	for _ in range(args.samples):
+		_, low, high, _ = rng.choice(AGE_BUCKETS)
+		profile = UserProfile(
+			age=rng.randint(max(low, 10), min(high, 90)),
+			state=rng.choice(table.states).title(),
+			gender=rng.choice(GENDERS),
+			caste_group=rng.choice(CASTE_GROUPS),
+			occupation=rng.choice(OCCUPATIONS),
+			income=QUICK_INCOME,
+			interests=list(QUICK_INTERESTS),
+		)
+		t0 = time.perf_counter()
+		quick = rec.recommend_quick(profile, top_k=args.top_k)
+		t1 = time.perf_counter()
+		live = rec.recommend(profile, top_k=args.top_k)
+		t2 = time.perf_counter()
+		quick_s.append(t1 - t0)
+		live_s.append(t2 - t1)
+		identical += quick["slug"].tolist() == live["slug"].tolist()
+		overlap.append(len(set(quick["slug"]) & set(live["slug"])) / max(len(live), 1))
+
+	report = {
+		"rows": len(rec.scheme_df),
+		"profiles": len(table.rows),
+		"depth": table.depth,
+		"build_s": round(build_s, 2),
+		"table_mb": round(table.nbytes / 1e6, 2),
+		"quick_p50_ms": round(float(np.percentile(quick_s, 50)) * 1000, 3),
+		"live_p50_ms": round(float(np.percentile(live_s, 50)) * 1000, 3),
+		"identical_top_k": round(identical / args.samples, 4),
+		"mean_top_k_overlap": round(float(np.mean(overlap)), 4),
+	}
+	print(json.dumps(report))
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,102 @@
+"""Building the related-schemes table: time and memory against catalogue size, block size and workers.
+
+Run from the repository root:  python -m benchmarks.bench_related --rows 10000 30000 --block_mb 16 64 --workers 1 4
+
+For each synthetic catalogue, build_related() is timed at every --block_mb x --workers
+combination. Peak working memory is the tracemalloc high-water mark of the build when it
+runs in this process (workers 1), otherwise the largest worker's max RSS (interpreter and
+matrix included). Every build is checked against the first one, and a sample of rows
+against a direct single-row computation (neighbours_of); similar() is then timed reading
+the table and without it.
+"""
+import argparse
+import json
+import resource
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalogue
+from recommender import SchemeRecommender
+from related import build_related, neighbours_of
+
+
+def _build(rec: SchemeRecommender, depth: int, workers: int, block_mb: float) -> dict:
+	if workers <= 1:
+		tracemalloc.start()
+	t0 = time.perf_counter()
+	table = build_related(rec.tfidf_matrix, depth, workers, block_mb, rec.removed)
+	seconds = time.perf_counter() - t0
+	if workers <= 1:
+		peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+		tracemalloc.stop()
+	else:
+		# ru_maxrss is in KB on Linux; the largest finished child so far
+		peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1e3
+	return {"table": table, "build_s": round(seconds, 2), "peak_mb": round(peak_mb, 1)}
+
+
+def _exact_fraction(rec: SchemeRecommender, table, sample: int, depth: int) -> float:
+	rows = np.random.default_rng(0).choice(len(rec.scheme_df), size=min(sample, len(rec.scheme_df)), replace=False)
+	same = 0
+	for row in rows:
+		expected, _ = neighbours_of(rec.tfidf_matrix, int(row), depth, rec.removed)
+		got, _ = table.neighbours(int(row), depth)
+		same += np.array_equal(expected, got)
+	return same / len(rows)
+
+
+def _lookup_ms(rec: SchemeRecommender, k: int, requests: int) -> float:
+	slugs = rec.scheme_df["slug"].iloc[:requests].tolist()
+	t0 = time.perf_counter()
+	for slug in slugs:
+		rec.similar(slug, k=k, lean=True)
+	return round((time.perf_counter() - t0) / len(slugs) * 1000, 3)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+	parser.add_argument("--depth", type=int, default=20)
+	parser.add_argument("--block_mb", type=float, nargs="+", default=[16.0, 64.0])
+	parser.add_argument("--workers", type=int, nargs="+", default=[1])
+	parser.add_argument("--sample", type=int, default=100, help="Rows checked against a direct computation")
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--requests", type=int, default=100)
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	results = []
+	for rows in args.rows:
+		rec = SchemeRecommender().fit(make_catalogue(rows))
+		entry = {"rows": rows, "nnz": int(rec.tfidf_matrix.nnz), "depth": args.depth, "builds": []}
+		reference = None
+		for block_mb in args.block_mb:
+			for workers in args.workers:
+				build = _build(rec, args.depth, workers, block_mb)
+				table = build.pop("table")
+				if reference is None:
+					reference = table
+				build.update({
+					"block_mb": block_mb, "workers": workers,
+					"same_as_first": bool(np.array_equal(table.rows, reference.rows)),
+				})
+				entry["builds"].append(build)
+				print(json.dumps({"rows": rows, **build}), flush=True)
+		entry["table_mb"] = round(reference.nbytes / 1e6, 2)
+		entry["exact_fraction"] = _exact_fraction(rec, reference, args.sample, args.depth)
+		rec.related = None
+		entry["live_lookup_ms"] = _lookup_ms(rec, args.top_k, min(args.requests, 20))
+		rec.related = reference
+		entry["table_lookup_ms"] = _lookup_ms(rec, args.top_k, args.requests)
+		results.append(entry)
+		print(json.dumps({k: v for k, v in entry.items() if k != "builds"}), flush=True)
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(results, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
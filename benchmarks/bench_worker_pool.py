@@ -0,0 +1,120 @@
+"""Per-worker memory and throughput of the pre-fork worker pool as workers scale.
+
+Run from the repository root:  python -m benchmarks.bench_worker_pool --model artifacts/scheme_recommender.joblib \\
+    --profiles_file benchmarks/data/profiles_1000.jsonl --workers 1 2 4 8
+
+For each worker count a WorkerPool is forked from one loaded model and driven by
+concurrent client threads sending one profile per request. Reported per run: requests/sec
+and, per worker, RSS, PSS (shared pages split between the processes using them) and
+private MB after the load. With --baseline every worker also loads its own copy of the
+model (spawned, not memory-mapped), which is the duplication the pool avoids.
+"""
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+import inference
+import worker_pool
+from recommender import SchemeRecommender
+
+_BASELINE_MODEL = None
+
+
+def _load_copy(model_path: str) -> None:
+	global _BASELINE_MODEL
+	_BASELINE_MODEL = SchemeRecommender.load(model_path, mmap_mode=None)
+
+
+def _baseline_recommend(profiles: List[Dict[str, Any]], top_k: int, timings: bool) -> List[Any]:
+	return inference.recommend_batch(_BASELINE_MODEL, profiles, top_k=top_k, timings=timings)
+
+
+def _drive(submit, profiles: List[Dict[str, Any]], clients: int, top_k: int) -> Dict[str, Any]:
+	def client(share: List[Dict[str, Any]]) -> None:
+		for profile in share:
+			submit([profile], top_k, False).result()
+
+	threads = [threading.Thread(target=client, args=(profiles[i::clients],)) for i in range(clients)]
+	t0 = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return {"requests_per_sec": round(len(profiles) / (time.perf_counter() - t0), 1)}
+
+
+def _summarise(memory: List[Dict[str, Any]]) -> Dict[str, Any]:
+	def mean(key: str):
+		values = [m[key] for m in memory if m[key] is not None]
+		return round(float(np.mean(values)), 1) if values else None
+
+	return {"rss_mb": mean("rss_mb"), "pss_mb": mean("pss_mb"), "private_mb": mean("private_mb")}
+
+
+def run_pool(model_path: str, workers: int, profiles: List[Dict[str, Any]], clients: int, top_k: int) -> Dict[str, Any]:
+	pool = worker_pool.WorkerPool(inference.load_model(model_path), workers)
+	try:
+		entry = {"workers": workers, **_drive(pool.submit_batch, profiles, clients, top_k)}
+		entry["per_worker"] = _summarise(pool.memory()["workers"])
+	finally:
+		pool.close()
+	return entry
+
+
+def run_baseline(model_path: str, workers: int, profiles: List[Dict[str, Any]], clients: int, top_k: int) -> Dict[str, Any]:
+	executor = ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=multiprocessing.get_context("spawn"),
+		initializer=_load_copy,
+		initargs=(model_path,),
+	)
+	try:
+		executor.submit(_baseline_recommend, profiles[:1], top_k, False).result()
+		entry = {"workers": workers, **_drive(
+			lambda batch, k, t: executor.submit(_baseline_recommend, batch, k, t), profiles, clients, top_k
+		)}
+		entry["per_worker"] = _summarise([worker_pool._memory_mb(pid) for pid in executor._processes])
+	finally:
+		executor.shutdown(wait=True)
+	return entry
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles_file", required=True, help="JSONL profiles, reused round-robin")
+	parser.add_argument("--requests", type=int, default=1000)
+	parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+	parser.add_argument("--clients_per_worker", type=int, default=4)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--baseline", action="store_true", help="Also measure workers that each load their own copy")
+	parser.add_argument("--out", default=None, help="Optional JSON file for the results")
+	args = parser.parse_args()
+
+	source = inference.read_profiles_jsonl(args.profiles_file)
+	profiles = [dict(source[i % len(source)], age=18 + i % 60) for i in range(args.requests)]
+	report = {"requests": args.requests, "pool": [], "baseline": []}
+	for workers in args.workers:
+		clients = workers * args.clients_per_worker
+		entry = run_pool(args.model, workers, profiles, clients, args.top_k)
+		report["pool"].append(entry)
+		print(json.dumps({"mode": "pool", **entry}), flush=True)
+		if args.baseline:
+			entry = run_baseline(args.model, workers, profiles, clients, args.top_k)
+			report["baseline"].append(entry)
+			print(json.dumps({"mode": "baseline", **entry}), flush=True)
+
+	if args.out:
+		with open(args.out, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+	main()
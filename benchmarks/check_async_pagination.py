@@ -0,0 +1,75 @@
+"""Check that with micro-batching, paginate and page requests are ranked off the caller's thread.
+
+Run from the repository root:  python -m benchmarks.check_async_pagination --rows 3000 --requests 8
+
+Fits a synthetic catalogue, saves it and serves it through a RecommendationService with
+micro-batching and pagination. --requests paginate recommends are sent through
+handle_async(), then a page request for each returned cursor. handle_async() must hand
+back the Futures before they are ranked (the stdio reader calls it), and every first
+and second page must equal what a service without batching answers synchronously.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import serving
+from benchmarks.synthetic import make_catalogue, make_profiles
+from ranking_cache import RankingCache
+from recommender import SchemeRecommender
+
+
+def _pages(service, profiles, top_k: int):
+	# First and second page of every profile, plus the most any handle_async() call held
+	# its caller and how many Futures were still pending when it returned
+	held, pending = 0.0, 0
+	futures = []
+	for i, profile in enumerate(profiles):
+		t0 = time.perf_counter()
+		futures.append(service.handle_async({"id": i, "op": "recommend", "profile": profile, "top_k": top_k, "lean": True, "paginate": True}))
+		held = max(held, time.perf_counter() - t0)
+		pending += not futures[-1].done()
+	firsts = [f.result(timeout=120) for f in futures]
+	seconds = [
+		service.handle_async({"id": r["id"], "op": "page", "cursor": r["result"]["next_cursor"], "top_k": top_k, "lean": True}).result(timeout=120)
+		for r in firsts
+	]
+	pages = [(a["result"]["results"], b["result"]["results"]) if a["ok"] and b["ok"] else None for a, b in zip(firsts, seconds)]
+	return pages, held * 1000, pending
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=3000)
+	parser.add_argument("--requests", type=int, default=8)
+	parser.add_argument("--top_k", type=int, default=10)
+	args = parser.parse_args()
+
+	profiles = make_profiles(args.requests, seed=7)
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "model.joblib")
+		SchemeRecommender().fit(make_catalogue(args.rows)).save(path)
+		results = {}
+		for name, batching in (("sync", None), ("batched", {"max_batch_size": 8, "max_wait_ms": 2.0})):
+			service = serving.RecommendationService(path, batching=batching, ranking_cache=RankingCache())
+			service.load()
+			try:
+				results[name] = _pages(service, profiles, args.top_k)
+			finally:
+				service.close()
+	expected, _, _ = results["sync"]
+	got, held_ms, pending = results["batched"]
+	matching = sum(a is not None and a == b for a, b in zip(got, expected))
+	report = {
+		"requests": args.requests, "max_handle_async_ms": round(held_ms, 2), "pending_on_return": pending,
+		"matching": f"{matching}/{args.requests}",
+	}
+	print(json.dumps(report))
+	if pending == 0 or matching != args.requests:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,68 @@
+"""Check that a reload runs off the request path and leaves the new worker pool's objects frozen.
+
+Run from the repository root:  python -m benchmarks.check_background_reload --rows 3000 --requests 20
+
+Fits a synthetic catalogue, saves it and serves it through a RecommendationService with
+micro-batching and one worker process. A forced reload is sent through handle_async(),
+which must return before the model is loaded, followed by --requests recommend
+requests: they must all be answered, some of them before the reload finishes. Once the
+reload is done the old pool is closed, but gc.freeze() must still be in effect for the
+new one; after close() nothing may stay frozen.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+import serving
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import SchemeRecommender
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=3000)
+	parser.add_argument("--requests", type=int, default=20)
+	parser.add_argument("--top_k", type=int, default=10)
+	args = parser.parse_args()
+
+	profiles = make_profiles(args.requests, seed=5)
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "model.joblib")
+		SchemeRecommender().fit(make_catalogue(args.rows)).save(path)
+		service = serving.RecommendationService(path, batching={"max_batch_size": 4, "max_wait_ms": 2.0}, processes=1)
+		service.load()
+		try:
+			t0 = time.perf_counter()
+			reload = service.handle_async({"id": "reload", "op": "reload", "force": True})
+			returned_ms = (time.perf_counter() - t0) * 1000
+			answered_during = 0
+			responses = []
+			for i, profile in enumerate(profiles):
+				responses.append(service.handle_async({"id": i, "op": "recommend", "profile": profile, "top_k": args.top_k}).result(timeout=120))
+				answered_during += not reload.done()
+			reloaded = reload.result(timeout=300)
+			reload_ms = (time.perf_counter() - t0) * 1000
+			frozen_after_swap = gc.get_freeze_count()
+		finally:
+			service.close()
+		frozen_after_close = gc.get_freeze_count()
+	report = {
+		"reload_ok": reloaded["ok"], "handle_async_returned_ms": round(returned_ms, 1), "reload_ms": round(reload_ms, 1),
+		"answered": sum(r["ok"] for r in responses), "answered_during_reload": answered_during,
+		"frozen_after_swap": frozen_after_swap, "frozen_after_close": frozen_after_close,
+	}
+	print(json.dumps(report))
+	ok = (
+		reloaded["ok"] and returned_ms < reload_ms / 2 and report["answered"] == args.requests
+		and answered_during > 0 and frozen_after_swap > 0 and frozen_after_close == 0
+	)
+	if not ok:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
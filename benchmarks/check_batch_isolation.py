@@ -0,0 +1,63 @@
+"""Check that one malformed profile in a micro-batch fails only its own request.
+
+Run from the repository root:  python -m benchmarks.check_batch_isolation --rows 500 --requests 5
+
+Fits a synthetic catalogue, saves it and serves it through a RecommendationService with
+micro-batching. --requests recommend requests are sent together (so they are scored as
+one batch), one of them with a non-numeric age. That request alone must fail; every
+other one must succeed with the same results as scoring its profile on its own.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import inference
+import serving
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import SchemeRecommender
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=500)
+	parser.add_argument("--requests", type=int, default=5)
+	parser.add_argument("--bad", type=int, default=2, help="Position of the malformed request")
+	parser.add_argument("--top_k", type=int, default=10)
+	args = parser.parse_args()
+
+	profiles = make_profiles(args.requests, seed=3)
+	profiles[args.bad] = dict(profiles[args.bad], age="thirty")
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "model.joblib")
+		SchemeRecommender().fit(make_catalogue(args.rows)).save(path)
+		service = serving.RecommendationService(path, batching={"max_batch_size": args.requests, "max_wait_ms": 200.0})
+		service.load()
+		try:
+			pending = [
+				service.handle_async({"id": i, "op": "recommend", "profile": p, "top_k": args.top_k, "lean": True})
+				for i, p in enumerate(profiles)
+			]
+			responses = [f.result(timeout=120) for f in pending]
+			stats = service.batcher.stats()
+		finally:
+			service.close()
+		model = inference.load_model(path)
+		failed = [r["id"] for r in responses if not r["ok"]]
+		matching = sum(
+			r["ok"] and r["result"] == inference.recommend(model, profiles[r["id"]], top_k=args.top_k, lean=True)
+			for r in responses
+		)
+	report = {
+		"requests": args.requests, "batches": stats["batches"], "split_batches": stats["split_batches"],
+		"failed": failed, "errors": [r["error"] for r in responses if not r["ok"]],
+		"good_matching": f"{matching}/{args.requests - 1}",
+	}
+	print(json.dumps(report))
+	if failed != [args.bad] or matching != args.requests - 1:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,116 @@
+"""Check that an interrupted and resumed bulk-score run writes exactly what an uninterrupted one does.
+
+Run from the repository root:  python -m benchmarks.check_bulk_resume --model artifacts/scheme_recommender.joblib \\
+    --profiles 2000 --kills 3
+
+Writes --profiles synthetic profiles (with an id, plus a malformed and a blank line) to
+a temporary JSONL file and scores it once with `recommender.py bulk-score`. It then
+scores it again in a fresh directory, killing the process and its workers (SIGKILL to
+the process group) --kills times at random points after a checkpoint and resuming each
+time. The shards of both runs must be
+byte-identical, and a sample of lines must match SchemeRecommender.recommend_batch().
+Also reports the throughput of the uninterrupted run.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_profiles
+from bulk_scoring import CHECKPOINT_FILE, shard_paths
+import inference
+from recommender import SchemeRecommender
+
+
+def _command(args, profiles_path: str, out_dir: str):
+	return [
+		sys.executable, "recommender.py", "bulk-score", "--model", args.model, "--profiles", profiles_path,
+		"--out_dir", out_dir, "--workers", str(args.workers), "--shard_size", str(args.shard_size),
+		"--checkpoint_every", str(args.checkpoint_every), "--format", "compact", "--progress_seconds", "3600",
+	]
+
+
+def _lines_checkpointed(out_dir: str) -> int:
+	try:
+		with open(os.path.join(out_dir, CHECKPOINT_FILE), "r", encoding="utf-8") as f:
+			return json.load(f)["lines"]
+	except (OSError, ValueError):
+		return 0
+
+
+def _read_output(out_dir: str) -> bytes:
+	parts = []
+	for path in shard_paths(out_dir):
+		with open(path, "rb") as f:
+			parts.append(os.path.basename(path).encode() + b"\n" + f.read())
+	return b"".join(parts)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default="artifacts/scheme_recommender.joblib")
+	parser.add_argument("--profiles", type=int, default=2000)
+	parser.add_argument("--kills", type=int, default=3)
+	parser.add_argument("--workers", type=int, default=2)
+	parser.add_argument("--shard_size", type=int, default=700)
+	parser.add_argument("--checkpoint_every", type=int, default=256)
+	parser.add_argument("--sample", type=int, default=50, help="Output lines checked against recommend_batch()")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	with tempfile.TemporaryDirectory() as tmp:
+		profiles = [{"id": f"user-{i}", **p} for i, p in enumerate(make_profiles(args.profiles, seed=args.seed))]
+		profiles_path = os.path.join(tmp, "profiles.jsonl")
+		with open(profiles_path, "w", encoding="utf-8") as f:
+			for i, profile in enumerate(profiles):
+				f.write(json.dumps(profile) + "\n")
+				if i == 3:
+					f.write("{not json\n\n")
+
+		t0 = time.perf_counter()
+		subprocess.run(_command(args, profiles_path, os.path.join(tmp, "once")), check=True, stdout=subprocess.DEVNULL)
+		seconds = time.perf_counter() - t0
+		print(json.dumps({"uninterrupted_s": round(seconds, 2), "profiles_per_s": round(args.profiles / seconds, 1)}), flush=True)
+
+		resumed = os.path.join(tmp, "resumed")
+		kills = 0
+		while kills < args.kills:
+			before = _lines_checkpointed(resumed)
+			# In its own session, so the kill takes its pool workers too instead of orphaning them
+			proc = subprocess.Popen(_command(args, profiles_path, resumed), stdout=subprocess.DEVNULL, start_new_session=True)
+			# Kill somewhere between one and three checkpoints after the last one seen
+			target = before + rng.randint(1, 3) * args.checkpoint_every
+			while proc.poll() is None and _lines_checkpointed(resumed) < target:
+				time.sleep(0.05)
+			if proc.poll() is not None:
+				break
+			time.sleep(rng.random())
+			os.killpg(proc.pid, signal.SIGKILL)
+			proc.wait()
+			kills += 1
+			print(json.dumps({"killed_after_lines": _lines_checkpointed(resumed)}), flush=True)
+		subprocess.run(_command(args, profiles_path, resumed), check=True, stdout=subprocess.DEVNULL)
+
+		identical = _read_output(os.path.join(tmp, "once")) == _read_output(resumed)
+		records = [json.loads(line) for path in shard_paths(resumed) for line in open(path, encoding="utf-8")]
+		by_id = {r["id"]: r for r in records if "error" not in r}
+		rec = SchemeRecommender.load(args.model)
+		sample = rng.sample(range(len(profiles)), min(args.sample, len(profiles)))
+		frames = rec.recommend_batch([inference.to_user_profile(profiles[i]) for i in sample], top_k=10, lean=True)
+		matching = sum(by_id[profiles[i]["id"]]["slugs"] == df["slug"].tolist() for i, df in zip(sample, frames))
+		print(json.dumps({
+			"kills": kills, "identical": identical, "lines": len(records),
+			"errors": sum("error" in r for r in records), "sample_matching": f"{matching}/{len(sample)}",
+		}))
+		if not identical or matching != len(sample):
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,119 @@
+"""Check that EligibilityEngine reproduces SchemeRecommender._eligibility_score exactly.
+
+Run from the repository root:  python -m benchmarks.check_eligibility_parity --rows 500 --profiles 50
+Optionally pass --data path/to/catalogue.csv to check against a real catalogue.
+
+Before that, a few hand-written eligibility texts are parsed into hard constraints
+(EligibilityConstraints) and each must admit exactly the expected profiles.
+
+With --fuzzy_max_chars N the engine truncates texts for fuzzy matching, so scores are no
+longer expected to be identical; the script then reports how far they drift from the
+exact scores and how much of each profile's top 10 changes instead of failing.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_catalogue, make_profiles
+from constraints import EligibilityConstraints
+from recommender import SchemeRecommender, UserProfile, load_dataset
+
+
+# (eligibility text, level, state cell, profile fields, whether the profile is eligible)
+CONSTRAINT_CASES = [
+	("small farmers engaged in goat rearing are eligible", "state", "", {"state": "Kerala", "gender": "female"}, True),
+	("the goal is to support small traders", "state", "", {"state": "Kerala"}, True),
+	("permanent residents of goa are eligible", "state", "", {"state": "Kerala"}, False),
+	("permanent residents of goa are eligible", "state", "", {"state": "Goa"}, True),
+	("open to residents of goa", "central", "", {"state": "Kerala"}, True),
+	("women and transgender persons are eligible", "state", "", {"gender": "female"}, True),
+	("women and transgender persons are eligible", "state", "", {"gender": "transgender"}, True),
+	("women and transgender persons are eligible", "state", "", {"gender": "male"}, False),
+	("married women and their husbands can apply together", "central", "", {"gender": "male"}, True),
+	("this scheme is only for women entrepreneurs", "central", "", {"gender": "male"}, False),
+]
+
+
+def check_constraints() -> int:
+	eligibility = [case[0] for case in CONSTRAINT_CASES]
+	parsed = EligibilityConstraints.parse(eligibility, eligibility, [case[1] for case in CONSTRAINT_CASES], [case[2] for case in CONSTRAINT_CASES])
+	failures = 0
+	for i, (text, level, _, fields, expected) in enumerate(CONSTRAINT_CASES):
+		if bool(parsed.mask(UserProfile(**fields))[i]) != expected:
+			failures += 1
+			print(f"MISMATCH (constraints) {text!r} ({level}) for {fields}: expected eligible={expected}")
+	print(f"{len(CONSTRAINT_CASES) - failures}/{len(CONSTRAINT_CASES)} constraint cases as expected")
+	return failures
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--data", default=None, help="Optional CSV to check instead of a synthetic catalogue")
+	parser.add_argument("--rows", type=int, default=500)
+	parser.add_argument("--profiles", type=int, default=50)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--fuzzy_max_chars", type=int, default=None, help="Fuzzy text-length cap to compare against exact scores")
+	args = parser.parse_args()
+
+	df = load_dataset(args.data) if args.data else make_catalogue(args.rows, seed=args.seed)
+	rec = SchemeRecommender().fit(df)
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=args.seed)]
+	profiles.append(UserProfile())
+
+	if args.fuzzy_max_chars is not None:
+		report_capped(rec, profiles, args.fuzzy_max_chars)
+		return
+
+	constraint_failures = check_constraints()
+	t0 = time.perf_counter()
+	batch = rec.eligibility_engine.score_batch(profiles)
+	t_batch = time.perf_counter() - t0
+
+	failures = 0
+	t_rows = t_engine = 0.0
+	for profile, batch_row in zip(profiles, batch):
+		t0 = time.perf_counter()
+		expected = np.array([rec._eligibility_score(row, profile) for _, row in rec.scheme_df.iterrows()])
+		t1 = time.perf_counter()
+		actual = rec.eligibility_engine.score(profile)
+		t2 = time.perf_counter()
+		t_rows += t1 - t0
+		t_engine += t2 - t1
+		for label, got in (("score", actual), ("score_batch", batch_row)):
+			if not np.array_equal(expected, got):
+				failures += 1
+				diff = np.flatnonzero(expected != got)
+				print(f"MISMATCH ({label}) for {profile}: {len(diff)} schemes, first at row {diff[0]}: "
+					f"{expected[diff[0]]!r} != {got[diff[0]]!r}")
+
+	print(f"{2 * len(profiles) - failures}/{2 * len(profiles)} checks identical over {len(rec.scheme_df)} schemes; "
+		f"per-row {t_rows:.2f}s, engine {t_engine:.2f}s, engine batch {t_batch:.2f}s")
+	sys.exit(1 if failures or constraint_failures else 0)
+
+
+def report_capped(rec: SchemeRecommender, profiles, max_chars: int) -> None:
+	engine = rec.eligibility_engine
+	t0 = time.perf_counter()
+	exact = engine.score_batch(profiles)
+	t_exact = time.perf_counter() - t0
+	engine.configure_fuzzy(max_chars)
+	t0 = time.perf_counter()
+	capped = engine.score_batch(profiles)
+	t_capped = time.perf_counter() - t0
+	engine.configure_fuzzy(None)
+
+	k = min(10, exact.shape[1])
+	overlap = [
+		len(set(np.argsort(-e, kind="stable")[:k]) & set(np.argsort(-c, kind="stable")[:k])) / k
+		for e, c in zip(exact, capped)
+	]
+	diff = np.abs(exact - capped)
+	print(f"fuzzy_max_chars={max_chars}: max |diff| {diff.max():.4f}, mean |diff| {diff.mean():.5f}, "
+		f"top-{k} overlap {np.mean(overlap):.3f} (min {np.min(overlap):.2f}); "
+		f"exact {t_exact:.2f}s, capped {t_capped:.2f}s")
+
+
+if __name__ == "__main__":
+	main()
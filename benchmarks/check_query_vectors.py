@@ -0,0 +1,79 @@
+"""Check that composed query vectors equal vectorizer.transform() of the query text exactly.
+
+Run from the repository root:  python -m benchmarks.check_query_vectors --profiles 500
+Optionally pass --model path/to/model.joblib to check a trained model's vocabulary.
+
+Profiles are the synthetic ones plus edge cases (empty profile, stop-word-only and
+single-token fragments, accented and repeated free text) so that n-grams crossing
+fragment boundaries are exercised. Also reports the time per query of both paths for
+single queries, batches of COMPOSE_MAX_QUERIES and one batch of all of them.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import COMPOSE_MAX_QUERIES, SchemeRecommender, UserProfile
+
+
+EDGE_CASES = [
+	UserProfile(),
+	UserProfile(interests=["the", "of and"], previous_applications=["a"]),
+	UserProfile(age=70, state="Tamil Nadu", interests=["pension"], previous_applications=["pension scheme", "old age pension"]),
+	UserProfile(age=12, gender="F", caste_group="SC/ST", occupation="school student", interests=["Éducation", "job", "job"]),
+	UserProfile(income=120000.5, occupation="agricultural labourer", interests=["crop insurance", "farm loan"]),
+	UserProfile(caste_group="OBC", occupation="teacher", gender="male", state="kerala", interests=["health", "scholarship"]),
+	UserProfile(interests=["x"], previous_applications=["", "  "]),
+]
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--model", default=None, help="Optional saved model to check instead of a synthetic fit")
+	parser.add_argument("--rows", type=int, default=500)
+	parser.add_argument("--profiles", type=int, default=500)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	rec = SchemeRecommender.load(args.model) if args.model else SchemeRecommender().fit(make_catalogue(args.rows, seed=args.seed))
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=args.seed)] + EDGE_CASES
+	queries = [rec._query_fragments(p) for p in profiles]
+
+	expected = sp.csr_matrix(rec.vectorizer.transform([" ".join(q) for q in queries]))
+	rec._vectorize_queries(queries[:1])  # create the QueryVectorizer
+	composer = rec._query_vectorizer
+	composed = composer.transform(queries)  # also fills the fragment cache
+	times = {}
+	for size in (1, COMPOSE_MAX_QUERIES, len(queries)):
+		batches = [queries[i:i + size] for i in range(0, len(queries), size)]
+		t0 = time.perf_counter()
+		for batch in batches:
+			rec.vectorizer.transform([" ".join(q) for q in batch])
+		t_transform = time.perf_counter() - t0
+		t0 = time.perf_counter()
+		for batch in batches:
+			composer.transform(batch)
+		times[size] = (t_transform, time.perf_counter() - t0)
+
+	failures = 0
+	for i, profile in enumerate(profiles):
+		a, b = expected[i], composed[i]
+		a.sort_indices()
+		b.sort_indices()
+		if not (np.array_equal(a.indices, b.indices) and np.array_equal(a.data, b.data)):
+			failures += 1
+			print(f"MISMATCH for {profile}: {a.nnz} vs {b.nnz} terms, max |diff| {abs(a - b).max():.3g}")
+
+	print(f"{len(profiles) - failures}/{len(profiles)} query vectors identical; {composer.stats()}")
+	for size, (t_transform, t_composed) in times.items():
+		used = "composed" if size <= COMPOSE_MAX_QUERIES else "transform"
+		print(f"batches of {size}: transform {t_transform * 1e6 / len(profiles):.0f} us/query, "
+			f"composed {t_composed * 1e6 / len(profiles):.0f} us/query ({used} is used)")
+	sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,90 @@
+"""Check that the regional boost changes rankings, keeps pruning exact and never reads the catalogue frame.
+
+Run from the repository root:  python -m benchmarks.check_regional_priority --rows 3000 --profiles 200
+
+On a synthetic catalogue, every profile with a state is ranked with REGIONAL_BOOST and
+with the boost switched off. Reports how many top-k lists change and the share of
+regional (central or same-state) schemes in them: the boost must raise that share and
+change some rankings. Pruned results must equal full scoring wherever they are exact.
+Finally a format 2 artifact is loaded and a profile with an unknown state is ranked:
+its regional mask must be exactly the central schemes and the lazy catalogue frame must
+stay unbuilt. Schemes that mention "goat" or "goal" must not be indexed under Goa.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import recommender
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import SchemeRecommender, UserProfile
+from regions import CENTRAL, StateIndex
+
+
+def _ranked(rec: SchemeRecommender, profiles, top_k: int, candidate_budget):
+	return [(df.index.to_numpy(), df.attrs["exact"]) for df in rec.recommend_batch(profiles, top_k=top_k, candidate_budget=candidate_budget, lean=True)]
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=3000)
+	parser.add_argument("--profiles", type=int, default=200)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	rec = SchemeRecommender().fit(make_catalogue(args.rows, seed=args.seed))
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=args.seed + 1)]
+	profiles = [p for p in profiles if p.state]
+	masks = [rec._regional_mask(p) for p in profiles]
+
+	boosted = _ranked(rec, profiles, args.top_k, recommender.DEFAULT_CANDIDATE_BUDGET)
+	exhaustive = _ranked(rec, profiles, args.top_k, None)
+	boost, recommender.REGIONAL_BOOST = recommender.REGIONAL_BOOST, 0.0
+	try:
+		plain = _ranked(rec, profiles, args.top_k, recommender.DEFAULT_CANDIDATE_BUDGET)
+	finally:
+		recommender.REGIONAL_BOOST = boost
+
+	def regional_share(ranked):
+		return float(np.mean([mask[rows].mean() for (rows, _), mask in zip(ranked, masks) if len(rows)]))
+
+	changed = sum(not np.array_equal(a, b) for (a, _), (b, _) in zip(boosted, plain))
+	pruning_mismatches = sum(exact and not np.array_equal(a, b) for (a, exact), (b, _) in zip(boosted, exhaustive))
+	report = {
+		"profiles_with_state": len(profiles), "rankings_changed": changed,
+		"regional_share_boosted": round(regional_share(boosted), 3), "regional_share_unboosted": round(regional_share(plain), 3),
+		"pruning_mismatches": pruning_mismatches,
+	}
+
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "model.joblib")
+		rec.save(path)
+		loaded = SchemeRecommender.load(path)
+		unknown = UserProfile(age=30, state="Atlantis", interests=["education"])
+		mask = loaded._regional_mask(unknown)
+		loaded.recommend(unknown, top_k=args.top_k, lean=True)
+		central = np.zeros(len(mask), dtype=bool)
+		central[loaded.state_index.positions(CENTRAL)] = True
+		report["unknown_state_mask_central_only"] = bool(central.any() and np.array_equal(mask, central))
+		report["unknown_state_frame_built"] = loaded._scheme_df is not None
+
+	words = StateIndex.build(["state"] * 3, ["", "", "goa"], ["goat rearing for small farmers", "goal: one crore houses", "residents of goa"])
+	report["goat_goal_indexed_under_goa"] = int(np.isin([0, 1], words.positions("goa")).sum())
+	report["goa_indexed"] = words.positions("goa").tolist() == [2]
+
+	print(json.dumps(report))
+	ok = (
+		changed > 0 and report["regional_share_boosted"] > report["regional_share_unboosted"] and pruning_mismatches == 0
+		and report["unknown_state_mask_central_only"] and not report["unknown_state_frame_built"]
+		and report["goat_goal_indexed_under_goa"] == 0 and report["goa_indexed"]
+	)
+	if not ok:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,62 @@
+"""Check that a forked worker scoring eligibility keeps the scheme texts shared with its parent.
+
+Run from the repository root:  python -m benchmarks.check_text_sharing --rows 10000 --profiles 50
+
+Fits a synthetic catalogue, saves it and loads it back the way WorkerPool does (texts
+read from the scheme store, GC frozen), then forks. The child runs the substring tests
+that scoring runs for --profiles profiles (their interests and states) against every
+scheme's text, and reports how many MB of private (copied) pages it gained.
+Reading the packed texts must not copy them: the growth must stay well under their size.
+Linux only (/proc).
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_catalogue, make_profiles
+from recommender import SchemeRecommender, UserProfile
+from worker_pool import _memory_mb
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=10000)
+	parser.add_argument("--profiles", type=int, default=50)
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "model.joblib")
+		SchemeRecommender().fit(make_catalogue(args.rows)).save(path)
+		rec = SchemeRecommender.load(path)
+	texts = rec.eligibility_engine.texts
+	text_mb = len(texts.joined) / 1e6
+	profiles = [UserProfile(**p) for p in make_profiles(args.profiles, seed=1)]
+	needles = sorted({i.lower() for p in profiles for i in (p.interests or [])} | {p.state.lower() for p in profiles if p.state})
+	gc.collect()
+	gc.freeze()
+
+	read, write = os.pipe()
+	pid = os.fork()
+	if pid == 0:
+		before = _memory_mb(os.getpid())["private_mb"]
+		for needle in needles:
+			texts.contains(needle)
+		after = _memory_mb(os.getpid())["private_mb"]
+		os.write(write, json.dumps([before, after]).encode())
+		os._exit(0)
+	os.waitpid(pid, 0)
+	before, after = json.loads(os.read(read, 1000))
+	report = {
+		"schemes": len(texts), "text_mb": round(text_mb, 1), "substring_tests": len(needles),
+		"child_private_mb_before": before, "child_private_mb_after": after,
+	}
+	print(json.dumps(report))
+	if before is None or after - before > text_mb / 4:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,70 @@
+"""Compare two benchmark suite results metric by metric.
+
+Run from the repository root:  python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Timings, latencies and memory are worse when they grow; throughputs are worse when they
+shrink. Changes beyond --threshold in the worse direction are flagged, and --fail makes
+the exit status non-zero when there are any.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict
+
+
+# Metric name suffixes where a larger value is an improvement
+HIGHER_IS_BETTER = ("_per_sec", "qps")
+# Reported for context only, never flagged
+INFORMATIONAL = ("vocabulary", "batch_size", "runs")
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]) -> None:
+	if isinstance(value, dict):
+		for key, inner in value.items():
+			_flatten(f"{prefix}.{key}" if prefix else key, inner, out)
+	elif isinstance(value, (int, float)) and not isinstance(value, bool):
+		out[prefix] = float(value)
+
+
+def _by_size(report: Dict[str, Any]) -> Dict[int, Dict[str, float]]:
+	sizes = {}
+	for entry in report["sizes"]:
+		metrics: Dict[str, float] = {}
+		_flatten("", {k: v for k, v in entry.items() if k != "rows"}, metrics)
+		sizes[entry["rows"]] = metrics
+	return sizes
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("old")
+	parser.add_argument("new")
+	parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+	parser.add_argument("--fail", action="store_true", help="Exit 1 if anything regressed")
+	args = parser.parse_args()
+
+	with open(args.old, encoding="utf-8") as f:
+		old = json.load(f)
+	with open(args.new, encoding="utf-8") as f:
+		new = json.load(f)
+	print(f"old: {old['environment'].get('commit')}  new: {new['environment'].get('commit')}")
+
+	old_sizes, new_sizes = _by_size(old), _by_size(new)
+	regressions = 0
+	for rows in sorted(set(old_sizes) & set(new_sizes)):
+		print(f"\n{rows} rows")
+		for name in sorted(set(old_sizes[rows]) & set(new_sizes[rows])):
+			before, after = old_sizes[rows][name], new_sizes[rows][name]
+			change = (after - before) / before if before else 0.0
+			worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+			flag = ""
+			if worse > args.threshold and not name.endswith(INFORMATIONAL):
+				flag = "  REGRESSION"
+				regressions += 1
+			print(f"  {name:<40} {before:>12.2f} -> {after:>12.2f}  {change:+7.1%}{flag}")
+	print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+	sys.exit(1 if args.fail and regressions else 0)
+
+
+if __name__ == "__main__":
+	main()
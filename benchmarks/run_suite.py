@@ -0,0 +1,217 @@
+"""Benchmark suite: fit, save, load, recommend and end-to-end inference.py per catalogue size.
+
+Run from the repository root:  python -m benchmarks.run_suite --rows 1000 10000 100000
+
+Synthetic catalogues and profiles are written to benchmarks/data (and reused). Training
+and serving each run in a fresh subprocess so the peak RSS reported for a stage is that
+stage's own. Results go to a JSON file; compare two of them with
+python -m benchmarks.compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import write_dataset
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _latency_stats(seconds: List[float]) -> Dict[str, float]:
+	ms = np.array(seconds) * 1000
+	return {
+		"p50_ms": round(float(np.percentile(ms, 50)), 2),
+		"p95_ms": round(float(np.percentile(ms, 95)), 2),
+		"p99_ms": round(float(np.percentile(ms, 99)), 2),
+		"mean_ms": round(float(ms.mean()), 2),
+	}
+
+
+def _peak_rss_mb() -> Optional[float]:
+	try:
+		import resource
+	except ImportError:
+		return None
+	scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+	return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def _run(cmd: List[str]) -> Tuple[float, Optional[float], str]:
+	"""Run a command; return wall seconds, its peak RSS in MB (Unix) and stdout."""
+	t0 = time.perf_counter()
+	# stderr goes to a file so a chatty child cannot block on a full pipe while we read stdout;
+	# the child is reaped with wait4 (not communicate) to get its resource usage
+	with tempfile.TemporaryFile() as err_file:
+		proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=err_file)
+		out = proc.stdout.read()
+		code, peak = _reap(proc)
+		err_file.seek(0)
+		err = err_file.read()
+	seconds = time.perf_counter() - t0
+	if code != 0:
+		raise RuntimeError(f"{' '.join(cmd)} exited with {code}:\n{err.decode(errors='replace')}")
+	return seconds, peak, out.decode()
+
+
+def _reap(proc: subprocess.Popen) -> Tuple[int, Optional[float]]:
+	if hasattr(os, "wait4"):
+		_, status, usage = os.wait4(proc.pid, 0)
+		code = os.waitstatus_to_exitcode(status)
+		scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+		peak = round(usage.ru_maxrss / scale, 1)
+		proc.returncode = code
+		return code, peak
+	return proc.wait(), None
+
+
+def stage_train(csv_path: str, model_path: str, workers: Optional[int]) -> Dict[str, Any]:
+	from recommender import SchemeRecommender
+
+	rec = SchemeRecommender()
+	t0 = time.perf_counter()
+	rec.fit_csv(csv_path, workers=workers)
+	fit_s = time.perf_counter() - t0
+	t0 = time.perf_counter()
+	rec.save(model_path)
+	save_s = time.perf_counter() - t0
+	return {
+		"fit_s": round(fit_s, 3),
+		"fit_rows_per_sec": round(len(rec.scheme_df) / fit_s, 1),
+		"save_s": round(save_s, 3),
+		"artifact_mb": round(os.path.getsize(model_path) / 1e6, 2),
+		"vocabulary": len(rec.vectorizer.vocabulary_),
+		"peak_rss_mb": _peak_rss_mb(),
+	}
+
+
+def stage_serve(model_path: str, profiles_path: str, top_k: int, batch_size: int) -> Dict[str, Any]:
+	import inference
+
+	t0 = time.perf_counter()
+	model = inference.load_model(model_path)
+	load_s = time.perf_counter() - t0
+	rss_after_load = _peak_rss_mb()
+	profiles = [inference.to_user_profile(p) for p in inference.read_profiles_jsonl(profiles_path)]
+
+	for profile in profiles[:3]:
+		model.recommend(profile, top_k=top_k)
+	latencies = []
+	for profile in profiles:
+		t0 = time.perf_counter()
+		model.recommend(profile, top_k=top_k)
+		latencies.append(time.perf_counter() - t0)
+	t0 = time.perf_counter()
+	model.recommend_batch(profiles, top_k=top_k, batch_size=batch_size)
+	batch_s = time.perf_counter() - t0
+	return {
+		"load_s": round(load_s, 3),
+		"rss_after_load_mb": rss_after_load,
+		"recommend": {**_latency_stats(latencies), "qps": round(len(latencies) / sum(latencies), 1)},
+		"recommend_batch": {"batch_size": batch_size, "profiles_per_sec": round(len(profiles) / batch_s, 1)},
+		"peak_rss_mb": _peak_rss_mb(),
+	}
+
+
+def bench_inference_cli(model_path: str, profiles_path: str, top_k: int, runs: int) -> Dict[str, Any]:
+	# One `inference.py --profile` process per request, as the non-persistent API path does
+	with open(profiles_path, encoding="utf-8") as f:
+		profiles = [line.strip() for line in f if line.strip()][:runs]
+	seconds, peaks = [], []
+	for profile in profiles:
+		wall, peak, _ = _run([sys.executable, "inference.py", "--model", model_path, "--profile", profile, "--top_k", str(top_k)])
+		seconds.append(wall)
+		peaks.append(peak)
+	return {
+		"runs": len(seconds),
+		**_latency_stats(seconds),
+		"peak_rss_mb": max(peaks) if None not in peaks else None,
+	}
+
+
+def _environment() -> Dict[str, Any]:
+	import pandas
+	import scipy
+	import sklearn
+
+	def git(*args) -> Optional[str]:
+		try:
+			return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+		except (OSError, subprocess.CalledProcessError):
+			return None
+
+	return {
+		"commit": git("rev-parse", "HEAD"),
+		"dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"cpu_count": os.cpu_count(),
+		"numpy": np.__version__,
+		"pandas": pandas.__version__,
+		"scipy": scipy.__version__,
+		"sklearn": sklearn.__version__,
+	}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+	parser.add_argument("--profiles", type=int, default=200)
+	parser.add_argument("--top_k", type=int, default=10)
+	parser.add_argument("--batch_size", type=int, default=64)
+	parser.add_argument("--cli_runs", type=int, default=5, help="inference.py invocations per size (0 skips)")
+	parser.add_argument("--workers", type=int, default=None, help="Ingestion processes for fit")
+	parser.add_argument("--data_dir", default="benchmarks/data")
+	parser.add_argument("--out", default=None, help="Result JSON (default benchmarks/results/<commit>.json)")
+	# Internal: run a single stage in this process and print its JSON
+	parser.add_argument("--stage", choices=["train", "serve"], help=argparse.SUPPRESS)
+	parser.add_argument("--csv", help=argparse.SUPPRESS)
+	parser.add_argument("--model", help=argparse.SUPPRESS)
+	parser.add_argument("--profiles_file", help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.stage == "train":
+		print(json.dumps(stage_train(args.csv, args.model, args.workers)))
+		return
+	if args.stage == "serve":
+		print(json.dumps(stage_serve(args.model, args.profiles_file, args.top_k, args.batch_size)))
+		return
+
+	report = {"environment": _environment(), "sizes": []}
+	for rows in args.rows:
+		csv_path, profiles_path = map(os.path.abspath, write_dataset(rows, args.data_dir, args.profiles))
+		model_path = os.path.abspath(os.path.join(args.data_dir, f"model_{rows}.joblib"))
+		module = [sys.executable, "-m", "benchmarks.run_suite"]
+		train_cmd = module + ["--stage", "train", "--csv", csv_path, "--model", model_path]
+		if args.workers is not None:
+			train_cmd += ["--workers", str(args.workers)]
+		_, _, out = _run(train_cmd)
+		entry = {"rows": rows, "train": json.loads(out.splitlines()[-1])}
+		_, _, out = _run(module + [
+			"--stage", "serve", "--model", model_path, "--profiles_file", profiles_path,
+			"--top_k", str(args.top_k), "--batch_size", str(args.batch_size),
+		])
+		entry["serve"] = json.loads(out.splitlines()[-1])
+		if args.cli_runs:
+			entry["inference_cli"] = bench_inference_cli(model_path, profiles_path, args.top_k, args.cli_runs)
+		report["sizes"].append(entry)
+		print(json.dumps(entry), flush=True)
+
+	out_path = args.out or os.path.join(
+		"benchmarks", "results", f"{(report['environment']['commit'] or 'unknown')[:12]}.json"
+	)
+	os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+	with open(out_path, "w", encoding="utf-8") as f:
+		json.dump(report, f, indent=2)
+	print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+	main()
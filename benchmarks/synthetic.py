@@ -0,0 +1,164 @@
+"""Synthetic scheme catalogues and user profiles for the benchmarks.
+
+Write CSV/JSONL files from the repository root:  python -m benchmarks.synthetic --rows 1000 10000 100000
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+STATES = [
+	"Andhra Pradesh", "Assam", "Bihar", "Delhi", "Goa", "Gujarat", "Haryana", "Karnataka", "Kerala",
+	"Madhya Pradesh", "Maharashtra", "Odisha", "Punjab", "Rajasthan", "Tamil Nadu", "Telangana",
+	"Uttar Pradesh", "West Bengal",
+]
+
+CATEGORIES = [
+	"Agriculture,Rural & Environment", "Education & Learning", "Health & Wellness",
+	"Social welfare & Empowerment", "Business & Entrepreneurship", "Women and Child",
+	"Skills & Employment", "Housing & Shelter", "Banking,Financial Services and Insurance",
+]
+
+DOMAIN_WORDS = (
+	"farmer agriculture crop irrigation student scholarship school college university women woman girl "
+	"widow pension senior elderly citizen bpl poverty ews scheduled caste tribe backward class obc minority "
+	"loan subsidy business entrepreneur startup msme health medical hospital treatment insurance employment "
+	"job youth young child minor weaver artisan advocate teacher doctor engineer unemployed disability "
+	"housing rural urban income training skill transgender family annual assistance financial benefit "
+	"government department district certificate residence aadhaar bank account application portal"
+).split()
+
+ELIGIBILITY_TEMPLATES = [
+	"The applicant must be a resident of {state}.",
+	"Age between 18 to 35 years.",
+	"The applicant should be 60 years of age or above.",
+	"Annual family income should not exceed Rs. {income}.",
+	"Only for women applicants.",
+	"The applicant should belong to SC/ST category.",
+	"Only for OBC candidates.",
+	"The applicant must be a farmer owning agricultural land.",
+	"Student enrolled in a recognised school or college.",
+	"Applicant age 45-60 years.",
+	"BPL card holders are eligible.",
+	"Transgender persons are eligible.",
+	"Must be an unemployed youth.",
+	"Members of minority communities.",
+]
+
+
+def _pseudo_words(rng: np.random.Generator, n: int) -> np.ndarray:
+	letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+	lengths = rng.integers(4, 10, size=n)
+	return np.array(["".join(rng.choice(letters, size=k)) for k in lengths])
+
+
+def make_catalogue(n_rows: int, seed: int = 0) -> pd.DataFrame:
+	"""Synthetic scheme catalogue with the columns the recommender reads.
+
+	Text is drawn from a Zipf-weighted mix of domain words and pseudo-words so the
+	fitted vocabulary grows with the catalogue the way a scraped one does.
+	"""
+	rng = np.random.default_rng(seed)
+	lexicon = np.concatenate([np.array(DOMAIN_WORDS), _pseudo_words(rng, max(2000, n_rows // 2))])
+	weights = 1.0 / np.arange(1, len(lexicon) + 1) ** 1.1
+	weights /= weights.sum()
+
+	def words(k: int) -> str:
+		return " ".join(rng.choice(lexicon, size=k, p=weights))
+
+	rows = []
+	for i in range(n_rows):
+		state = STATES[rng.integers(len(STATES))]
+		level = "Central" if rng.random() < 0.3 else "State"
+		templates = rng.choice(len(ELIGIBILITY_TEMPLATES), size=rng.integers(1, 4), replace=False)
+		eligibility = " ".join(
+			ELIGIBILITY_TEMPLATES[t].format(state=state, income=f"{int(rng.integers(1, 8)) * 50000:,}")
+			for t in templates
+		)
+		details = words(int(rng.integers(30, 120)))
+		if level == "State":
+			details += f" in the state of {state}"
+		rows.append({
+			"scheme_name": words(3).title() + (" Yojana" if rng.random() < 0.5 else " Scheme"),
+			"slug": f"scheme-{i}",
+			"details": details,
+			"benefits": words(int(rng.integers(10, 40))) + f" Rs. {int(rng.integers(1000, 200000))}",
+			"eligibility": eligibility,
+			"application": "Apply online through the portal. " + words(int(rng.integers(5, 20))),
+			"documents": "Aadhaar card, income certificate, " + words(int(rng.integers(3, 10))),
+			"level": level,
+			"schemeCategory": CATEGORIES[rng.integers(len(CATEGORIES))],
+			"tags": ", ".join(rng.choice(DOMAIN_WORDS, size=3, replace=False)),
+		})
+	return pd.DataFrame(rows)
+
+
+OCCUPATIONS = [
+	"farmer", "student", "school student", "teacher", "business owner", "entrepreneur", "weaver",
+	"advocate", "doctor", "engineer", "unemployed", "daily wage labourer", "homemaker", None,
+]
+CASTE_GROUPS = ["General", "OBC", "SC", "ST", "EWS", "minority muslim", None]
+GENDERS = ["male", "female", "Female", "M", "transgender", "other", None]
+INTERESTS = [
+	"education", "health", "employment", "agriculture", "loan", "subsidy", "housing", "pension",
+	"scholarship", "insurance", "skill training", "women empowerment", "job",
+]
+
+
+def make_profiles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+	"""Random profile dicts shaped like the ones the API sends to inference.py."""
+	rng = np.random.default_rng(seed)
+
+	def maybe(value, p_missing: float = 0.15):
+		return None if rng.random() < p_missing else value
+
+	profiles = []
+	for _ in range(n):
+		age = int(np.clip(rng.normal(38, 17), 5, 95))
+		income = float(rng.choice([0, 50000, 120000, 180000, 250000, 400000, 800000]))
+		profile = {
+			"age": maybe(age, 0.05),
+			"income": maybe(income),
+			"caste_group": CASTE_GROUPS[rng.integers(len(CASTE_GROUPS))],
+			"occupation": OCCUPATIONS[rng.integers(len(OCCUPATIONS))],
+			"gender": GENDERS[rng.integers(len(GENDERS))],
+			"state": maybe(STATES[rng.integers(len(STATES))], 0.2),
+			"interests": list(rng.choice(INTERESTS, size=rng.integers(0, 4), replace=False)),
+			"previous_applications": [],
+		}
+		profiles.append({k: v for k, v in profile.items() if v is not None})
+	return profiles
+
+
+def write_dataset(n_rows: int, out_dir: str, n_profiles: int = 200, seed: int = 0) -> Tuple[str, str]:
+	"""Write catalogue_<rows>.csv and profiles_<n>.jsonl to out_dir (reused if present)."""
+	os.makedirs(out_dir, exist_ok=True)
+	csv_path = os.path.join(out_dir, f"catalogue_{n_rows}.csv")
+	profiles_path = os.path.join(out_dir, f"profiles_{n_profiles}.jsonl")
+	if not os.path.exists(csv_path):
+		make_catalogue(n_rows, seed=seed).to_csv(csv_path, index=False)
+	if not os.path.exists(profiles_path):
+		with open(profiles_path, "w", encoding="utf-8") as f:
+			for profile in make_profiles(n_profiles, seed=seed + 1):
+				f.write(json.dumps(profile) + "\n")
+	return csv_path, profiles_path
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Write synthetic scheme catalogues and user profiles")
+	parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+	parser.add_argument("--profiles", type=int, default=200)
+	parser.add_argument("--out", default="benchmarks/data")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	for rows in args.rows:
+		csv_path, profiles_path = write_dataset(rows, args.out, args.profiles, args.seed)
+		print(f"{csv_path}  {profiles_path}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,307 @@
+import glob
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import inference
+from artifacts import signature
+from recommender import DEFAULT_CANDIDATE_BUDGET, SchemeRecommender
+
+# Written next to the shards after every checkpoint; "complete" once the input is done
+CHECKPOINT_FILE = "checkpoint.json"
+SHARD_PATTERN = "part-{:05d}.jsonl"
+# jsonl: {"line", "id", "results": [records]}; compact: {"line", "id", "slugs", "scores"}
+# (score_hybrid, 6 decimals); a profile that fails is {"line", "id", "error"} in either
+FORMATS = ("jsonl", "compact")
+
+# The model and scoring options workers use; set once per worker by _init_worker
+_MODEL: Optional[SchemeRecommender] = None
+_OPTIONS: Optional[Dict[str, Any]] = None
+
+
+def bulk_score(
+	model_path: str,
+	profiles_path: str,
+	out_dir: str,
+	top_k: int = 10,
+	workers: Optional[int] = None,
+	batch_size: int = 64,
+	shard_size: int = 100_000,
+	checkpoint_every: int = 10_000,
+	output_format: str = "jsonl",
+	lean: bool = False,
+	hard_filter: bool = False,
+	candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+	id_field: str = "id",
+	restart: bool = False,
+	progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+	progress_seconds: float = 10.0,
+) -> Dict[str, Any]:
+	"""Recommendations for every profile of a JSONL file, written as JSONL shards in out_dir.
+
+	The file is streamed in batches of ``batch_size`` lines, scored in a pool of
+	``workers`` processes (default: one per core; 1 scores in this process) that each
+	load the model once, memory-mapped, and written back in input order. At most two
+	batches per worker are in flight, so memory does not grow with the input. Output
+	line i of the input (from 0) goes to shard i // ``shard_size``.
+
+	Every ``checkpoint_every`` lines the open shard is flushed to disk and the input
+	offset reached is recorded in out_dir/checkpoint.json. Run again with the same
+	arguments after a crash to resume there: output written after the last checkpoint
+	is cut off and scored again. Resuming refuses (ValueError) if the model artifact,
+	the input file or the scoring options changed; ``restart`` starts over instead.
+	``progress`` is called with a progress report every ``progress_seconds``.
+
+	Returns the final checkpoint: lines read, profiles scored, errors, shard count.
+	"""
+	if output_format not in FORMATS:
+		raise ValueError(f"output_format must be one of {FORMATS}")
+	if shard_size < 1 or batch_size < 1:
+		raise ValueError("shard_size and batch_size must be at least 1")
+	options = {
+		"top_k": top_k, "output_format": output_format, "lean": lean, "hard_filter": hard_filter,
+		"candidate_budget": candidate_budget, "id_field": id_field, "shard_size": shard_size,
+	}
+	model_sig, input_sig = signature(model_path), signature(profiles_path)
+	if model_sig is None or input_sig is None:
+		raise FileNotFoundError(model_path if model_sig is None else profiles_path)
+	os.makedirs(out_dir, exist_ok=True)
+	state = None if restart else _read_checkpoint(out_dir)
+	if state is None:
+		_remove_output(out_dir)
+		state = {
+			"options": options, "model": list(model_sig), "input": [input_sig[1], input_sig[2]],
+			"offset": 0, "lines": 0, "scored": 0, "errors": 0, "shard": 0, "shard_bytes": 0,
+			"elapsed_s": 0.0, "complete": False,
+		}
+	else:
+		_check_resumable(state, options, model_sig, input_sig)
+		if state["complete"]:
+			return state
+
+	writer = _ShardWriter(out_dir, state["shard"], state["shard_bytes"])
+	started, start = time.perf_counter(), (state["lines"], state["offset"], state["elapsed_s"])
+	last_report, last_checkpoint = started, state["lines"]
+
+	def checkpoint(complete: bool = False) -> None:
+		state["shard"], state["shard_bytes"] = writer.index, writer.sync()
+		state["elapsed_s"] = round(start[2] + time.perf_counter() - started, 3)
+		state["complete"] = complete
+		_write_checkpoint(out_dir, state)
+
+	try:
+		with open(profiles_path, "rb") as src:
+			src.seek(state["offset"])
+			batches = _read_batches(src, state["offset"], state["lines"], batch_size)
+			for first, count, offset, (outputs, errors) in _scored(batches, model_path, options, workers):
+				for line, data in outputs:
+					writer.write(line // shard_size, data)
+				state["offset"], state["lines"] = offset, first + count
+				state["scored"] += len(outputs) - errors
+				state["errors"] += errors
+				if state["lines"] - last_checkpoint >= checkpoint_every:
+					checkpoint()
+					last_checkpoint = state["lines"]
+				now = time.perf_counter()
+				if progress is not None and now - last_report >= progress_seconds:
+					progress(_report(state, input_sig[1], start, now - started))
+					last_report = now
+		checkpoint(complete=True)
+	finally:
+		writer.close()
+	if progress is not None:
+		progress(_report(state, input_sig[1], start, time.perf_counter() - started))
+	return state
+
+
+def shard_paths(out_dir: str) -> List[str]:
+	"""The output shards of a bulk_score() run, in input order."""
+	return sorted(glob.glob(os.path.join(out_dir, SHARD_PATTERN.replace("{:05d}", "[0-9]" * 5))))
+
+
+class _ShardWriter:
+	# Appends to shard files, one open at a time; reopening cuts a shard back to the
+	# length recorded at the last checkpoint and drops any later shards
+	def __init__(self, out_dir: str, index: int, size: int):
+		self.out_dir = out_dir
+		for path in shard_paths(out_dir):
+			if int(os.path.basename(path)[5:10]) > index:
+				os.remove(path)
+		self.index = index
+		self._file = open(self._path(index), "ab")
+		self._file.truncate(size)
+		# Writes append at the (new) end; move the reported position there too
+		self._file.seek(size)
+
+	def _path(self, index: int) -> str:
+		return os.path.join(self.out_dir, SHARD_PATTERN.format(index))
+
+	def write(self, index: int, data: bytes) -> None:
+		if index != self.index:
+			self.sync()
+			self._file.close()
+			self.index = index
+			self._file = open(self._path(index), "wb")
+		self._file.write(data)
+
+	def sync(self) -> int:
+		self._file.flush()
+		os.fsync(self._file.fileno())
+		return self._file.tell()
+
+	def close(self) -> None:
+		self._file.close()
+
+
+def _read_batches(src, offset: int, line: int, batch_size: int) -> Iterator[Tuple[int, List[bytes], int]]:
+	# (first line number, raw lines, input offset after them); the file is read in binary
+	# so the offset can be recorded exactly and seeked to on resume
+	batch: List[bytes] = []
+	for raw in src:
+		batch.append(raw)
+		offset += len(raw)
+		if len(batch) == batch_size:
+			yield line, batch, offset
+			line += len(batch)
+			batch = []
+	if batch:
+		yield line, batch, offset
+
+
+def _scored(batches, model_path: str, options: Dict[str, Any], workers: Optional[int]) -> Iterator[Tuple[int, int, int, Tuple[List[Tuple[int, bytes]], int]]]:
+	# (first line, line count, offset, _score_lines result) per batch, in input order
+	workers = workers if workers is not None else (os.cpu_count() or 1)
+	if workers <= 1:
+		_init_worker(model_path, options)
+		try:
+			for first, lines, offset in batches:
+				yield first, len(lines), offset, _score_lines(first, lines)
+		finally:
+			_init_worker(None, None)
+		return
+	with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path, options)) as pool:
+		pending: deque = deque()
+		for first, lines, offset in batches:
+			pending.append((first, len(lines), offset, pool.submit(_score_lines, first, lines)))
+			if len(pending) >= 2 * workers:
+				first, count, offset, future = pending.popleft()
+				yield first, count, offset, future.result()
+		while pending:
+			first, count, offset, future = pending.popleft()
+			yield first, count, offset, future.result()
+
+
+def _init_worker(model_path: Optional[str], options: Optional[Dict[str, Any]]) -> None:
+	global _MODEL, _OPTIONS
+	_MODEL = SchemeRecommender.load(model_path) if model_path is not None else None
+	_OPTIONS = options
+
+
+def _score_lines(first: int, lines: List[bytes]) -> Tuple[List[Tuple[int, bytes]], int]:
+	# One encoded output line per non-blank input line, and how many of them are errors
+	id_field = _OPTIONS["id_field"]
+	parsed, outputs, errors = [], {}, 0
+	for i, raw in enumerate(lines):
+		if not raw.strip():
+			continue
+		try:
+			profile = json.loads(raw)
+			if not isinstance(profile, dict):
+				raise ValueError("profile must be a JSON object")
+			parsed.append((first + i, profile))
+		except ValueError as e:
+			outputs[first + i] = _encode({"line": first + i + 1, "id": None, "error": f"{type(e).__name__}: {e}"})
+			errors += 1
+	frames = _recommend([p for _, p in parsed])
+	for (line, profile), df in zip(parsed, frames):
+		record = {"line": line + 1, "id": profile.get(id_field)}
+		if isinstance(df, Exception):
+			record["error"] = f"{type(df).__name__}: {df}"
+			errors += 1
+		elif _OPTIONS["output_format"] == "compact":
+			record["slugs"] = df["slug"].tolist()
+			record["scores"] = [round(s, 6) for s in df["score_hybrid"].tolist()]
+		else:
+			record["results"] = inference.to_records(df, _OPTIONS["lean"])
+		outputs[line] = _encode(record)
+	return sorted(outputs.items()), errors
+
+
+def _recommend(profiles: List[Dict[str, Any]]) -> List[Any]:
+	# Scored together; if the batch fails, one at a time so only the bad profiles error
+	opts = _OPTIONS
+	lean = opts["lean"] or opts["output_format"] == "compact"
+
+	def score(batch):
+		return _MODEL.recommend_batch(
+			[inference.to_user_profile(p) for p in batch], top_k=opts["top_k"], batch_size=max(len(batch), 1),
+			candidate_budget=opts["candidate_budget"], hard_filter=opts["hard_filter"], lean=lean,
+		)
+
+	try:
+		return score(profiles)
+	except Exception:
+		frames: List[Any] = []
+		for profile in profiles:
+			try:
+				frames.extend(score([profile]))
+			except Exception as e:
+				frames.append(e)
+		return frames
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+	return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _report(state: Dict[str, Any], input_bytes: int, start: Tuple[int, int, float], seconds: float) -> Dict[str, Any]:
+	# start: (lines, offset, elapsed seconds) when this run began; rates are this run's
+	lines, offset, elapsed_before = start
+	read = state["offset"] - offset
+	eta = (input_bytes - state["offset"]) * seconds / read if read > 0 else None
+	return {
+		"lines": state["lines"], "scored": state["scored"], "errors": state["errors"], "shard": state["shard"],
+		"input_fraction": round(state["offset"] / input_bytes, 4) if input_bytes else 1.0,
+		"lines_per_s": round((state["lines"] - lines) / seconds, 1) if seconds > 0 else 0.0,
+		"elapsed_s": round(elapsed_before + seconds, 1), "eta_s": round(eta, 1) if eta is not None else None,
+		"complete": state["complete"],
+	}
+
+
+def _read_checkpoint(out_dir: str) -> Optional[Dict[str, Any]]:
+	try:
+		with open(os.path.join(out_dir, CHECKPOINT_FILE), "r", encoding="utf-8") as f:
+			return json.load(f)
+	except FileNotFoundError:
+		return None
+
+
+def _write_checkpoint(out_dir: str, state: Dict[str, Any]) -> None:
+	# Atomic, after the shard it describes has been synced: a crash leaves either this
+	# checkpoint or the previous one, and every shard byte either records is on disk
+	path = os.path.join(out_dir, CHECKPOINT_FILE)
+	tmp = f"{path}.tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump(state, f)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp, path)
+
+
+def _check_resumable(state: Dict[str, Any], options: Dict[str, Any], model_sig, input_sig) -> None:
+	if state["options"] != options:
+		raise ValueError(f"{CHECKPOINT_FILE} was written with other options {state['options']}; pass restart to start over")
+	if state["model"] != list(model_sig):
+		raise ValueError("The model artifact changed since this run started; pass restart to start over")
+	if state["input"] != [input_sig[1], input_sig[2]]:
+		raise ValueError("The profiles file changed since this run started; pass restart to start over")
+
+
+def _remove_output(out_dir: str) -> None:
+	# Only files a run writes; anything else in out_dir is left alone
+	for path in shard_paths(out_dir) + [os.path.join(out_dir, CHECKPOINT_FILE)]:
+		if os.path.exists(path):
+			os.remove(path)
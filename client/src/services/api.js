@@ -69,7 +69,8 @@ export const profileAPI = {
 
 // Recommendations API
 export const recommendationsAPI = {
-  getRecommendations: (topK = 10) => api.post('/recommendations', { top_k: topK }),
+  // Pass the previous response's nextCursor to get the next page of the same ranking
+  getRecommendations: (topK = 10, cursor = null) => api.post('/recommendations', cursor ? { top_k: topK, cursor } : { top_k: topK }),
   
   getServiceStatus: () => api.get('/recommendations/status'),
 };
@@ -0,0 +1,266 @@
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from regions import STATES, normalize_state, states_mentioned
+
+
+# Caste groups a scheme can be reserved for, one bit each, and how its text names them
+CASTE_GROUPS: Tuple[Tuple[str, "re.Pattern"], ...] = (
+	("sc", re.compile(r"\b(sc|scheduled caste)\b")),
+	("st", re.compile(r"\b(st|scheduled tribe)\b")),
+	("obc", re.compile(r"\bobc\b")),
+	("ebc", re.compile(r"\bebc\b")),
+	("ews", re.compile(r"\bews\b")),
+)
+
+# Gender bits: a scheme keeps the genders it is open to, a profile has at most one bit
+FEMALE, MALE, TRANSGENDER = 1, 2, 4
+ANY_GENDER = FEMALE | MALE | TRANSGENDER
+
+NO_MIN_AGE, NO_MAX_AGE = 0, 255
+STATE_NAMES: List[str] = sorted(STATES)
+
+_RESERVED = re.compile(r"(only|exclusively|reserved)\s+(for|to)")
+_INCOME = re.compile(r"(income|annual income|family income)[^0-9]{0,30}([₹rs.\s]*)([0-9][0-9,.]+)(\s*(lakh|lac|crore))?")
+_INCOME_UPPER = re.compile(r"(below|less than|not exceed|upto|up to|<=|less or equal|not more than)")
+_INCOME_LOWER = re.compile(r"(above|at least|minimum|>=|(?<!not )more than)")
+_UNITS = {"lakh": 1e5, "lac": 1e5, "crore": 1e7}
+
+_WOMEN_ONLY = re.compile(r"(women only|only for women|girls only|only for girls|female candidates only)")
+_MEN_ONLY = re.compile(r"\b(men only|only for men|boys only|only for boys|male candidates only)")
+# Patterns searched in the longer scheme text go with substrings one of which any match
+# contains; the regex only runs when a substring is present
+_TRANSGENDER = (re.compile(r"\btransgender(s)?\b|\bthird gender\b|\btrans[-\s]?person\b"), ("trans", "third gender"))
+# Other genders a text that names transgender persons lists next to them
+_WOMEN_NAMED = (re.compile(r"\b(women|woman|female|girls)\b"), ("wom", "female", "girls"))
+_MEN_NAMED = (re.compile(r"\b(men|man|male|boys)\b"), ("men", "man", "male", "boys"))
+_GIRL_CHILD = (re.compile(r"\bgirl\s*child\b|\bonly for girls\b|\bgirls only\b"), ("girl",))
+_BOY_CHILD = (re.compile(r"\bboy\s*child\b|\bonly for boys\b|\bboys only\b"), ("boy",))
+_MATERNITY = (re.compile(r"\bpregnan(t|cy)\b|\bmaternity\b|\blactating\b|\banganwadi\s*helper\b"), ("pregnan", "maternity", "lactating", "anganwadi"))
+_WOMEN_EXCLUSIVE = (re.compile(r"\b(unmarried woman|widow|self help group women|girl\s*child)\b"), ("wom", "widow", "girl"))
+
+# An age is one to three digits that are not the start of a bigger number or an amount
+_AGE = r"(\d{1,3})(?![\d,]|\s*(?:lakh|lac|crore|%|percent))"
+_AGE_BETWEEN = re.compile(r"between\s+" + _AGE + r"\s+(?:and|to)\s+" + _AGE)
+_AGE_MIN = re.compile(r"(minimum|at least|>=)\s+" + _AGE)
+_AGE_MAX = re.compile(r"(maximum|not above|<=)\s+" + _AGE)
+_AGE_OR_ABOVE = re.compile(_AGE + r"\s*(years|yrs)?\s+(or|and)\s+(above|older)")
+_AGE_OR_BELOW = re.compile(_AGE + r"\s*(years|yrs)?\s+(or|and)\s+(below|younger)")
+
+# Age windows implied by school / college student schemes
+# (Two patterns: as one alternation neither half gets re's literal-prefix scan)
+_SCHOOL_CLASS = (re.compile(r"(class|std\.?|standard)\s*(ix|x|xi|xii|9|10|11|12)\b"), ("class", "std", "standard"))
+_SCHOOL_STUDENT = (re.compile(
+	r"\bschool\s+student\b|\bpre-?matric\b|\bsecondary school\b|\bsenior secondary\b|\bhigher secondary\b"
+), ("school", "matric", "secondary"))
+_COLLEGE = (re.compile(
+	r"\bcollege\s+student\b|\bundergraduate\b|\bpost-?matric\b|\bdegree\b"
+	r"|\bpursuing (b\.|bcom|bsc|ba|btech|be|b\.tech|b\.e)\b"
+), ("college", "graduate", "matric", "degree", "pursuing"))
+SCHOOL_AGES, COLLEGE_AGES = (10, 20), (16, 30)
+
+_CELL_SPLIT = re.compile(r"[,;/|]")
+
+
+def _mentions(text: str, rule: Tuple["re.Pattern", Tuple[str, ...]]) -> bool:
+	pattern, hints = rule
+	return any(hint in text for hint in hints) and pattern.search(text) is not None
+
+
+def _income_bound(text: str) -> Tuple[float, float]:
+	# (floor, cap) from the first "income ... <amount>" phrase. The bound's direction is
+	# read from the words between "income" and the amount only, so an age "minimum"
+	# elsewhere in the text cannot turn an income cap into a floor.
+	match = _INCOME.search(text)
+	if match is None:
+		return 0.0, np.inf
+	digits = match.group(3).replace(",", "").rstrip(".")
+	try:
+		amount = float(digits) * _UNITS.get(match.group(5) or "", 1.0)
+	except ValueError:
+		return 0.0, np.inf
+	if amount <= 0:
+		return 0.0, np.inf
+	phrase = match.group(0)
+	if _INCOME_UPPER.search(phrase):
+		return 0.0, amount
+	if _INCOME_LOWER.search(phrase):
+		return amount, np.inf
+	return 0.0, np.inf
+
+
+def _scheme_state(level: str, state_cell: str, eligibility: str) -> int:
+	# Position in STATE_NAMES of the one state a state-level scheme is limited to, else -1.
+	# The state/states columns decide when filled; otherwise the states its eligibility
+	# names as whole words. Schemes of any other level are never limited.
+	if "state" not in level:
+		return -1
+	named = {normalize_state(e) for e in _CELL_SPLIT.split(state_cell) if e.strip()} - {None}
+	if not named:
+		named = states_mentioned(eligibility)
+	return STATE_NAMES.index(named.pop()) if len(named) == 1 else -1
+
+
+class EligibilityConstraints:
+	"""Hard eligibility limits of every scheme, parsed from its text once at fit time.
+
+	One compact array per limit, one entry per scheme: ``min_age``/``max_age`` (uint8,
+	NO_MIN_AGE/NO_MAX_AGE when open), ``income_min``/``income_max`` (float32, 0 / inf
+	when open), ``castes`` (uint8 bits of the CASTE_GROUPS a scheme is reserved for, 0 if
+	open to all), ``genders`` (uint8 bits of the genders it is open to) and ``state``
+	(int8 position in STATE_NAMES, -1 if not limited to one state).
+
+	The rules are the hard rejections the API route applied to fetched results. A
+	profile field that is missing never excludes a scheme.
+	"""
+
+	def __init__(
+		self,
+		min_age: np.ndarray,
+		max_age: np.ndarray,
+		income_min: np.ndarray,
+		income_max: np.ndarray,
+		castes: np.ndarray,
+		genders: np.ndarray,
+		state: np.ndarray,
+	):
+		self.min_age = min_age
+		self.max_age = max_age
+		self.income_min = income_min
+		self.income_max = income_max
+		self.castes = castes
+		self.genders = genders
+		self.state = state
+
+	@classmethod
+	def parse(
+		cls,
+		eligibility: Sequence[str],
+		texts: Sequence[str],
+		levels: Sequence[str],
+		state_cells: Sequence[str],
+	) -> "EligibilityConstraints":
+		"""Parse lower-cased eligibility text, searchable text, level and state/states cells."""
+		n = len(eligibility)
+		min_age = np.full(n, NO_MIN_AGE, dtype=np.uint8)
+		max_age = np.full(n, NO_MAX_AGE, dtype=np.uint8)
+		income_min = np.zeros(n, dtype=np.float32)
+		income_max = np.full(n, np.inf, dtype=np.float32)
+		castes = np.zeros(n, dtype=np.uint8)
+		genders = np.full(n, ANY_GENDER, dtype=np.uint8)
+		state = np.full(n, -1, dtype=np.int8)
+		for i in range(n):
+			state[i] = _scheme_state(levels[i], state_cells[i], eligibility[i])
+			elig = eligibility[i]
+			if len(elig.strip()) < 5:
+				# Nothing to go on: the scheme is open to everyone
+				continue
+			text = texts[i]
+			low, high = NO_MIN_AGE, NO_MAX_AGE
+
+			if _RESERVED.search(elig):
+				for bit, (_, pattern) in enumerate(CASTE_GROUPS):
+					if pattern.search(elig):
+						castes[i] |= 1 << bit
+
+			income_min[i], income_max[i] = _income_bound(elig)
+
+			# Open to every gender the text names as a target group ("women and transgender
+			# persons" is both), or to all of them when it names none
+			named = 0
+			if _mentions(text, _TRANSGENDER):
+				named |= TRANSGENDER
+				if _mentions(text, _WOMEN_NAMED):
+					named |= FEMALE
+				if _mentions(text, _MEN_NAMED):
+					named |= MALE
+			if _WOMEN_ONLY.search(elig) or _mentions(text, _MATERNITY) or _mentions(text, _WOMEN_EXCLUSIVE):
+				named |= FEMALE
+			if _MEN_ONLY.search(elig):
+				named |= MALE
+			if _mentions(text, _GIRL_CHILD):
+				named |= FEMALE
+				high = min(high, 18)
+			if _mentions(text, _BOY_CHILD):
+				named |= MALE
+				high = min(high, 18)
+			genders[i] = named or ANY_GENDER
+
+			match = _AGE_BETWEEN.search(elig)
+			if match:
+				low, high = max(low, int(match.group(1))), min(high, int(match.group(2)))
+			match = _AGE_MIN.search(elig)
+			if match:
+				low = max(low, int(match.group(2)))
+			match = _AGE_MAX.search(elig)
+			if match:
+				high = min(high, int(match.group(2)))
+			match = _AGE_OR_ABOVE.search(elig)
+			if match:
+				low = max(low, int(match.group(1)))
+			match = _AGE_OR_BELOW.search(elig)
+			if match:
+				high = min(high, int(match.group(1)))
+			if _mentions(text, _SCHOOL_CLASS) or _mentions(text, _SCHOOL_STUDENT):
+				low, high = max(low, SCHOOL_AGES[0]), min(high, SCHOOL_AGES[1])
+			if _mentions(text, _COLLEGE):
+				low, high = max(low, COLLEGE_AGES[0]), min(high, COLLEGE_AGES[1])
+			min_age[i], max_age[i] = min(low, NO_MAX_AGE), min(high, NO_MAX_AGE)
+		return cls(min_age, max_age, income_min, income_max, castes, genders, state)
+
+	def __len__(self) -> int:
+		return len(self.min_age)
+
+	@property
+	def nbytes(self) -> int:
+		return sum(a.nbytes for a in self._arrays())
+
+	def _arrays(self) -> Tuple[np.ndarray, ...]:
+		return (self.min_age, self.max_age, self.income_min, self.income_max, self.castes, self.genders, self.state)
+
+	def append(self, other: "EligibilityConstraints") -> None:
+		"""Add another set of schemes after this one's."""
+		merged = [np.concatenate([a, b]) for a, b in zip(self._arrays(), other._arrays())]
+		(self.min_age, self.max_age, self.income_min, self.income_max,
+			self.castes, self.genders, self.state) = merged
+
+	def mask(self, profile: Any) -> np.ndarray:
+		"""Boolean mask over all schemes: True where nothing rules the profile out."""
+		ok = np.ones(len(self), dtype=bool)
+		if profile.age:
+			ok &= (self.min_age <= profile.age) & (profile.age <= self.max_age)
+		if profile.income:
+			ok &= (self.income_min <= profile.income) & (profile.income <= self.income_max)
+		caste = profile.caste_group.lower() if profile.caste_group else ""
+		if caste:
+			bits = sum(1 << bit for bit, (group, _) in enumerate(CASTE_GROUPS) if group in caste)
+			ok &= (self.castes == 0) | ((self.castes & bits) != 0)
+		gender = profile_gender(profile.gender)
+		if gender is not None:
+			ok &= (self.genders == ANY_GENDER) | ((self.genders & gender) != 0)
+		state = normalize_state(profile.state)
+		if state is not None:
+			ok &= (self.state < 0) | (self.state == STATE_NAMES.index(state))
+		return ok
+
+	def mask_batch(self, profiles: Sequence[Any]) -> np.ndarray:
+		"""mask() of several profiles, shape (len(profiles), n_schemes)."""
+		if not profiles:
+			return np.ones((0, len(self)), dtype=bool)
+		return np.stack([self.mask(profile) for profile in profiles])
+
+
+def profile_gender(gender: Optional[str]) -> Optional[int]:
+	"""Gender bit of a free-text profile gender; 0 for other values, None when not given."""
+	g = gender.lower().strip() if gender else ""
+	if not g:
+		return None
+	if re.search(r"\btrans|non[-\s]?binary|genderqueer|third gender\b", g):
+		return TRANSGENDER
+	if g.startswith("f") or any(tag in g for tag in ("female", "women", "woman", "girl")):
+		return FEMALE
+	if g.startswith("m") or any(tag in g for tag in ("male", "man", "boy")):
+		return MALE
+	return 0
@@ -0,0 +1,461 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+# Columns joined (in this order) into the lower-cased text the eligibility rules look at
+ELIGIBILITY_COLUMNS = ["eligibility", "tags", "schemeCategory", "details", "benefits", "scheme_name"]
+
+# Per-scheme keyword features: a scheme has the feature if its text contains any of the keywords.
+# These mirror the substring checks in SchemeRecommender._eligibility_score one-for-one.
+KEYWORD_FEATURES: Dict[str, tuple] = {
+	"age_senior": ("60", "senior", "old age", "elderly", "pension"),
+	"has_45": ("45",),
+	"has_60": ("60",),
+	"age_range_45_60": ("45 – 60", "45-60"),
+	"adult": ("18", "adult"),
+	"youth": ("youth", "young"),
+	"child": ("child", "minor"),
+	"age": ("age",),
+	"female": ("female", "women", "woman", "ladies"),
+	"male": ("male", "men", "man"),
+	"transgender": ("transgender",),
+	"gender_any": ("female", "women", "male", "men", "gender"),
+	"mentions_women": ("women", "woman", "female", "girl"),
+	"mentions_men": ("men", "man", "male", "boy"),
+	"mentions_trans": ("transgender", "third gender", "trans gender", "trans person", "trans-"),
+	"bpl": ("bpl", "below poverty", "economically weaker", "ews"),
+	"apl": ("apl", "above poverty"),
+	"income": ("income",),
+	"low_income": ("low income",),
+	"sc": ("sc", "scheduled caste"),
+	"st": ("st", "scheduled tribe"),
+	"obc": ("obc",),
+	"backward_class": ("backward class",),
+	"minority": ("minority",),
+	"kapu": ("kapu",),
+	"general": ("general",),
+	"caste_any": ("sc", "st", "obc", "minority", "caste", "category"),
+	"farmer": ("farmer", "agriculture", "farming", "crop"),
+	"student": ("student", "education", "scholarship", "school", "college"),
+	"weaver": ("weaver",),
+	"lawyer": ("advocate", "lawyer"),
+	"teacher": ("teacher", "educator"),
+	"doctor": ("doctor", "medical"),
+	"engineer": ("engineer",),
+	"business": ("entrepreneur", "business", "startup"),
+	"unemployed": ("unemployed", "jobless"),
+	"employment": ("employment", "job"),
+}
+
+FEATURE_NAMES: List[str] = list(KEYWORD_FEATURES) + ["level_central"]
+
+# Below this many (query, text) pairs a fuzzy batch runs on the calling thread; thread start-up
+# would cost more than it saves
+_PARALLEL_MIN_PAIRS = 2000
+
+
+# Joins the strings of PackedTexts; one inside a string is read as a space
+_SEPARATOR = "\x00"
+
+
+def contains(texts: Sequence[str], needle: str) -> np.ndarray:
+	if isinstance(texts, PackedTexts):
+		return texts.contains(needle)
+	return np.fromiter((needle in t for t in texts), dtype=bool, count=len(texts))
+
+
+class PackedTexts:
+	"""A sequence of strings held as one: their joined text and where each one starts.
+
+	A list of str is one refcounted object per string, and reading them writes to the
+	pages holding every one; a single str keeps its count in one header, so the text of
+	a model forked into workers stays shared (see SchemeRecommender.compact_vocabulary).
+	A substring test finds each match in the joined text and skips to the next string:
+	about as fast as testing every string when the needle is rare, slower when most
+	strings hold it.
+	"""
+
+	def __init__(self, texts: Sequence[str]):
+		self.joined = _SEPARATOR.join(texts)
+		if self.joined.count(_SEPARATOR) != max(len(texts) - 1, 0):
+			texts = [t.replace(_SEPARATOR, " ") for t in texts]
+			self.joined = _SEPARATOR.join(texts)
+		self.starts = np.zeros(len(texts) + 1, dtype=np.int64)
+		np.cumsum(np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts)), out=self.starts[1:])
+
+	def __len__(self) -> int:
+		return len(self.starts) - 1
+
+	def __getitem__(self, i: int) -> str:
+		return self.joined[self.starts[i]:self.starts[i + 1] - 1]
+
+	def take(self, rows: Sequence[int]) -> List[str]:
+		return [self[i] for i in rows]
+
+	def all(self) -> List[str]:
+		return self.joined.split(_SEPARATOR) if len(self) else []
+
+	def contains(self, needle: str) -> np.ndarray:
+		"""Whether each string contains ``needle``, like ``needle in s`` for every one."""
+		if not needle:
+			return np.ones(len(self), dtype=bool)
+		hits = np.zeros(len(self), dtype=bool)
+		if _SEPARATOR in needle:
+			return hits
+		# A match never spans two strings; after one, the search resumes at the next string
+		starts, find = self.starts, self.joined.find
+		at = find(needle)
+		while at >= 0:
+			row = int(starts.searchsorted(at, side="right")) - 1
+			hits[row] = True
+			at = find(needle, int(starts[row + 1]))
+		return hits
+
+	def truncated(self, max_chars: int) -> "PackedTexts":
+		return PackedTexts([t[:max_chars] for t in self.all()])
+
+	def __add__(self, other: "PackedTexts") -> "PackedTexts":
+		return PackedTexts(self.all() + other.all())
+
+
+class EligibilityEngine:
+	"""Vectorised equivalent of SchemeRecommender._eligibility_score.
+
+	Keyword checks against each scheme's text are evaluated once, when the engine is
+	built, into a boolean feature matrix (one row per entry in FEATURE_NAMES, one
+	column per scheme). Scoring a profile then combines feature rows with the
+	profile's conditions using NumPy, in the same order and with the same weights as
+	the per-row function, so the results are bit-for-bit identical. Only the checks
+	that depend on free profile text (interests, state, fuzzy matching) touch the
+	scheme texts at request time.
+
+	Fuzzy matching compares every profile in a batch against every candidate text in
+	one rapidfuzz ``process.cdist`` call per scorer, spread over ``fuzzy_workers``
+	threads (-1 uses every core). ``fuzzy_max_chars`` truncates the texts used for
+	fuzzy matching only; the default None keeps the full texts and exact parity with
+	_eligibility_score.
+
+	Only the feature matrix and the fuzzy settings are pickled. An unpickled engine gets
+	its texts from ``text_source`` (called with the number of schemes) the first time it
+	scores; SchemeRecommender.load() points it at the scheme store, which holds the same
+	text, so the artifact does not carry it twice.
+	"""
+
+	def __init__(
+		self,
+		texts: List[str],
+		levels: List[str],
+		fuzzy_max_chars: Optional[int] = None,
+		fuzzy_workers: int = -1,
+	):
+		self.fuzzy_max_chars = fuzzy_max_chars
+		self.fuzzy_workers = fuzzy_workers
+		self.text_source: Optional[Callable[[int], List[str]]] = None
+		self._texts: Optional[PackedTexts] = PackedTexts(texts)
+		self._fuzzy_cache: Optional[PackedTexts] = None
+		features = np.zeros((len(FEATURE_NAMES), len(texts)), dtype=bool)
+		for i, keywords in enumerate(KEYWORD_FEATURES.values()):
+			for kw in keywords:
+				features[i] |= contains(texts, kw)
+		features[FEATURE_NAMES.index("level_central")] = contains(levels, "central")
+		self.features = features
+		self._feature_index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+	def __len__(self) -> int:
+		return self.features.shape[1]
+
+	def __setstate__(self, state):
+		# Engines pickled before fuzzy matching was configurable get the exact defaults;
+		# ones pickled with their texts (a list of str) keep them
+		state.setdefault("fuzzy_max_chars", None)
+		state.setdefault("fuzzy_workers", -1)
+		texts = state.pop("texts", None)
+		self.__dict__.update(state)
+		self.text_source = None
+		self._texts = PackedTexts(texts) if texts is not None else None
+		self._fuzzy_cache = None
+		self._feature_index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		for name in ("_feature_index", "_texts", "_fuzzy_cache", "text_source"):
+			state.pop(name, None)
+		return state
+
+	@property
+	def texts(self) -> PackedTexts:
+		"""The lower-cased text of every scheme, read through text_source if not yet held."""
+		if self._texts is None:
+			if self.text_source is None:
+				raise RuntimeError("EligibilityEngine has no scheme texts: set text_source after unpickling it")
+			texts = self.text_source(len(self))
+			if len(texts) != len(self):
+				raise ValueError(f"text_source returned {len(texts)} texts for {len(self)} schemes")
+			self._texts, self.text_source = PackedTexts(texts), None
+		return self._texts
+
+	@property
+	def fuzzy_texts(self) -> PackedTexts:
+		if self.fuzzy_max_chars is None:
+			return self.texts
+		if self._fuzzy_cache is None:
+			self._fuzzy_cache = self.texts.truncated(self.fuzzy_max_chars)
+		return self._fuzzy_cache
+
+	def append(self, texts: List[str], levels: List[str]) -> None:
+		"""Add schemes at the end, as if they had been part of the texts the engine was built from.
+
+		Only the new schemes' own texts are matched against the keywords.
+		"""
+		extra = EligibilityEngine(texts, levels, self.fuzzy_max_chars, self.fuzzy_workers)
+		self._texts = self.texts + extra.texts
+		self._fuzzy_cache = None
+		self.features = np.concatenate([self.features, extra.features], axis=1)
+
+	def configure_fuzzy(self, max_chars: Optional[int] = None, workers: Optional[int] = None) -> None:
+		"""Change the fuzzy text-length cap (None for exact scores) and, if given, the thread count."""
+		self.fuzzy_max_chars = max_chars
+		if workers is not None:
+			self.fuzzy_workers = workers
+		self._fuzzy_cache = None
+
+	def _fuzzy(self, scorer, queries: Dict[int, str], positions: Optional[np.ndarray]) -> Dict[int, np.ndarray]:
+		# Scores of each profile's query against its candidate texts, keyed by profile index.
+		# Profiles that share the full catalogue go through a single cdist call.
+		if not queries:
+			return {}
+
+		def cdist(qs: List[str], choices: List[str]) -> np.ndarray:
+			workers = self.fuzzy_workers if len(qs) * len(choices) >= _PARALLEL_MIN_PAIRS else 1
+			return process.cdist(qs, choices, scorer=scorer, dtype=np.float64, workers=workers)
+
+		fuzzy_texts = self.fuzzy_texts
+		if positions is None:
+			order = list(queries)
+			return dict(zip(order, cdist([queries[p] for p in order], fuzzy_texts.all())))
+		return {
+			p: cdist([q], fuzzy_texts.take(positions[p]))[0]
+			for p, q in queries.items()
+		}
+
+	def score(self, profile: Any, positions: Optional[np.ndarray] = None) -> np.ndarray:
+		"""Eligibility score of every scheme (or of the given row positions) for a profile."""
+		if positions is not None:
+			positions = np.asarray(positions)[None, :]
+		return self.score_batch([profile], positions)[0]
+
+	def score_batch(self, profiles: Sequence[Any], positions: Optional[np.ndarray] = None) -> np.ndarray:
+		"""Eligibility scores for several profiles at once, shape (len(profiles), n_candidates).
+
+		``positions`` is an optional (n_profiles, n_candidates) array of scheme row
+		positions to score for each profile; by default every scheme is scored. Rule
+		blocks that only apply to some profiles (age given, gender given, ...) are
+		masked per profile, so each element accumulates exactly the same sequence of
+		weights as the scalar function.
+		"""
+		if positions is not None:
+			positions = np.asarray(positions)
+		totals = self._keyword_pass(profiles, positions)
+
+		def texts_for(p: int) -> Sequence[str]:
+			return self.texts if positions is None else self.texts.take(positions[p])
+
+		central = self.features[self._feature_index["level_central"]]
+
+		# Interests and fuzzy matching depend on free profile text; the fuzzy ratios for the
+		# whole batch are computed up front and then added per profile in scalar order
+		interest_queries = {p: " ".join(pr.interests).lower() for p, pr in enumerate(profiles) if pr.interests}
+		interest_ratios = self._fuzzy(fuzz.partial_ratio, interest_queries, positions)
+		for p, pr in enumerate(profiles):
+			if not pr.interests:
+				continue
+			texts = texts_for(p)
+			for interest in pr.interests:
+				totals.add_row(p, contains(texts, interest.lower()), 0.5)
+			ratio = interest_ratios[p]
+			totals.add_row(p, ratio > 40, (ratio / 100.0) * 0.4)
+
+		for p, pr in enumerate(profiles):
+			if not pr.state:
+				continue
+			st = pr.state.lower()
+			state_match = contains(texts_for(p), st)
+			totals.total_weight[p] += 0.7
+			totals.score[p] += np.where(state_match, 0.7, 0.0)
+			totals.matches[p] += state_match
+			totals.add_row(p, central if positions is None else central[positions[p]], 0.5)
+
+		profile_queries = {}
+		for p, pr in enumerate(profiles):
+			profile_text = pr.to_query_text()
+			if profile_text:
+				profile_queries[p] = profile_text.lower()
+		token_ratios = self._fuzzy(fuzz.token_set_ratio, profile_queries, positions)
+		partial_ratios = self._fuzzy(fuzz.partial_ratio, profile_queries, positions)
+		ratio_ratios = self._fuzzy(fuzz.ratio, profile_queries, positions)
+		for p in profile_queries:
+			best_ratio = np.maximum(np.maximum(token_ratios[p], partial_ratios[p] * 0.8), ratio_ratios[p] * 0.7)
+			totals.add_row(p, best_ratio > 20, (best_ratio / 100.0) * 0.8)
+
+		return totals.final()
+
+	def bounds_batch(self, profiles: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+		"""Lower and upper bounds on every scheme's score, without any text matching.
+
+		Only the keyword feature rules are evaluated. The interest, state and fuzzy rules
+		are bounded instead: each of them either adds nothing or adds a weight to both the
+		score and the total (the state rule always adds to the total). Since score <= total,
+		adding the same weight to both can only raise the ratio. So the lower bound assumes
+		none of them fire and the upper bound assumes all fire at their largest weight.
+		"""
+		totals = self._keyword_pass(profiles, None)
+		n_profiles = len(profiles)
+		has_state = np.array([bool(pr.state) for pr in profiles]).reshape(n_profiles, 1)
+		central = self.features[self._feature_index["level_central"]][None, :] & has_state
+		n_interests = np.array([len(pr.interests) if pr.interests else 0 for pr in profiles])
+		optional_weight = (
+			0.5 * n_interests
+			+ 0.4 * (n_interests > 0)
+			+ 0.7 * has_state[:, 0]
+			+ 0.8 * np.array([bool(pr.to_query_text()) for pr in profiles])
+		).reshape(n_profiles, 1)
+		optional_count = (
+			n_interests + (n_interests > 0) + has_state[:, 0]
+			+ np.array([bool(pr.to_query_text()) for pr in profiles])
+		).reshape(n_profiles, 1)
+
+		score = totals.score + np.where(central, 0.5, 0.0)
+		total_weight = totals.total_weight + np.where(central, 0.5, 0.0)
+		matches = totals.matches + central
+		lower = _final_score(score, total_weight + 0.7 * has_state, matches, totals.penalty)
+		upper = _final_score(score + optional_weight, total_weight + optional_weight, matches + optional_count, totals.penalty)
+		return lower, upper
+
+	def _keyword_pass(self, profiles: Sequence[Any], positions: Optional[np.ndarray]) -> "_Totals":
+		# Every rule that only needs the precomputed keyword features, in scalar-function order
+		n_profiles = len(profiles)
+		n = len(self) if positions is None else positions.shape[1]
+		totals = _Totals((n_profiles, n))
+
+		def f(name: str) -> np.ndarray:
+			row = self.features[self._feature_index[name]]
+			return row[None, :] if positions is None else row[positions]
+
+		def col(values) -> np.ndarray:
+			# One value per profile, shaped to broadcast against (n_profiles, n)
+			return np.asarray(values).reshape(n_profiles, 1)
+
+		add = totals.add
+		add_where = totals.add_where
+
+		has_age = col([pr.age is not None for pr in profiles])
+		age = col([pr.age if pr.age is not None else np.nan for pr in profiles]).astype(float)
+		with np.errstate(invalid="ignore"):
+			add(f("age_senior") & (age >= 60), 1.2, has_age)
+			add(((f("has_45") & f("has_60")) | f("age_range_45_60")) & ((45 <= age) & (age <= 60)), 1.0, has_age)
+			add(f("adult") & (age >= 18), 0.5, has_age)
+			add(f("youth") & ((18 <= age) & (age <= 35)), 0.7, has_age)
+			add(f("child") & (age < 18), 0.8, has_age)
+		add_where(f("age"), 0.3, has_age)
+
+		g_lowers = [pr.gender.lower() if pr.gender else "" for pr in profiles]
+		has_gender = col([bool(g) for g in g_lowers])
+		add(col([g.startswith("f") for g in g_lowers]) & f("female"), 1.2, has_gender)
+		add(col([g.startswith("m") for g in g_lowers]) & f("male"), 0.8, has_gender)
+		add(f("transgender") & col(["trans" in g for g in g_lowers]), 1.0, has_gender)
+		add_where(~f("gender_any"), 0.2, has_gender)
+
+		female_match = col([bool(g) and (g.startswith("f") or "women" in g or "female" in g) for g in g_lowers])
+		male_match = col([bool(g) and (g.startswith("m") or "male" in g or "man" in g) for g in g_lowers])
+		trans_match = col([
+			bool(g) and any(tag in g for tag in ["trans", "non-binary", "nonbinary", "genderqueer", "third gender"])
+			for g in g_lowers
+		])
+		totals.penalty = np.maximum(totals.penalty, np.where(f("mentions_trans") & ~trans_match, 0.7, 0.0))
+		totals.penalty = np.maximum(totals.penalty, np.where(f("mentions_women") & ~f("mentions_men") & ~female_match, 0.6, 0.0))
+		totals.penalty = np.maximum(totals.penalty, np.where(f("mentions_men") & ~f("mentions_women") & ~male_match, 0.5, 0.0))
+
+		has_income = col([pr.income is not None for pr in profiles])
+		income = col([pr.income if pr.income is not None else np.nan for pr in profiles]).astype(float)
+		with np.errstate(invalid="ignore"):
+			add(f("bpl") & (income <= 150000), 1.0, has_income)
+			add(f("apl") & (income > 150000), 0.6, has_income)
+			add(f("income") & (income <= 300000), 0.5, has_income)
+			add(f("low_income") & (income <= 500000), 0.4, has_income)
+		add_where(f("income"), 0.3, has_income)
+
+		cgs = [pr.caste_group.lower() if pr.caste_group else "" for pr in profiles]
+		has_caste = col([bool(pr.caste_group) for pr in profiles])
+		add(f("sc") & col(["sc" in cg for cg in cgs]), 1.0, has_caste)
+		add(f("st") & col(["st" in cg for cg in cgs]), 1.0, has_caste)
+		add(
+			(f("obc") & col(["obc" in cg for cg in cgs]))
+			| (f("backward_class") & col(["obc" in cg or "bc" in cg for cg in cgs])),
+			1.0, has_caste,
+		)
+		minority_terms = ["minority", "muslim", "christian", "sikh", "jain", "buddhist"]
+		add(f("minority") & col([any(x in cg for x in minority_terms) for cg in cgs]), 0.8, has_caste)
+		add(f("kapu") & col(["kapu" in cg for cg in cgs]), 1.0, has_caste)
+		add(f("general") & col(["general" in cg for cg in cgs]), 0.6, has_caste)
+		add_where(~f("caste_any"), 0.3, has_caste)
+
+		occs = [pr.occupation.lower() if pr.occupation else "" for pr in profiles]
+		has_occ = col([bool(pr.occupation) for pr in profiles])
+		add(f("farmer") & col(["farm" in o or "agricult" in o for o in occs]), 1.2, has_occ)
+		add(f("student") & col(["student" in o or "school" in o or "study" in o for o in occs]), 1.0, has_occ)
+		add(f("weaver") & col(["weav" in o for o in occs]), 1.0, has_occ)
+		add(f("lawyer") & col(["law" in o or "advocat" in o for o in occs]), 0.9, has_occ)
+		add(f("teacher") & col(["teach" in o for o in occs]), 0.9, has_occ)
+		add(f("doctor") & col(["medic" in o for o in occs]), 0.9, has_occ)
+		add(f("engineer") & col(["engineer" in o for o in occs]), 0.8, has_occ)
+		add(f("business") & col(["business" in o or "entrepreneur" in o or "trader" in o for o in occs]), 0.9, has_occ)
+		add(f("unemployed") & col(["unemployed" in o or "jobless" in o for o in occs]), 0.8, has_occ)
+		add_where(f("employment"), 0.4, has_occ)
+
+		return totals
+
+
+class _Totals:
+	"""Running score / total weight / match count per (profile, scheme) cell."""
+
+	def __init__(self, shape: Tuple[int, int]):
+		self.score = np.zeros(shape)
+		self.total_weight = np.zeros(shape)
+		self.matches = np.zeros(shape, dtype=np.int64)
+		self.penalty = np.zeros(shape)
+
+	def add(self, cond, weight, active) -> None:
+		# add(cond, weight) from the scalar version: weight always counts towards the total
+		cond = cond & active
+		self.total_weight += np.where(active, weight, 0.0)
+		self.score += np.where(cond, weight, 0.0)
+		self.matches += cond
+
+	def add_where(self, mask, weight, active) -> None:
+		# `if <text condition>: add(True, weight)` from the scalar version
+		mask = mask & active
+		contribution = np.where(mask, weight, 0.0)
+		self.total_weight += contribution
+		self.score += contribution
+		self.matches += mask
+
+	def add_row(self, p: int, mask: np.ndarray, weight) -> None:
+		# add_where() restricted to a single profile's row
+		contribution = np.where(mask, weight, 0.0)
+		self.total_weight[p] += contribution
+		self.score[p] += contribution
+		self.matches[p] += mask
+
+	def final(self) -> np.ndarray:
+		return _final_score(self.score, self.total_weight, self.matches, self.penalty)
+
+
+def _final_score(score: np.ndarray, total_weight: np.ndarray, matches: np.ndarray, penalty: np.ndarray) -> np.ndarray:
+	baseline = 0.15
+	with np.errstate(divide="ignore", invalid="ignore"):
+		weighted_score = np.where(total_weight > 0, np.minimum(1.0, score / total_weight), 0.0)
+	match_boost = np.minimum(0.2, matches * 0.05)
+	final_score = np.minimum(1.0, baseline + weighted_score * 0.7 + match_boost)
+	return np.where(penalty > 0, np.maximum(0.0, final_score - penalty), final_score)
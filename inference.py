@@ -41,16 +41,36 @@
 # 	recs = recommend(model, json.loads(args.profile), top_k=args.top_k)
 # 	print(json.dumps(recs, ensure_ascii=False, indent=2))
 import json
-from typing import List, Dict, Any
-from recommender import SchemeRecommender, UserProfile
+from typing import List, Dict, Any, Optional
+from recommender import DEFAULT_CANDIDATE_BUDGET, SchemeRecommender, UserProfile
+from ranking_cache import Ranking, RankingCache
+from result_cache import MemoryCacheBackend, ResultCache, SqliteCacheBackend
+from scheme_store import LEAN_FIELDS, RECORD_FIELDS
+import timing
 
 
-def load_model(model_path: str) -> SchemeRecommender:
-    return SchemeRecommender.load(model_path)
+def load_model(model_path: str, cache: Optional[ResultCache] = None, timings: bool = False, ranking_cache: Optional[RankingCache] = None) -> SchemeRecommender:
+    model = SchemeRecommender.load(model_path, timings=timings)
+    model.result_cache = cache
+    model.ranking_cache = ranking_cache
+    return model
 
 
-def recommend(model: SchemeRecommender, profile: Dict[str, Any], top_k: int = 10) -> List[Dict[str, Any]]:
-    user = UserProfile(
+def make_cache(kind: Optional[str], size: int = 1024, ttl: Optional[float] = 600.0, path: Optional[str] = None) -> Optional[ResultCache]:
+    """Result cache for --cache: None, "memory" (per process) or "sqlite" (shared file)."""
+    if not kind or kind == "none":
+        return None
+    if kind == "memory":
+        backend = MemoryCacheBackend(max_entries=size)
+    elif kind == "sqlite":
+        backend = SqliteCacheBackend(path or "artifacts/recommendation_cache.sqlite", max_entries=size)
+    else:
+        raise ValueError(f"Unknown cache backend: {kind}")
+    return ResultCache(backend, ttl_seconds=ttl if ttl and ttl > 0 else None)
+
+
+def to_user_profile(profile: Dict[str, Any]) -> UserProfile:
+    return UserProfile(
         name=profile.get("name"),
         phone=profile.get("phone"),
         age=profile.get("age"),
@@ -62,13 +82,92 @@ def recommend(model: SchemeRecommender, profile: Dict[str, Any], top_k: int = 10
         interests=profile.get("interests"),
         previous_applications=profile.get("previous_applications"),
     )
-    df = model.recommend(user, top_k=top_k)
-    cols = [c for c in [
-        "scheme_name", "slug", "level", "schemeCategory", "tags",
-        "details", "benefits", "eligibility", "application", "documents",
-        "score_hybrid", "score_content", "score_eligibility", "score_popularity"
-    ] if c in df.columns]
-    return df[cols].to_dict(orient="records")
+
+
+SCORE_FIELDS = ["score_hybrid", "score_content", "score_eligibility", "score_popularity"]
+SIMILAR_SCORE_FIELDS = ["score_similarity"]
+
+
+def to_records(df, lean: bool = False, score_fields: List[str] = SCORE_FIELDS) -> List[Dict[str, Any]]:
+    cols = [c for c in (LEAN_FIELDS if lean else RECORD_FIELDS) + score_fields if c in df.columns]
+    # Column lists zipped into dicts: same values as to_dict(orient="records"), without its per-cell boxing
+    values = [df[c].tolist() for c in cols]
+    return [dict(zip(cols, row)) for row in zip(*values)]
+
+
+def recommend(model: SchemeRecommender, profile: Dict[str, Any], top_k: int = 10, candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET, timings: bool = False, quick: bool = False, hard_filter: bool = False, lean: bool = False, paginate: bool = False):
+    """Result records; with timings=True, {"results": records, "timings": per-stage ms}.
+
+    quick=True serves quick-recommendation profiles from the model's quick table when it
+    covers them (no timings then). hard_filter=True leaves out schemes the profile is
+    not eligible for (see SchemeRecommender.recommend). lean=True returns only slugs,
+    names and scores; get_schemes() fetches the other fields. paginate=True (which
+    needs the model's ranking_cache, and skips the quick table) returns the first page
+    as {"results", "next_cursor"}; recommend_page() gets the next ones.
+    """
+    if quick and not paginate:
+        records = quick_lookup(model, profile, top_k, hard_filter, lean)
+        if records is not None:
+            return {"results": records, "timings": None} if timings else records
+    df = model.recommend(to_user_profile(profile), top_k=top_k, candidate_budget=candidate_budget, timings=timings, hard_filter=hard_filter, lean=lean, paginate=paginate)
+    if paginate:
+        return to_page(df, lean, timings)
+    if timings:
+        return {"results": to_records(df, lean), "timings": df.attrs.get("timings")}
+    return to_records(df, lean)
+
+
+def to_page(df, lean: bool = False, timings: bool = False) -> Dict[str, Any]:
+    page = {"results": to_records(df, lean), "next_cursor": df.attrs.get("next_cursor")}
+    if timings:
+        page["timings"] = df.attrs.get("timings")
+    return page
+
+
+def recommend_page(model: SchemeRecommender, cursor: str, top_k: int = 10, lean: bool = False) -> Dict[str, Any]:
+    """{"results", "next_cursor"} of the page a cursor points at; see SchemeRecommender.recommend_page."""
+    return to_page(model.recommend_page(cursor, top_k=top_k, lean=lean), lean)
+
+
+def paginate(model: SchemeRecommender, ranking: Ranking, top_k: int = 10, lean: bool = False, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """First page of a ranking made elsewhere (e.g. a worker process) for model's ranking_cache."""
+    page = to_page(model.paginate(ranking, top_k=top_k, lean=lean), lean)
+    if timings is not None:
+        page["timings"] = timings
+    return page
+
+
+def quick_lookup(model: SchemeRecommender, profile: Dict[str, Any], top_k: int = 10, hard_filter: bool = False, lean: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """Records from the model's quick table, or None if the table does not cover the profile."""
+    df = model.lookup_quick(to_user_profile(profile), top_k=top_k, hard_filter=hard_filter, lean=lean)
+    return None if df is None else to_records(df, lean)
+
+
+def recommend_batch(model: SchemeRecommender, profiles: List[Dict[str, Any]], top_k: int = 10, batch_size: int = 64, candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET, timings: bool = False, hard_filter: bool = False, lean: bool = False):
+    frames = model.recommend_batch([to_user_profile(p) for p in profiles], top_k=top_k, batch_size=batch_size, candidate_budget=candidate_budget, timings=timings, hard_filter=hard_filter, lean=lean)
+    if timings:
+        return [{"results": to_records(df, lean), "timings": df.attrs.get("timings")} for df in frames]
+    return [to_records(df, lean) for df in frames]
+
+
+def similar(model: SchemeRecommender, slug: str, top_k: int = 10, lean: bool = False) -> List[Dict[str, Any]]:
+    """Records of the schemes most similar to a scheme, with score_similarity; KeyError for unknown slugs."""
+    return to_records(model.similar(slug, k=top_k, lean=lean), lean, SIMILAR_SCORE_FIELDS)
+
+
+def get_schemes(model: SchemeRecommender, slugs: List[str], fields: Optional[List[str]] = None) -> List[Optional[Dict[str, Any]]]:
+    """Scheme fields by slug (all record fields by default); None for unknown slugs."""
+    return model.get_schemes(slugs, fields)
+
+
+def read_profiles_jsonl(path: str) -> List[Dict[str, Any]]:
+    profiles = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                profiles.append(json.loads(line))
+    return profiles
 
 
 if __name__ == "__main__":
@@ -77,21 +176,100 @@ if __name__ == "__main__":
     parser.add_argument("--model", default="artifacts/scheme_recommender.joblib", help="Path to saved model")
     parser.add_argument("--profile", help="User profile as JSON string")
     parser.add_argument("--profile_file", help="Path to JSON file containing user profile")
+    parser.add_argument("--profiles_file", help="Path to JSONL file with one user profile per line; prints one JSON result list per line")
+    parser.add_argument("--batch_size", type=int, default=64, help="Profiles scored together in --profiles_file mode")
+    parser.add_argument("--candidate_budget", type=int, default=DEFAULT_CANDIDATE_BUDGET, help="Max schemes fully scored per profile after pruning (0 scores every scheme)")
     parser.add_argument("--top_k", type=int, default=10, help="Number of recommendations to return")
+    parser.add_argument("--quick", action="store_true", help="Answer from the model's quick-recommendation table when it covers the profile")
+    parser.add_argument("--hard_filter", action="store_true", help="Leave out schemes whose age/income/caste/gender/state limits exclude the profile")
+    parser.add_argument("--lean", action="store_true", help="Return only slugs, names and scores (compact JSON)")
+    parser.add_argument("--schemes", nargs="+", metavar="SLUG", help="Print the stored fields of these schemes instead of recommending")
+    parser.add_argument("--fields", nargs="+", default=None, help="Fields printed by --schemes (default: all)")
+    parser.add_argument("--similar", metavar="SLUG", help="Print the --top_k schemes most similar to this scheme instead of recommending")
+    parser.add_argument("--serve", choices=["stdio", "http"], help="Keep the model loaded and serve requests instead of exiting")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for --serve http")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --serve http")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent in-flight requests for --serve")
+    parser.add_argument("--processes", type=int, default=0, help="Score --serve requests in this many pre-forked worker processes sharing one model (Unix)")
+    parser.add_argument("--micro_batch", action="store_true", help="Coalesce concurrent --serve requests into batched scoring passes")
+    parser.add_argument("--max_batch_size", type=int, default=32, help="Flush a micro-batch once this many requests are waiting")
+    parser.add_argument("--max_wait_ms", type=float, default=5.0, help="Flush a micro-batch this long after its first request")
+    parser.add_argument("--max_queue", type=int, default=1024, help="Requests waiting for a micro-batch before new ones are rejected")
+    parser.add_argument("--cache", choices=["none", "memory", "sqlite"], default="none", help="Cache rankings by profile fingerprint")
+    parser.add_argument("--cache_size", type=int, default=1024, help="Max cached rankings")
+    parser.add_argument("--cache_ttl", type=float, default=600.0, help="Seconds a cached ranking stays valid (0 = until evicted)")
+    parser.add_argument("--cache_path", default="artifacts/recommendation_cache.sqlite", help="File for --cache sqlite, shared by all workers")
+    parser.add_argument("--page_ttl", type=float, default=300.0, help="Seconds a --serve pagination cursor stays valid after its last page (0 = until evicted)")
+    parser.add_argument("--page_cache_mb", type=float, default=64.0, help="Memory for the rankings behind --serve pagination cursors")
+    parser.add_argument("--page_depth", type=int, default=200, help="Schemes ranked per paginated --serve request (0 = every scheme, scored in full)")
+    parser.add_argument("--reload_interval", type=float, default=0.0, help="Check the --model artifact this often (seconds) in --serve mode and hot-reload new versions (0 = never)")
+    parser.add_argument("--warmup_file", default=None, help="JSONL profiles a reloaded model answers before it is swapped in (default: a few built-in ones)")
+    parser.add_argument("--timings", action="store_true", help="Wrap output as {\"results\", \"timings\"} with per-stage milliseconds")
+    parser.add_argument("--profile_out", default=None, help="Write a cProfile dump of the whole run to this file")
     args = parser.parse_args()
+    cache = make_cache(args.cache, size=args.cache_size, ttl=args.cache_ttl, path=args.cache_path)
 
-    # Load model
-    model = load_model(args.model)
+    if args.serve:
+        import serving
+        batching = None
+        warmup = read_profiles_jsonl(args.warmup_file) if args.warmup_file else None
+        # Rankings behind pagination cursors live in this (the parent) process, also with --processes
+        pages = RankingCache(ttl_seconds=args.page_ttl or None, max_bytes=int(args.page_cache_mb * (1 << 20)), depth=args.page_depth)
+        if args.micro_batch:
+            batching = {"max_batch_size": args.max_batch_size, "max_wait_ms": args.max_wait_ms, "max_queue": args.max_queue}
+        if args.processes:
+            # Workers get their own caches (see WorkerPool) and are forked right after
+            # loading, before any request thread exists, so load in the foreground
+            cache_spec = {"kind": args.cache, "size": args.cache_size, "ttl": args.cache_ttl, "path": args.cache_path}
+            service = serving.RecommendationService(args.model, batching=batching, processes=args.processes, cache_spec=cache_spec, warmup_profiles=warmup, ranking_cache=pages)
+            service.load()
+        else:
+            service = serving.RecommendationService(args.model, cache=cache, batching=batching, warmup_profiles=warmup, ranking_cache=pages)
+            service.load_in_background()
+        if args.reload_interval > 0:
+            service.watch(args.reload_interval)
+        if args.serve == "stdio":
+            serving.serve_stdio(service, workers=max(args.workers, args.processes))
+        else:
+            serving.serve_http(service, host=args.host, port=args.port)
+        raise SystemExit(0)
 
-    # Load profile (from file if provided, else from string)
-    if args.profile_file:
-        with open(args.profile_file, "r", encoding="utf-8") as f:
-            profile = json.load(f)
-    elif args.profile:
-        profile = json.loads(args.profile)
-    else:
-        raise ValueError("Either --profile or --profile_file must be provided")
+    def run():
+        # Load model
+        model = load_model(args.model, cache=cache, timings=args.timings)
+        candidate_budget = args.candidate_budget or None
+
+        if args.schemes:
+            print(json.dumps(get_schemes(model, args.schemes, args.fields), ensure_ascii=False))
+            return
+
+        if args.similar:
+            print(json.dumps(similar(model, args.similar, top_k=args.top_k, lean=args.lean), ensure_ascii=False))
+            return
 
-    # Run recommendation
-    recs = recommend(model, profile, top_k=args.top_k)
-    print(json.dumps(recs, ensure_ascii=False, indent=2))
+        if args.profiles_file:
+            profiles = read_profiles_jsonl(args.profiles_file)
+            for recs in recommend_batch(model, profiles, top_k=args.top_k, batch_size=args.batch_size, candidate_budget=candidate_budget, timings=args.timings, hard_filter=args.hard_filter, lean=args.lean):
+                print(json.dumps(recs, ensure_ascii=False))
+            return
+
+        # Load profile (from file if provided, else from string)
+        if args.profile_file:
+            with open(args.profile_file, "r", encoding="utf-8") as f:
+                profile = json.load(f)
+        elif args.profile:
+            profile = json.loads(args.profile)
+        else:
+            raise ValueError("Either --profile or --profile_file must be provided")
+
+        # Run recommendation
+        recs = recommend(model, profile, top_k=args.top_k, candidate_budget=candidate_budget, timings=args.timings, quick=args.quick, hard_filter=args.hard_filter, lean=args.lean)
+        if args.timings:
+            recs["load_timings"] = model.load_timings
+        print(json.dumps(recs, ensure_ascii=False, indent=None if args.lean else 2))
+
+    if args.profile_out:
+        with timing.profile_to(args.profile_out):
+            run()
+    else:
+        run()
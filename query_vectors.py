@@ -0,0 +1,168 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class _Fragment:
+	"""Analysed fragment: its tokens (after stop words) and the n-gram counts inside it."""
+
+	__slots__ = ("tokens", "counts")
+
+	def __init__(self, tokens: Tuple[str, ...], counts: Tuple[Tuple[int, int], ...]):
+		self.tokens = tokens
+		self.counts = counts
+
+
+class QueryVectorizer:
+	"""TF-IDF query vectors composed from cached per-fragment term counts.
+
+	A query is a space-joined list of fragments (profile values and keyword expansions).
+	Tokens never span the space between two fragments, so the query's term counts are
+	the sum of its fragments' counts plus the n-grams that straddle a fragment boundary,
+	which are counted from the fragments' cached tokens. The summed counts then go
+	through the fitted vectorizer's own IDF weighting and normalisation, so the result
+	equals ``vectorizer.transform([" ".join(fragments)])`` exactly.
+
+	``fixed`` fragments are analysed up front and kept; any other fragment (free text
+	such as interests) is analysed on first use and kept in a bounded LRU. Fragments
+	are keyed by their exact text.
+	"""
+
+	def __init__(self, vectorizer, fixed: Iterable[str] = (), max_cached: int = 4096):
+		self.vectorizer = vectorizer
+		self.max_cached = max_cached
+		self._preprocess = vectorizer.build_preprocessor()
+		self._tokenize = vectorizer.build_tokenizer()
+		self._stop_words = vectorizer.get_stop_words()
+		self._min_n, self._max_n = vectorizer.ngram_range
+		self._vocabulary = vectorizer.vocabulary_
+		self._n_features = len(vectorizer.idf_) if vectorizer.use_idf else len(vectorizer.vocabulary_)
+		self._idf = np.asarray(vectorizer.idf_) if vectorizer.use_idf else None
+		self._fast_weighting = not vectorizer.sublinear_tf and vectorizer.norm in ("l2", None)
+		self._lock = threading.Lock()
+		self._cached: "OrderedDict[str, _Fragment]" = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self._fixed: Dict[str, _Fragment] = {}
+		for text in fixed:
+			self._fixed[text] = self._analyse(text)
+
+	@staticmethod
+	def supports(vectorizer) -> bool:
+		"""Whether vectorizer's analysis can be decomposed into fragments (word n-grams)."""
+		return vectorizer.analyzer == "word" and getattr(vectorizer, "input", "content") == "content"
+
+	def _tokens(self, text: str) -> Tuple[str, ...]:
+		tokens = self._tokenize(self._preprocess(text))
+		if self._stop_words is not None:
+			tokens = [t for t in tokens if t not in self._stop_words]
+		return tuple(tokens)
+
+	def _analyse(self, text: str) -> _Fragment:
+		tokens = self._tokens(text)
+		counts: Dict[int, int] = {}
+		for n in range(self._min_n, self._max_n + 1):
+			for i in range(len(tokens) - n + 1):
+				column = self._vocabulary.get(" ".join(tokens[i:i + n]))
+				if column is not None:
+					counts[column] = counts.get(column, 0) + 1
+		return _Fragment(tokens, tuple(counts.items()))
+
+	def _fragment(self, text: str) -> _Fragment:
+		fragment = self._fixed.get(text)
+		if fragment is not None:
+			return fragment
+		with self._lock:
+			fragment = self._cached.get(text)
+			if fragment is not None:
+				self._cached.move_to_end(text)
+				self.hits += 1
+				return fragment
+			self.misses += 1
+		fragment = self._analyse(text)
+		with self._lock:
+			self._cached[text] = fragment
+			while len(self._cached) > self.max_cached:
+				self._cached.popitem(last=False)
+		return fragment
+
+	def _counts(self, fragments: Sequence[str]) -> Dict[int, int]:
+		counts: Dict[int, int] = {}
+		get = counts.get
+		vocabulary_get = self._vocabulary.get
+		max_n = self._max_n
+		min_cross = max(self._min_n, 2)
+		# The last max_n - 1 tokens before the current fragment: an n-gram that ends in a
+		# fragment but starts before it is counted when that fragment is reached
+		tail: Tuple[str, ...] = ()
+		for text in fragments:
+			fragment = self._fragment(text)
+			for column, count in fragment.counts:
+				counts[column] = get(column, 0) + count
+			tokens = fragment.tokens
+			if max_n < 2 or not tokens:
+				continue
+			if tail:
+				for n in range(min_cross, max_n + 1):
+					# window = tail[-before:] + tokens[:n - before], with at least one token on each side
+					for before in range(max(1, n - len(tokens)), min(n - 1, len(tail)) + 1):
+						column = vocabulary_get(" ".join(tail[-before:] + tokens[:n - before]))
+						if column is not None:
+							counts[column] = get(column, 0) + 1
+			tail = (tail + tokens)[-(max_n - 1):]
+		return counts
+
+	def transform(self, queries: Sequence[Sequence[str]]) -> sp.csr_matrix:
+		"""TF-IDF vectors (CSR, one row per query) for queries given as fragment lists."""
+		rows = [self._counts(fragments) for fragments in queries]
+		indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+		indices: List[int] = []
+		data: List[float] = []
+		weigh = self._weigh if self._fast_weighting else None
+		for i, counts in enumerate(rows):
+			columns = sorted(counts)
+			indices.extend(columns)
+			data.extend(weigh(columns, [counts[c] for c in columns]) if weigh else [float(counts[c]) for c in columns])
+			indptr[i + 1] = len(indices)
+		matrix = sp.csr_matrix(
+			(np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+			shape=(len(rows), self._n_features),
+		)
+		if weigh:
+			return matrix
+		# Other weighting options: the fitted vectorizer's own TfidfTransformer
+		return sp.csr_matrix(self.vectorizer._tfidf.transform(matrix, copy=False))
+
+	def _weigh(self, columns: List[int], counts: List[int]) -> List[float]:
+		# The same float operations, in the same order, as TfidfTransformer.transform with
+		# use_idf and norm="l2": data *= idf[indices], then each row divided by the square
+		# root of its sequentially summed squares. Skips its per-call validation overhead.
+		idf = self._idf
+		if idf is None:
+			values = [float(count) for count in counts]
+		else:
+			values = [count * weight for count, weight in zip(counts, idf[columns].tolist())]
+		if self.vectorizer.norm is None:
+			return values
+		total = 0.0
+		for value in values:
+			total += value * value
+		if total == 0.0:
+			return values
+		norm = math.sqrt(total)
+		return [value / norm for value in values]
+
+	def stats(self) -> Dict[str, Optional[float]]:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"fixed_fragments": len(self._fixed),
+				"cached_fragments": len(self._cached),
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_rate": self.hits / lookups if lookups else None,
+			}
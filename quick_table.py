@@ -0,0 +1,158 @@
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from regions import STATES, normalize_state
+
+
+# Age buckets at the thresholds to_query_text() and the eligibility rules use:
+# (label, lowest age, highest age, age the bucket's profile is scored with). 36-44 is
+# its own bucket because it gets neither the youth nor the 45-60 bonus; 60 goes with
+# the seniors.
+AGE_BUCKETS: Tuple[Tuple[str, int, int, int], ...] = (
+	("<18", 0, 17, 16),
+	("18-35", 18, 35, 25),
+	("36-44", 36, 44, 40),
+	("45-59", 45, 59, 52),
+	("60+", 60, 200, 65),
+)
+GENDERS = ("male", "female", "other")
+CASTE_GROUPS = ("General", "OBC", "SC", "ST", "EWS")
+OCCUPATIONS = (
+	"Student", "Farmer", "Teacher", "Business", "Entrepreneur", "Unemployed",
+	"Salaried", "Self-employed", "Labourer", "Homemaker", "Retired", "Other",
+)
+# What /api/recommendations/quick fills in for the fields it does not ask for
+QUICK_INTERESTS = ("education",)
+QUICK_INCOME = 0
+
+# Score columns stored per entry, in this order
+SCORE_COLUMNS = ("score_content", "score_eligibility", "score_hybrid")
+
+
+def _key(value: Optional[str]) -> str:
+	return " ".join(str(value).lower().split()) if value else ""
+
+
+class QuickTable:
+	"""Precomputed top-k rankings for every coarse "quick recommendation" profile.
+
+	A quick profile is fixed apart from its age bucket, state, gender, caste group and
+	occupation; each combination of those is one entry. ``rows`` (entries x depth,
+	int32, -1 padded) holds scheme positions best first and ``scores`` (entries x depth
+	x 3, float32) their SCORE_COLUMNS. An entry is found by mixed-radix arithmetic over
+	the axis positions, so a lookup costs a few dict gets.
+
+	An entry is the ranking of the bucket's representative age, so a profile whose age
+	literally appears in scheme text can rank slightly differently when scored live.
+	"""
+
+	def __init__(
+		self,
+		states: Sequence[str],
+		genders: Sequence[str],
+		castes: Sequence[str],
+		occupations: Sequence[str],
+		rows: np.ndarray,
+		scores: np.ndarray,
+		n_schemes: int,
+	):
+		self.states = list(states)
+		self.genders = list(genders)
+		self.castes = list(castes)
+		self.occupations = list(occupations)
+		self.rows = rows
+		self.scores = scores
+		self.n_schemes = n_schemes
+		self._index()
+
+	def _index(self) -> None:
+		self._state_pos = {normalize_state(s) or _key(s): i for i, s in enumerate(self.states)}
+		self._gender_pos = {_key(g): i for i, g in enumerate(self.genders)}
+		self._caste_pos = {_key(c): i for i, c in enumerate(self.castes)}
+		self._occupation_pos = {_key(o): i for i, o in enumerate(self.occupations)}
+		self._radix = (len(self.states), len(self.genders), len(self.castes), len(self.occupations))
+
+	@property
+	def depth(self) -> int:
+		return self.rows.shape[1]
+
+	@property
+	def nbytes(self) -> int:
+		return self.rows.nbytes + self.scores.nbytes
+
+	def combinations(self) -> Iterator[Dict[str, Any]]:
+		"""Profile fields of every entry, in entry order."""
+		for _, _, _, age in AGE_BUCKETS:
+			for state in self.states:
+				for gender in self.genders:
+					for caste in self.castes:
+						for occupation in self.occupations:
+							yield {
+								"age": age,
+								"state": state.title(),
+								"gender": gender,
+								"caste_group": caste,
+								"occupation": occupation,
+								"income": QUICK_INCOME,
+								"interests": list(QUICK_INTERESTS),
+							}
+
+	def entry(self, profile) -> Optional[int]:
+		"""Entry number for a UserProfile, or None when the table does not cover it."""
+		if profile.age is None or profile.income != QUICK_INCOME or profile.previous_applications:
+			return None
+		if [_key(i) for i in (profile.interests or [])] != list(QUICK_INTERESTS):
+			return None
+		bucket = next((i for i, (_, low, high, _) in enumerate(AGE_BUCKETS) if low <= profile.age <= high), None)
+		positions = (
+			bucket,
+			self._state_pos.get(normalize_state(profile.state) or _key(profile.state)),
+			self._gender_pos.get(_key(profile.gender)),
+			self._caste_pos.get(_key(profile.caste_group)),
+			self._occupation_pos.get(_key(profile.occupation)),
+		)
+		if None in positions:
+			return None
+		entry = positions[0]
+		for position, size in zip(positions[1:], self._radix):
+			entry = entry * size + position
+		return entry
+
+	def __getstate__(self) -> Dict[str, Any]:
+		state = self.__dict__.copy()
+		for name in ("_state_pos", "_gender_pos", "_caste_pos", "_occupation_pos", "_radix"):
+			state.pop(name, None)
+		return state
+
+	def __setstate__(self, state: Dict[str, Any]) -> None:
+		self.__dict__.update(state)
+		self._index()
+
+
+def build_quick_table(
+	rank_batch,
+	n_schemes: int,
+	depth: int = 50,
+	states: Optional[Sequence[str]] = None,
+	genders: Sequence[str] = GENDERS,
+	castes: Sequence[str] = CASTE_GROUPS,
+	occupations: Sequence[str] = OCCUPATIONS,
+	batch_size: int = 256,
+) -> QuickTable:
+	"""Score every quick-profile combination with ``rank_batch``.
+
+	``rank_batch(profile_dicts, depth)`` returns, per profile, the ranked scheme
+	positions and an (n, 3) array of SCORE_COLUMNS.
+	"""
+	states = list(states) if states is not None else sorted(STATES)
+	empty = QuickTable(states, genders, castes, occupations, np.empty((0, depth), np.int32), np.empty((0, depth, 3), np.float32), n_schemes)
+	profiles = list(empty.combinations())
+	rows = np.full((len(profiles), depth), -1, dtype=np.int32)
+	scores = np.zeros((len(profiles), depth, len(SCORE_COLUMNS)), dtype=np.float32)
+	for start in range(0, len(profiles), batch_size):
+		chunk = profiles[start:start + batch_size]
+		for i, (positions, values) in enumerate(rank_batch(chunk, depth), start=start):
+			rows[i, :len(positions)] = positions
+			scores[i, :len(positions)] = values
+	return QuickTable(states, genders, castes, occupations, rows, scores, n_schemes)
@@ -0,0 +1,149 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from quick_table import SCORE_COLUMNS
+
+
+# Rough per-entry bookkeeping (dict slot, tuple, id string) counted towards max_bytes
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class CursorExpired(LookupError):
+	"""A cursor whose ranking is gone: expired, evicted, or made by another model version."""
+
+
+class Ranking:
+	"""One profile's ranking: scheme row positions best first (int32) and their
+	SCORE_COLUMNS (rows x 3, float32; score_popularity is read from the model)."""
+
+	def __init__(self, rows: np.ndarray, scores: np.ndarray, exact: bool = True):
+		self.rows = np.ascontiguousarray(rows, dtype=np.int32)
+		self.scores = np.ascontiguousarray(scores, dtype=np.float32).reshape(len(self.rows), len(SCORE_COLUMNS))
+		self.exact = exact
+
+	def __len__(self) -> int:
+		return len(self.rows)
+
+	@property
+	def nbytes(self) -> int:
+		return self.rows.nbytes + self.scores.nbytes
+
+
+class RankingCache:
+	"""Short-lived rankings behind pagination cursors, bounded by idle time and memory.
+
+	recommend(..., paginate=True) ranks a profile ``depth`` schemes deep once and keeps
+	the ranking here; each page after the first is a slice of it, so paging never
+	rescores and the order cannot shift between pages. A cursor is the entry's random
+	id plus the offset of the next page. Entries expire ``ttl_seconds`` after their last
+	page was read, and the least recently read are evicted while the total exceeds
+	``max_bytes``. Like ResultCache, entries are tagged with the model version that made
+	them and are never read by another.
+	"""
+
+	def __init__(self, ttl_seconds: Optional[float] = 300.0, max_bytes: int = 64 << 20, depth: int = 200):
+		self.ttl_seconds = ttl_seconds
+		self.max_bytes = max_bytes
+		# Schemes ranked per profile; 0 ranks every scheme, scoring each one in full
+		self.depth = depth
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+		self.invalidations = 0
+		self.rejected = 0
+		self._bytes = 0
+		# id -> (version, last used, ranking), least recently used first
+		self._entries: "OrderedDict[str, Tuple[str, float, Ranking]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def put(self, version: str, ranking: Ranking) -> Optional[str]:
+		"""Keep a ranking and return its cursor id, or None if it alone exceeds max_bytes."""
+		size = ranking.nbytes + ENTRY_OVERHEAD_BYTES
+		if size > self.max_bytes:
+			with self._lock:
+				self.rejected += 1
+			return None
+		entry_id = secrets.token_urlsafe(12)
+		now = time.time()
+		with self._lock:
+			self._expire(now)
+			self._entries[entry_id] = (version, now, ranking)
+			self._bytes += size
+			while self._bytes > self.max_bytes:
+				self._pop(next(iter(self._entries)))
+				self.evictions += 1
+		return entry_id
+
+	def get(self, version: str, cursor: str) -> Tuple[Ranking, int]:
+		"""The ranking and next-page offset a cursor points at; raises CursorExpired."""
+		entry_id, offset = parse_cursor(cursor)
+		now = time.time()
+		with self._lock:
+			self._expire(now)
+			entry = self._entries.get(entry_id)
+			if entry is None:
+				self.misses += 1
+				raise CursorExpired("cursor has expired; request the first page again")
+			if entry[0] != version:
+				self._pop(entry_id)
+				self.invalidations += 1
+				self.misses += 1
+				raise CursorExpired("the model changed since this cursor was issued; request the first page again")
+			self._entries[entry_id] = (entry[0], now, entry[2])
+			self._entries.move_to_end(entry_id)
+			self.hits += 1
+		return entry[2], offset
+
+	def _expire(self, now: float) -> None:
+		# Least recently used first, so the idle entries are all at the front
+		if self.ttl_seconds is None:
+			return
+		while self._entries:
+			entry_id, (_, used_at, _) = next(iter(self._entries.items()))
+			if now - used_at <= self.ttl_seconds:
+				break
+			self._pop(entry_id)
+			self.expirations += 1
+
+	def _pop(self, entry_id: str) -> None:
+		_, _, ranking = self._entries.pop(entry_id)
+		self._bytes -= ranking.nbytes + ENTRY_OVERHEAD_BYTES
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			self._expire(time.time())
+			lookups = self.hits + self.misses
+			return {
+				"entries": len(self._entries),
+				"bytes": self._bytes,
+				"max_bytes": self.max_bytes,
+				"ttl_seconds": self.ttl_seconds,
+				"depth": self.depth,
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_rate": self.hits / lookups if lookups else 0.0,
+				"evictions": self.evictions,
+				"expirations": self.expirations,
+				"invalidations": self.invalidations,
+				"rejected": self.rejected,
+			}
+
+
+def make_cursor(entry_id: str, offset: int) -> str:
+	return f"{entry_id}.{offset}"
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+	entry_id, _, offset = str(cursor).rpartition(".")
+	if not entry_id or not offset.isdigit():
+		raise ValueError(f"Invalid cursor: {cursor!r}")
+	return entry_id, int(offset)
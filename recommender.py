@@ -1,23 +1,60 @@
+import copy
+import os
 import re
+import sys
 import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.pipeline import Pipeline
 from sklearn.base import BaseEstimator, TransformerMixin
 from unidecode import unidecode
 from rapidfuzz import fuzz
 import joblib
 
+from constraints import EligibilityConstraints
+from eligibility import ELIGIBILITY_COLUMNS, EligibilityEngine
+from query_vectors import QueryVectorizer
+from ranking_cache import Ranking, RankingCache, make_cursor, parse_cursor
+from related import RelatedSchemes, build_related, neighbours_of
+from regions import STATES, StateIndex, normalize_state
+from result_cache import ResultCache, artifact_hash, profile_fingerprint
+from scheme_store import LEAN_FIELDS, FrameLayout, SchemeStore
+import timing
+from vocabulary import ArrayVocabulary, idf_document_frequencies, idf_from_document_frequencies
+from quick_table import SCORE_COLUMNS, QuickTable, build_quick_table
+
 
 TEXT_COLUMNS_DEFAULT = [
 	"scheme_name", "details", "benefits", "eligibility", "application", "documents", "schemeCategory", "tags"
 ]
 
+# Schemes that get the full (fuzzy) eligibility score per query after bound-based pruning
+DEFAULT_CANDIDATE_BUDGET = 300
+# Added to the hybrid score (before min-max normalisation) of schemes that are central or
+# mention the profile's state: the regional preference the old prefilter gave by ranking
+# only those schemes first, as a boost that a much better match elsewhere can still beat
+REGIONAL_BOOST = 0.1
+# Largest batch whose query vectors are composed from cached fragments. Composing skips
+# vectorizer.transform()'s fixed per-call cost (about 4x faster for one query) but is
+# slower per query, so from about 50 queries up a single transform() call is faster.
+COMPOSE_MAX_QUERIES = 32
+
+# Header of saved artifacts. Format 1 (no header) pickled the fitted vectorizer and the
+# catalogue frame whole; format 2 stores the vocabulary as arrays, the IDF as document
+# counts and the scheme text once, compressed, in the SchemeStore.
+ARTIFACT_FORMAT = "scheme-recommender"
+ARTIFACT_VERSION = 2
+
 
 def _safe_str(x: Any) -> str:
 	if pd.isna(x):
@@ -28,6 +65,11 @@ def _safe_str(x: Any) -> str:
 		return str(x)
 
 
+def _is_text_column(col: pd.Series) -> bool:
+	# object on pandas 2; pandas 3 infers a dedicated string dtype for text columns
+	return col.dtype == object or pd.api.types.is_string_dtype(col.dtype)
+
+
 def _normalize_whitespace(text: str) -> str:
 	return re.sub(r"\s+", " ", text).strip()
 
@@ -40,14 +82,42 @@ class ColumnConcatenator(BaseEstimator, TransformerMixin):
 		return self
 
 	def transform(self, X: pd.DataFrame):
-		texts = (
-			X[self.columns]
-			# .applymap(_safe_str)
-			.apply(lambda col: col.map(_safe_str))
-			.apply(lambda row: " \n ".join([_normalize_whitespace(v) for v in row.values]), axis=1)
-			.values
-		)
-		return texts
+		# Column-wise string ops; same result as normalising and joining each row in Python
+		texts = None
+		for c in self.columns:
+			col = X[c].map(_safe_str).str.replace(r"\s+", " ", regex=True).str.strip()
+			texts = col if texts is None else texts + " \n " + col
+		return texts.to_numpy(dtype=object)
+
+
+# Keywords UserProfile.query_fragments() adds for profile attributes. They are fixed, so
+# the recommender vectorises each of them once (query_vectors.QueryVectorizer).
+QUERY_EXPANSIONS: Dict[str, List[str]] = {
+	"senior": ["senior", "elderly", "pension", "old age"],
+	"minor": ["child", "minor", "student", "youth"],
+	"youth": ["youth", "young", "adult"],
+	"bpl": ["bpl", "below poverty", "economically weaker", "poor"],
+	"low_income": ["low income", "middle class"],
+	"sc": ["scheduled caste"],
+	"st": ["scheduled tribe"],
+	"obc": ["backward class", "obc"],
+	"farmer": ["farmer", "agriculture", "farming", "crop"],
+	"student": ["student", "education", "scholarship", "school"],
+	"teacher": ["teacher", "educator", "education"],
+	"business": ["business", "entrepreneur", "startup", "trader"],
+	"female": ["female", "women", "woman", "ladies"],
+	"male": ["male", "men"],
+	"education": ["education", "scholarship", "school", "college", "study"],
+	"health": ["health", "medical", "hospital", "treatment"],
+	"employment": ["employment", "job", "career", "work"],
+}
+# Appended to every non-empty profile query; the whole query when the profile is empty
+QUERY_SUFFIX = "government scheme benefit assistance subsidy support aid help"
+DEFAULT_QUERY = (
+	"government scheme benefit assistance subsidy farmer student women minority "
+	"employment education health pension insurance loan training disability rural "
+	"urban sanitation agriculture entrepreneur skilling scholarship"
+)
 
 
 @dataclass
@@ -64,51 +134,55 @@ class UserProfile:
 	previous_applications: Optional[List[str]] = None
 
 	def to_query_text(self) -> str:
+		return " ".join(self.query_fragments())
+
+	def query_fragments(self) -> List[str]:
+		"""The pieces to_query_text() joins with spaces: profile values and keyword expansions."""
 		parts: List[str] = []
 		if self.age is not None:
 			parts.append(f"age {self.age}")
 			# Add age-related keywords
 			if self.age >= 60:
-				parts.extend(["senior", "elderly", "pension", "old age"])
+				parts.extend(QUERY_EXPANSIONS["senior"])
 			elif self.age < 18:
-				parts.extend(["child", "minor", "student", "youth"])
+				parts.extend(QUERY_EXPANSIONS["minor"])
 			elif 18 <= self.age <= 35:
-				parts.extend(["youth", "young", "adult"])
+				parts.extend(QUERY_EXPANSIONS["youth"])
 		if self.income is not None:
 			parts.append(f"income {self.income}")
 			if self.income <= 150000:
-				parts.extend(["bpl", "below poverty", "economically weaker", "poor"])
+				parts.extend(QUERY_EXPANSIONS["bpl"])
 			elif self.income <= 300000:
-				parts.extend(["low income", "middle class"])
+				parts.extend(QUERY_EXPANSIONS["low_income"])
 		if self.caste_group:
 			parts.append(self.caste_group)
 			# Add related terms
 			cg_lower = self.caste_group.lower()
 			if "sc" in cg_lower:
-				parts.append("scheduled caste")
+				parts.extend(QUERY_EXPANSIONS["sc"])
 			if "st" in cg_lower:
-				parts.append("scheduled tribe")
+				parts.extend(QUERY_EXPANSIONS["st"])
 			if "obc" in cg_lower or "bc" in cg_lower:
-				parts.extend(["backward class", "obc"])
+				parts.extend(QUERY_EXPANSIONS["obc"])
 		if self.occupation:
 			parts.append(self.occupation)
 			# Add occupation-related keywords
 			occ_lower = self.occupation.lower()
 			if "farm" in occ_lower or "agricult" in occ_lower:
-				parts.extend(["farmer", "agriculture", "farming", "crop"])
+				parts.extend(QUERY_EXPANSIONS["farmer"])
 			if "student" in occ_lower or "school" in occ_lower:
-				parts.extend(["student", "education", "scholarship", "school"])
+				parts.extend(QUERY_EXPANSIONS["student"])
 			if "teach" in occ_lower:
-				parts.extend(["teacher", "educator", "education"])
+				parts.extend(QUERY_EXPANSIONS["teacher"])
 			if "business" in occ_lower or "entrepreneur" in occ_lower:
-				parts.extend(["business", "entrepreneur", "startup", "trader"])
+				parts.extend(QUERY_EXPANSIONS["business"])
 		if self.gender:
 			parts.append(self.gender)
 			g_lower = self.gender.lower()
 			if g_lower.startswith("f"):
-				parts.extend(["female", "women", "woman", "ladies"])
+				parts.extend(QUERY_EXPANSIONS["female"])
 			elif g_lower.startswith("m"):
-				parts.extend(["male", "men"])
+				parts.extend(QUERY_EXPANSIONS["male"])
 		if self.state:
 			parts.append(self.state)
 		if self.interests:
@@ -116,14 +190,14 @@ class UserProfile:
 			# Add related terms for common interests
 			interests_lower = " ".join(self.interests).lower()
 			if "education" in interests_lower:
-				parts.extend(["education", "scholarship", "school", "college", "study"])
+				parts.extend(QUERY_EXPANSIONS["education"])
 			if "health" in interests_lower:
-				parts.extend(["health", "medical", "hospital", "treatment"])
+				parts.extend(QUERY_EXPANSIONS["health"])
 			if "employment" in interests_lower or "job" in interests_lower:
-				parts.extend(["employment", "job", "career", "work"])
+				parts.extend(QUERY_EXPANSIONS["employment"])
 		if self.previous_applications:
 			parts.extend(self.previous_applications)
-		return " ".join([_normalize_whitespace(unidecode(p)) for p in parts if p])
+		return [_normalize_whitespace(unidecode(p)) for p in parts if p]
 
 
 class SchemeRecommender:
@@ -135,6 +209,9 @@ class SchemeRecommender:
 		min_df: int = 2,
 		stop_words: str = "english",
 		popularity_col: Optional[str] = None,
+		fuzzy_max_chars: Optional[int] = None,
+		fuzzy_workers: int = -1,
+		lsa_components: Optional[int] = None,
 	):
 		self.text_columns = text_columns or TEXT_COLUMNS_DEFAULT
 		self.vectorizer = TfidfVectorizer(
@@ -145,9 +222,76 @@ class SchemeRecommender:
 			lowercase=True,
 		)
 		self.popularity_col = popularity_col
+		# Fuzzy eligibility matching: text-length cap (None = exact scores) and thread count
+		self.fuzzy_max_chars = fuzzy_max_chars
+		self.fuzzy_workers = fuzzy_workers
+		# Optional LSA content scorer: dimensionality of the TruncatedSVD fitted with the
+		# vectorizer, the projection of each vocabulary term (n_terms x k) and the L2
+		# normalised scheme embeddings (n_schemes x k), both float32
+		self.lsa_components = lsa_components
+		self.lsa_term_vectors: Optional[np.ndarray] = None
+		self.lsa_embeddings: Optional[np.ndarray] = None
+		# "tfidf" (sparse cosine) or "lsa"; switchable after loading when both are stored
+		self.content_scorer = "lsa" if lsa_components else "tfidf"
 		self.pipeline: Optional[Pipeline] = None
-		self.scheme_df: Optional[pd.DataFrame] = None
+		# The catalogue frame (see the scheme_df property) and, for a model loaded from a
+		# format 2 artifact, what rebuilds it from the scheme store on first use
+		self._scheme_df: Optional[pd.DataFrame] = None
+		self._frame_layout: Optional[FrameLayout] = None
+		# Min-max normalised popularity per row (the frame's __popularity__ column)
+		self.popularity: Optional[np.ndarray] = None
 		self.tfidf_matrix: Optional[np.ndarray] = None
+		# Same matrix in CSC layout: an inverted index with one column of postings per term
+		self.term_postings: Optional[sp.csc_matrix] = None
+		self.eligibility_engine: Optional[EligibilityEngine] = None
+		# Age / income / caste / gender / state limits parsed from each scheme's text, for
+		# recommend(hard_filter=True)
+		self.constraints: Optional[EligibilityConstraints] = None
+		self.state_index: Optional[StateIndex] = None
+		# Text fields by column and row position, for lean results and get_schemes()
+		self.scheme_store: Optional[SchemeStore] = None
+		# Content hash of the artifact this model was saved to / loaded from; cached
+		# results are only reused for the same version
+		self.model_version: Optional[str] = None
+		self.result_cache: Optional[ResultCache] = None
+		# Rankings behind pagination cursors (see recommend(..., paginate=True))
+		self.ranking_cache: Optional[RankingCache] = None
+		# Incremental updates: tombstoned rows (None when nothing was removed) and the full
+		# artifact that save_delta() writes changes against (its path, version and row count)
+		self.removed: Optional[np.ndarray] = None
+		self.base_path: Optional[str] = None
+		self.base_version: Optional[str] = None
+		self.base_rows = 0
+		# Rows/sec and peak memory of the last fit_csv()
+		self.ingest_stats: Optional[Dict[str, Any]] = None
+		# Per-stage times of load(), when timings were requested
+		self.load_timings: Optional[Dict[str, float]] = None
+		# Precomputed rankings for coarse quick-recommendation profiles (build_quick_table);
+		# dropped whenever the catalogue changes
+		self.quick_table: Optional[QuickTable] = None
+		# Each scheme's nearest neighbours by TF-IDF similarity (build_related); also
+		# dropped whenever the catalogue changes
+		self.related: Optional[RelatedSchemes] = None
+		# Composes query vectors from cached fragment counts; built on first use
+		self._query_vectorizer: Optional[QueryVectorizer] = None
+
+	@property
+	def scheme_df(self) -> Optional[pd.DataFrame]:
+		"""The cleaned catalogue, one row per tfidf_matrix row (tombstoned ones included).
+
+		A model loaded from a format 2 artifact rebuilds it from the scheme store the first
+		time it is read. Ranking, lean results and get_schemes() never read it, so a
+		service answering only those keeps no copy of the scheme text on its heap.
+		"""
+		if self._scheme_df is None and self._frame_layout is not None:
+			self._scheme_df = self._frame_layout.frame(self.scheme_store)
+			self._frame_layout = None
+		return self._scheme_df
+
+	@scheme_df.setter
+	def scheme_df(self, df: Optional[pd.DataFrame]) -> None:
+		self._scheme_df = df
+		self._frame_layout = None
 
 	@staticmethod
 	def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
@@ -160,7 +304,7 @@ class SchemeRecommender:
 		df.columns = [c.strip() for c in df.columns]
 		# Fill missing text columns
 		for c in df.columns:
-			if df[c].dtype == object:
+			if _is_text_column(df[c]):
 				df[c] = df[c].apply(_safe_str)
 		return df
 
@@ -172,16 +316,249 @@ class SchemeRecommender:
 				df[c] = ""
 		concatenated_text = ColumnConcatenator(self.text_columns).transform(df)
 		self.tfidf_matrix = self.vectorizer.fit_transform(concatenated_text)
-		# Popularity: if not provided, default to 1
+		return self._fit_catalogue(df)
+
+	def fit_csv(self, csv_path: str, chunksize: int = 10000, workers: Optional[int] = None):
+		"""fit() on a CSV file without loading it whole first.
+
+		Chunks are cleaned and concatenated across a process pool (see iter_clean_chunks)
+		and their texts streamed straight into the vectorizer, so the corpus is never
+		held as one list next to the raw and cleaned frames. Throughput and peak memory
+		end up in ``self.ingest_stats``.
+		"""
+		t0 = time.perf_counter()
+		# Checked up front: the vectorizer consumes the chunks, and would fail on an empty
+		# file with an unrelated error
+		try:
+			empty = pd.read_csv(csv_path, encoding="utf-8", nrows=1).empty
+		except pd.errors.EmptyDataError:
+			empty = True
+		if empty:
+			raise ValueError(f"{csv_path} has no rows to fit on")
+		frames: List[pd.DataFrame] = []
+		object_columns: List[set] = []
+
+		def documents():
+			for chunk, texts, cleaned in iter_clean_chunks(csv_path, self.text_columns, chunksize, workers):
+				frames.append(chunk)
+				object_columns.append(cleaned)
+				yield from texts
+
+		self.tfidf_matrix = self.vectorizer.fit_transform(documents())
+		df = pd.concat(frames)
+		frames.clear()
+		# A column that was text in some chunks but numeric/empty in others was only cleaned
+		# in the text ones; finish it here, as clean_dataframe would on the whole file
+		mixed = set().union(*object_columns) - set.intersection(*object_columns)
+		for c in mixed:
+			df[c] = df[c].map(lambda v: v if isinstance(v, str) else _safe_str(v))
+		self._fit_catalogue(df)
+		seconds = time.perf_counter() - t0
+		self.ingest_stats = {
+			"rows": len(df),
+			"seconds": round(seconds, 3),
+			"rows_per_sec": round(len(df) / seconds, 1) if seconds > 0 else None,
+			"peak_rss_mb": _peak_rss_mb(),
+			"workers": _ingest_workers(workers),
+			"chunksize": chunksize,
+		}
+		return self
+
+	def _fit_catalogue(self, df: pd.DataFrame):
+		# Everything fit() derives from the cleaned frame once tfidf_matrix is set
+		self.term_postings = self.tfidf_matrix.tocsc()
+		self.quick_table = None
+		self.related = None
+		self._query_vectorizer = None
+		if self.lsa_components:
+			self.lsa_term_vectors = self._fit_lsa(self.tfidf_matrix, self.lsa_components)
+			self.lsa_embeddings = self._lsa_project(self.tfidf_matrix)
+		self.scheme_df = df
+		self.removed = None
+		self._refresh_popularity()
+		self.eligibility_engine = self.build_eligibility_engine(df, self.fuzzy_max_chars, self.fuzzy_workers)
+		self.constraints = self.build_constraints(df)
+		self.state_index = self.build_state_index(df)
+		self.scheme_store = SchemeStore.build(df)
+		# Not saved yet: a version no other model shares
+		self.model_version = f"unsaved-{uuid.uuid4().hex}"
+		self.base_path, self.base_version, self.base_rows = None, None, 0
+		return self
+
+	@staticmethod
+	def _fit_lsa(tfidf_matrix: sp.csr_matrix, n_components: int) -> np.ndarray:
+		# TruncatedSVD.transform(X) is X @ components_.T, so the term vectors are all we keep
+		n_components = max(1, min(n_components, tfidf_matrix.shape[1] - 1))
+		svd = TruncatedSVD(n_components=n_components, random_state=0)
+		svd.fit(tfidf_matrix)
+		return np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+
+	def _lsa_project(self, vectors: sp.csr_matrix) -> np.ndarray:
+		"""L2-normalised LSA embeddings (float32) of TF-IDF rows."""
+		projected = np.asarray(sp.csr_matrix(vectors, dtype=np.float32) @ self.lsa_term_vectors, dtype=np.float32)
+		norms = np.linalg.norm(projected, axis=1, keepdims=True)
+		return np.divide(projected, norms, out=np.zeros_like(projected), where=norms > 0)
+
+	def compact_vocabulary(self) -> None:
+		"""Replace the vectorizer's term dict with an ArrayVocabulary and drop ``stop_words_``.
+
+		Queries vectorise identically. Worth doing before forking workers: a dict's
+		str objects get their reference counts written on use, which copies their pages into
+		every worker, while the arrays stay shared.
+		"""
+		self.vectorizer.vocabulary_ = ArrayVocabulary.from_dict(self.vectorizer.vocabulary_)
+		self._query_vectorizer = None
+		if hasattr(self.vectorizer, "stop_words_"):
+			# Only kept by sklearn for introspection; transform() never reads it
+			del self.vectorizer.stop_words_
+
+	def _refresh_popularity(self) -> None:
+		# Popularity: if not provided, default to 1. Min-max normalised over live schemes.
+		df = self.scheme_df
 		if self.popularity_col and self.popularity_col in df.columns:
 			pop = pd.to_numeric(df[self.popularity_col], errors="coerce").fillna(0.0)
 		else:
 			pop = pd.Series(np.ones(len(df)), index=df.index)
-		df["__popularity__"] = (pop - pop.min()) / (pop.max() - pop.min() + 1e-9)
-		self.scheme_df = df
+		live = pop if self.removed is None else pop[~self.removed]
+		df["__popularity__"] = (pop - live.min()) / (live.max() - live.min() + 1e-9)
+		self.popularity = df["__popularity__"].to_numpy()
+
+	def add_schemes(self, df: pd.DataFrame) -> "SchemeRecommender":
+		"""Append schemes to the catalogue without refitting.
+
+		New rows are vectorised with the existing vocabulary and IDF weights, which stay
+		frozen until compact(); terms the vocabulary has never seen are ignored.
+		"""
+		assert self.scheme_df is not None and self.tfidf_matrix is not None
+		self._append(df)
+		self._refresh_popularity()
+		self.model_version = f"unsaved-{uuid.uuid4().hex}"
+		return self
+
+	def remove_schemes(self, slugs: List[str]) -> "SchemeRecommender":
+		"""Tombstone schemes by slug; their rows stay in the matrix until compact()."""
+		self._tombstone(self._live_positions(slugs))
+		self._refresh_popularity()
+		self.model_version = f"unsaved-{uuid.uuid4().hex}"
+		return self
+
+	def update_scheme(self, slug: str, **fields: Any) -> "SchemeRecommender":
+		"""Replace a scheme's fields: the old row is tombstoned and the edited one appended."""
+		positions = self._live_positions([slug])
+		row = self.scheme_df.iloc[positions[-1]].drop(labels="__popularity__").to_dict()
+		row.update(fields)
+		self._tombstone(positions)
+		self._append(pd.DataFrame([row]))
+		self._refresh_popularity()
+		self.model_version = f"unsaved-{uuid.uuid4().hex}"
 		return self
 
+	def compact(self) -> "SchemeRecommender":
+		"""Drop tombstoned rows and refit the vectorizer on the live catalogue."""
+		df = self.scheme_df if self.removed is None else self.scheme_df[~self.removed]
+		return self.fit(df.drop(columns="__popularity__").reset_index(drop=True))
+
+	def _live_positions(self, slugs: List[str]) -> np.ndarray:
+		if "slug" not in self.scheme_df.columns:
+			raise ValueError("Catalogue has no 'slug' column")
+		slug_values = self.scheme_df["slug"]
+		live = slug_values.isin(slugs).to_numpy()
+		if self.removed is not None:
+			live = live & ~self.removed
+		missing = set(slugs) - set(slug_values[live])
+		if missing:
+			raise KeyError(f"Unknown or removed schemes: {sorted(missing)}")
+		return np.flatnonzero(live)
+
+	def _tombstone(self, positions: np.ndarray) -> None:
+		self.quick_table = None
+		self.related = None
+		if self.removed is None:
+			self.removed = np.zeros(self.tfidf_matrix.shape[0], dtype=bool)
+		self.removed[positions] = True
+
+	def _append(self, df: pd.DataFrame) -> None:
+		self.quick_table = None
+		self.related = None
+		# Clean, vectorise and index new rows exactly like fit() does, then stack them on
+		df = self.clean_dataframe(df)
+		for c in self.text_columns:
+			if c not in df.columns:
+				df[c] = ""
+		for c in self.scheme_df.columns:
+			if c not in df.columns and c != "__popularity__":
+				df[c] = "" if self.scheme_df[c].dtype == object else np.nan
+		offset = len(self.scheme_df)
+		df.index = pd.RangeIndex(offset, offset + len(df))
+		new_rows = self.vectorizer.transform(ColumnConcatenator(self.text_columns).transform(df))
+		self.tfidf_matrix = sp.vstack([self.tfidf_matrix, new_rows], format="csr")
+		self.term_postings = self.tfidf_matrix.tocsc()
+		if self.lsa_term_vectors is not None:
+			self.lsa_embeddings = np.vstack([self.lsa_embeddings, self._lsa_project(new_rows)])
+		self.scheme_df = pd.concat([self.scheme_df, df])
+		texts, levels = self._eligibility_inputs(df)
+		self.eligibility_engine.append(texts, levels)
+		self.constraints.append(self.build_constraints(df))
+		self.state_index.append(self.build_state_index(df))
+		self.scheme_store.append(SchemeStore.build(df))
+		if self.removed is not None:
+			self.removed = np.concatenate([self.removed, np.zeros(len(df), dtype=bool)])
+
+	@staticmethod
+	def build_eligibility_engine(
+		df: pd.DataFrame, fuzzy_max_chars: Optional[int] = None, fuzzy_workers: int = -1
+	) -> EligibilityEngine:
+		texts, levels = SchemeRecommender._eligibility_inputs(df)
+		return EligibilityEngine(texts, levels, fuzzy_max_chars=fuzzy_max_chars, fuzzy_workers=fuzzy_workers)
+
+	@staticmethod
+	def _eligibility_inputs(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+		# Same text _eligibility_score builds per row, built once for the whole frame
+		n = len(df)
+		parts = [df[c].map(_safe_str).tolist() if c in df.columns else [""] * n for c in ELIGIBILITY_COLUMNS]
+		texts = [" ".join(cols).lower() for cols in zip(*parts)]
+		levels = df["level"].map(_safe_str).str.lower().tolist() if "level" in df.columns else [""] * n
+		return texts, levels
+
+	def _stored_eligibility_texts(self, n: int) -> List[str]:
+		# _eligibility_inputs' texts of the first n schemes, read back from the scheme store
+		# (which keeps every ELIGIBILITY_COLUMNS field) for an engine loaded without them
+		store = self.scheme_store
+		parts = [
+			[_safe_str(v) if v is not None else "" for v in store.values(c)[:n]] if c in store.fields else [""] * n
+			for c in ELIGIBILITY_COLUMNS
+		]
+		return [" ".join(cols).lower() for cols in zip(*parts)]
+
+	@staticmethod
+	def build_constraints(df: pd.DataFrame) -> EligibilityConstraints:
+		n = len(df)
+
+		def lowered(c: str) -> List[str]:
+			return df[c].map(_safe_str).str.lower().tolist() if c in df.columns else [""] * n
+
+		# The route's filter read the eligibility text, and for gender and student rules
+		# also these other columns
+		text_cols = ["eligibility", "details", "scheme_name", "tags", "schemeCategory"]
+		texts = [" ".join(values) for values in zip(*[lowered(c) for c in text_cols])]
+		state_cells = [", ".join(values) for values in zip(lowered("state"), lowered("states"))]
+		return EligibilityConstraints.parse(lowered("eligibility"), texts, lowered("level"), state_cells)
+
+	@staticmethod
+	def build_state_index(df: pd.DataFrame) -> StateIndex:
+		# Same columns the per-request regional scan used to search
+		n = len(df)
+
+		def lowered(c: str) -> List[str]:
+			return df[c].astype(str).str.lower().tolist() if c in df.columns else [""] * n
+
+		text_cols = ["state", "states", "details", "eligibility", "tags", "scheme_name", "schemeCategory"]
+		texts = ["\n".join(values) for values in zip(*[lowered(c) for c in text_cols])]
+		state_cells = [", ".join(values) for values in zip(lowered("state"), lowered("states"))]
+		return StateIndex.build(lowered("level"), state_cells, texts)
+
 	def _eligibility_score(self, row: pd.Series, profile: UserProfile) -> float:
+		# Reference per-row implementation; recommend() uses the equivalent EligibilityEngine
 		# Enhanced eligibility scoring with more flexible matching
 		text = " ".join([
 			_safe_str(row.get("eligibility", "")),
@@ -351,6 +728,220 @@ class SchemeRecommender:
 
 		return final_score
 
+	@staticmethod
+	def _query_text(profile: UserProfile) -> str:
+		return " ".join(SchemeRecommender._query_fragments(profile))
+
+	@staticmethod
+	def _query_fragments(profile: UserProfile) -> List[str]:
+		# Build query vector from profile/interests with enhanced expansion
+		fragments = profile.query_fragments()
+		if not " ".join(fragments):
+			# Default query uses common keywords so cosine doesn't collapse
+			return [DEFAULT_QUERY]
+		# Add general scheme-related terms to improve matching
+		return fragments + [QUERY_SUFFIX]
+
+	def _regional_mask(self, profile: UserProfile) -> Optional[np.ndarray]:
+		"""Mask over all schemes: central, or mentioning the profile's state (None without a state).
+
+		A state the index does not know (free-form input) gets the central schemes only.
+		"""
+		if not profile.state or self.state_index is None:
+			return None
+		return self.state_index.regional_mask(normalize_state(profile.state))
+
+	def _content_scores(self, profiles: List[UserProfile], timer=timing.NULL_TIMER) -> np.ndarray:
+		"""Cosine of each profile's query against every scheme, shape (n_profiles, n_schemes)."""
+		# Rows of tfidf_matrix are already L2-normalised, so cosine is a plain dot product.
+		# Only the postings of terms that occur in some query are touched.
+		with timer.span("query_text"):
+			queries = [self._query_fragments(p) for p in profiles]
+		with timer.span("query_vectorize"):
+			query_vecs = self._vectorize_queries(queries)
+		if self.content_scorer == "lsa":
+			# Cosine in the latent space: one dense (profiles x k) @ (k x schemes) product
+			with timer.span("content_scores"):
+				embedded = self._lsa_project(query_vecs)
+				return np.asarray(embedded @ self.lsa_embeddings.T, dtype=np.float64)
+		with timer.span("content_scores"):
+			terms = np.unique(query_vecs.indices)
+			if len(terms) == 0:
+				return np.zeros((len(profiles), self.tfidf_matrix.shape[0]))
+			postings = self.term_postings[:, terms]
+			weights = query_vecs[:, terms].toarray().T
+			return np.ascontiguousarray(np.asarray(postings @ weights).T)
+
+	def _vectorize_queries(self, queries: List[List[str]]) -> sp.csr_matrix:
+		"""vectorizer.transform() of the space-joined fragment lists.
+
+		Small batches are composed from cached fragment counts (same result, see
+		QueryVectorizer); larger ones, up from COMPOSE_MAX_QUERIES, call transform().
+		"""
+		if len(queries) > COMPOSE_MAX_QUERIES or not QueryVectorizer.supports(self.vectorizer):
+			return sp.csr_matrix(self.vectorizer.transform([" ".join(q) for q in queries]))
+		if self._query_vectorizer is None:
+			fixed = [term for terms in QUERY_EXPANSIONS.values() for term in terms]
+			fixed += [QUERY_SUFFIX, DEFAULT_QUERY] + [state.title() for state in STATES]
+			self._query_vectorizer = QueryVectorizer(self.vectorizer, fixed)
+		return self._query_vectorizer.transform(queries)
+
+	@staticmethod
+	def _prune(lower: np.ndarray, upper: np.ndarray, top_k: int, candidate_budget: int) -> Tuple[np.ndarray, bool]:
+		"""Schemes whose score upper bound can still reach the top-k, capped at the budget.
+
+		At least top_k schemes score >= the k-th largest lower bound, so anything whose
+		upper bound is below it cannot be in the top-k. The second value says whether the
+		surviving set fit in the budget, i.e. whether the top-k is guaranteed exact.
+		"""
+		n = len(lower)
+		k = min(top_k, n)
+		threshold = np.partition(lower, n - k)[n - k]
+		candidates = np.flatnonzero(upper >= threshold - 1e-12)
+		budget = max(candidate_budget, k)
+		if len(candidates) <= budget:
+			return candidates, True
+		keep = np.argpartition(-upper[candidates], budget - 1)[:budget]
+		return np.sort(candidates[keep]), False
+
+	@staticmethod
+	def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+		# Partial sort: argpartition finds the k best, then only those k are ordered.
+		# Ties go to catalogue order.
+		k = min(top_k, len(scores))
+		if k <= 0:
+			return np.array([], dtype=np.int64)
+		best = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+		return best[np.lexsort((best, -scores[best]))]
+
+	def _rank(
+		self,
+		profiles: List[UserProfile],
+		top_k: int,
+		content_weight: float,
+		eligibility_weight: float,
+		popularity_weight: float,
+		candidate_budget: Optional[int],
+		timer=timing.NULL_TIMER,
+		hard_filter: bool = False,
+		lean: bool = False,
+	) -> List[pd.DataFrame]:
+		results = []
+		ranked = self._rank_rows(
+			profiles, top_k, content_weight, eligibility_weight, popularity_weight, candidate_budget, timer, hard_filter,
+		)
+		for rows, content, eligibility, hybrid, candidates_scored, exact in ranked:
+			with timer.span("output"):
+				out = self._result_frame(rows, lean)
+				# Store original scores for transparency
+				out["score_content"] = content
+				out["score_eligibility"] = eligibility
+				out["score_popularity"] = self.popularity[rows]
+				# Use normalized hybrid score for final ranking
+				out["score_hybrid"] = hybrid
+				out.attrs["candidates_scored"] = candidates_scored
+				out.attrs["exact"] = exact
+			results.append(out)
+		return results
+
+	def _rank_rows(
+		self,
+		profiles: List[UserProfile],
+		top_k: int,
+		content_weight: float,
+		eligibility_weight: float,
+		popularity_weight: float,
+		candidate_budget: Optional[int],
+		timer=timing.NULL_TIMER,
+		hard_filter: bool = False,
+	) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, bool]]:
+		# Per profile: the top-k row positions, best first, with their content, eligibility
+		# and hybrid scores, how many schemes were scored and whether the top-k is exact
+		n = self.tfidf_matrix.shape[0]
+		removed = self.removed
+		eligible = None
+		if hard_filter:
+			with timer.span("hard_filter"):
+				eligible = self.constraints.mask_batch(profiles)
+		content_scores = self._content_scores(profiles, timer)
+		with timer.span("normalize"):
+			if removed is not None:
+				# Tombstoned schemes neither rank nor count towards the per-profile maximum
+				content_scores[:, removed] = 0.0
+			pop_scores = self.popularity
+
+			# Normalize and boost content scores (they're typically low)
+			# Apply square root to boost low scores more
+			content_scores_normalized = np.sqrt(np.maximum(content_scores, 0))
+			# Scale to 0-1 range more generously, per profile across the whole catalogue
+			row_max = content_scores_normalized.max(axis=1, keepdims=True)
+			with np.errstate(divide="ignore", invalid="ignore"):
+				content_scores_normalized = np.where(
+					row_max > 0, 0.3 + 0.7 * (content_scores_normalized / row_max), 0.3
+				)
+			partial = content_weight * content_scores_normalized + popularity_weight * pop_scores
+
+		if candidate_budget is None:
+			with timer.span("eligibility"):
+				elig_all = self.eligibility_engine.score_batch(profiles)
+		else:
+			with timer.span("eligibility_bounds"):
+				elig_lower, elig_upper = self.eligibility_engine.bounds_batch(profiles)
+
+		results = []
+		for p, profile in enumerate(profiles):
+			with timer.span("regional_priority"):
+				regional = self._regional_mask(profile)
+			# Tombstoned schemes, and with hard_filter the ones the profile is not eligible for
+			excluded = removed
+			if eligible is not None:
+				excluded = ~eligible[p] if removed is None else removed | ~eligible[p]
+			if candidate_budget is None:
+				candidates, exact = np.arange(n), True
+				elig_scores = elig_all[p]
+				if excluded is not None:
+					candidates, elig_scores = candidates[~excluded], elig_scores[~excluded]
+			else:
+				with timer.span("prune"):
+					lower = partial[p] + eligibility_weight * elig_lower[p]
+					upper = partial[p] + eligibility_weight * elig_upper[p]
+					if regional is not None:
+						lower += REGIONAL_BOOST * regional
+						upper += REGIONAL_BOOST * regional
+					if excluded is not None:
+						lower[excluded] = upper[excluded] = -np.inf
+					candidates, exact = self._prune(lower, upper, top_k, candidate_budget)
+					if excluded is not None:
+						candidates = candidates[~excluded[candidates]]
+				with timer.span("eligibility"):
+					elig_scores = self.eligibility_engine.score(profile, candidates)
+
+			with timer.span("fusion"):
+				# Hybrid score with normalized content scores
+				hybrid = (
+					content_weight * content_scores_normalized[p][candidates] +
+					eligibility_weight * elig_scores +
+					popularity_weight * pop_scores[candidates]
+				)
+				if regional is not None:
+					hybrid += REGIONAL_BOOST * regional[candidates]
+
+				# Apply min-max normalization to boost scores to a better range
+				# This ensures top recommendations have scores in 50-90% range
+				if len(hybrid) and hybrid.max() > hybrid.min():
+					# Normalize to 0.4-0.95 range (40% to 95%)
+					hybrid_normalized = 0.4 + 0.55 * ((hybrid - hybrid.min()) / (hybrid.max() - hybrid.min() + 1e-9))
+				else:
+					hybrid_normalized = np.full_like(hybrid, 0.5)
+
+			with timer.span("top_k"):
+				indices = self._top_k(hybrid_normalized, top_k)
+				rows = candidates[indices]
+			results.append((
+				rows, content_scores[p][rows], elig_scores[indices], hybrid_normalized[indices], len(candidates), exact,
+			))
+		return results
+
 	def recommend(
 		self,
 		profile: UserProfile,
@@ -358,123 +949,497 @@ class SchemeRecommender:
 		content_weight: float = 0.6,
 		eligibility_weight: float = 0.3,
 		popularity_weight: float = 0.1,
+		candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+		timings: bool = False,
+		hard_filter: bool = False,
+		lean: bool = False,
+		paginate: bool = False,
 	) -> pd.DataFrame:
-		assert self.scheme_df is not None and self.tfidf_matrix is not None
-
-		base_df = self.scheme_df.copy()
-		if profile.state:
-			st = profile.state.lower().strip()
-			mask = pd.Series(False, index=base_df.index, dtype=bool)
-
-			if "level" in base_df.columns:
-				mask |= base_df["level"].astype(str).str.lower().str.contains("central", na=False)
-
-			if "state" in base_df.columns:
-				mask |= base_df["state"].astype(str).str.lower().str.contains(st, na=False)
-			if "states" in base_df.columns:
-				mask |= base_df["states"].astype(str).str.lower().str.contains(st, na=False)
-
-			text_cols = ["details", "eligibility", "tags", "scheme_name", "schemeCategory"]
-			for c in text_cols:
-				if c in base_df.columns:
-					mask |= base_df[c].astype(str).str.lower().str.contains(st, na=False)
-
-			prioritized_df = base_df[mask].copy()
-			if prioritized_df.empty:
-				df = base_df
-			else:
-				remaining_df = base_df[~mask]
-				df = pd.concat([prioritized_df, remaining_df], axis=0)
-		else:
-			df = base_df
-
-		max_candidates = min(len(df), max(top_k * 3, top_k + 10))
-		df = df.head(max_candidates)
-
-		# Build query vector from profile/interests with enhanced expansion
-		query_text = profile.to_query_text()
-		if not query_text:
-			# Default query uses common keywords so cosine doesn't collapse
-			query_text = (
-				"government scheme benefit assistance subsidy farmer student women minority "
-				"employment education health pension insurance loan training disability rural "
-				"urban sanitation agriculture entrepreneur skilling scholarship"
+		"""Top-k schemes for a profile out of the whole catalogue.
+
+		With ``candidate_budget=None`` every scheme is scored in full. Otherwise cheap
+		score bounds are computed for every scheme first, schemes that provably cannot
+		reach the top-k are pruned, and only the survivors (at most ``candidate_budget``)
+		get the fuzzy-matching part of the eligibility score. The result is exact unless
+		the budget had to cut survivors (``out.attrs["exact"]``); hybrid scores are
+		min-max normalised over the schemes that were scored. Schemes that are central or
+		mention the profile's state get REGIONAL_BOOST added before that normalisation.
+
+		With ``hard_filter=True`` schemes whose parsed limits (age, income, caste group,
+		gender, state; see EligibilityConstraints) rule the profile out are never ranked,
+		so fewer than top_k rows come back only when fewer schemes are eligible. Content
+		scores are still normalised over the whole catalogue.
+
+		With ``lean=True`` a result only has the LEAN_FIELDS (slug, scheme_name) and the
+		score columns; the other fields can be fetched with get_schemes().
+
+		With ``timings=True`` (or whenever a timing sink is installed) per-stage wall
+		times in milliseconds are put in ``out.attrs["timings"]``.
+
+		With ``paginate=True`` the profile is ranked ranking_cache.depth schemes deep and
+		this is the first page of that ranking: ``out.attrs["next_cursor"]`` (None after
+		the last page) gets the next one from recommend_page() without rescoring.
+		"""
+		assert self.tfidf_matrix is not None
+		if paginate:
+			timer = timing.start(timings)
+			ranking = self.rank_for_pages(
+				profile, content_weight, eligibility_weight, popularity_weight, candidate_budget, hard_filter, timer=timer,
 			)
-		else:
-			# Add general scheme-related terms to improve matching
-			query_text += " government scheme benefit assistance subsidy support aid help"
-
-		# Transform the query and the filtered scheme texts (use vectorizer already fitted)
-		concatenated_texts = ColumnConcatenator(self.text_columns).transform(df)
-		query_vec = self.vectorizer.transform([query_text])
-		content_scores = cosine_similarity(query_vec, self.vectorizer.transform(concatenated_texts)).ravel()
-
-		# Eligibility scores (calculated on filtered df)
-		elig_scores = np.array([self._eligibility_score(row, profile) for _, row in df.iterrows()])
-
-		# Popularity from filtered df
-		pop_scores = df["__popularity__"].values
-
-		# Normalize and boost content scores (they're typically low)
-		# Apply square root to boost low scores more
-		content_scores_normalized = np.sqrt(np.maximum(content_scores, 0))
-		# Scale to 0-1 range more generously
-		if content_scores_normalized.max() > 0:
-			content_scores_normalized = 0.3 + 0.7 * (content_scores_normalized / content_scores_normalized.max())
-		else:
-			content_scores_normalized = np.full_like(content_scores_normalized, 0.3)
-
-		# Hybrid score with normalized content scores
-		hybrid = (
-			content_weight * content_scores_normalized +
-			eligibility_weight * elig_scores +
-			popularity_weight * pop_scores
+			out = self.paginate(ranking, top_k, lean)
+			spans = timer.result()
+			if spans:
+				out.attrs["timings"] = spans
+				timing.emit("recommend", spans)
+			return out
+		return self.recommend_batch(
+			[profile], top_k, content_weight, eligibility_weight, popularity_weight, candidate_budget,
+			timings=timings, hard_filter=hard_filter, lean=lean,
+		)[0]
+
+	def recommend_batch(
+		self,
+		profiles: List[UserProfile],
+		top_k: int = 10,
+		content_weight: float = 0.6,
+		eligibility_weight: float = 0.3,
+		popularity_weight: float = 0.1,
+		candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+		batch_size: int = 64,
+		timings: bool = False,
+		hard_filter: bool = False,
+		lean: bool = False,
+	) -> List[pd.DataFrame]:
+		"""Recommendations for many profiles, scored together in chunks of ``batch_size``.
+
+		Returns one frame per profile, identical to calling recommend() on each. With a
+		``result_cache`` set, cached rankings are reused and only the misses are scored.
+		With ``timings`` every frame carries the stage timings of the whole call.
+		"""
+		assert self.tfidf_matrix is not None
+		timer = timing.start(timings)
+		with timing.maybe_profile("recommend"):
+			results = self._recommend_batch(
+				profiles, top_k, (content_weight, eligibility_weight, popularity_weight),
+				candidate_budget, batch_size, timer, hard_filter, lean,
+			)
+		spans = timer.result()
+		if spans:
+			for out in results:
+				out.attrs["timings"] = spans
+			timing.emit("recommend", spans)
+		return results
+
+	def _recommend_batch(
+		self,
+		profiles: List[UserProfile],
+		top_k: int,
+		weights: Tuple[float, float, float],
+		candidate_budget: Optional[int],
+		batch_size: int,
+		timer,
+		hard_filter: bool = False,
+		lean: bool = False,
+	) -> List[pd.DataFrame]:
+		results: List[Optional[pd.DataFrame]] = [None] * len(profiles)
+		keys: List[Optional[str]] = [None] * len(profiles)
+		cache = self.result_cache
+		if cache is not None:
+			with timer.span("cache"):
+				for i, profile in enumerate(profiles):
+					keys[i] = profile_fingerprint(profile, top_k, weights, candidate_budget, self.content_scorer, hard_filter, lean)
+					cached = cache.get(self.model_version, keys[i])
+					if cached is not None:
+						results[i] = cached.copy()
+		pending = [i for i, out in enumerate(results) if out is None]
+		for start in range(0, len(pending), batch_size):
+			chunk = pending[start:start + batch_size]
+			frames = self._rank([profiles[i] for i in chunk], top_k, *weights, candidate_budget, timer, hard_filter, lean)
+			for i, out in zip(chunk, frames):
+				if cache is not None:
+					with timer.span("cache"):
+						cache.put(self.model_version, keys[i], out.copy())
+				results[i] = out
+		return results
+
+	def rank_for_pages(
+		self,
+		profile: UserProfile,
+		content_weight: float = 0.6,
+		eligibility_weight: float = 0.3,
+		popularity_weight: float = 0.1,
+		candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+		hard_filter: bool = False,
+		depth: Optional[int] = None,
+		timer=timing.NULL_TIMER,
+	) -> Ranking:
+		"""A profile's ranking ``depth`` schemes deep (default: ranking_cache.depth).
+
+		Ranked as recommend(profile, top_k=depth) would, so the pruning budget grows to
+		the depth and hybrid scores are normalised over everything scored for it. Depth
+		0 ranks every scheme, scoring each in full (slow on a large catalogue).
+		"""
+		if depth is None:
+			depth = self.ranking_cache.depth if self.ranking_cache is not None else 0
+		if not depth:
+			depth, candidate_budget = self.tfidf_matrix.shape[0], None
+		[(rows, content, eligibility, hybrid, _, exact)] = self._rank_rows(
+			[profile], depth, content_weight, eligibility_weight, popularity_weight, candidate_budget, timer, hard_filter,
 		)
+		return Ranking(rows, np.column_stack([content, eligibility, hybrid]), exact)
+
+	def paginate(self, ranking: Ranking, top_k: int = 10, lean: bool = False) -> pd.DataFrame:
+		"""The first page of a ranking, which is kept in ranking_cache for the next ones."""
+		if self.ranking_cache is None:
+			raise ValueError("Pagination needs a ranking_cache")
+		entry_id = self.ranking_cache.put(self.model_version, ranking)
+		return self._page(ranking, entry_id, 0, top_k, lean)
+
+	def recommend_page(self, cursor: str, top_k: int = 10, lean: bool = False) -> pd.DataFrame:
+		"""The page a cursor from an earlier page points at.
+
+		Raises ranking_cache.CursorExpired once the ranking has expired, been evicted or
+		belongs to another model version; the client then asks for the first page again.
+		"""
+		if self.ranking_cache is None:
+			raise ValueError("Pagination needs a ranking_cache")
+		ranking, offset = self.ranking_cache.get(self.model_version, cursor)
+		return self._page(ranking, parse_cursor(cursor)[0], offset, top_k, lean)
+
+	def _page(self, ranking: Ranking, entry_id: Optional[str], offset: int, top_k: int, lean: bool) -> pd.DataFrame:
+		end = offset + max(top_k, 0)
+		out = self._scored_frame(ranking.rows[offset:end].astype(np.int64), ranking.scores[offset:end], lean)
+		out.attrs["exact"] = ranking.exact
+		# No cursor when this is the last page, or when the ranking was too big to keep
+		out.attrs["next_cursor"] = make_cursor(entry_id, end) if entry_id is not None and end < len(ranking) else None
+		return out
 
-		# Apply min-max normalization to boost scores to a better range
-		# This ensures top recommendations have scores in 50-90% range
-		if hybrid.max() > hybrid.min():
-			# Normalize to 0.4-0.95 range (40% to 95%)
-			hybrid_normalized = 0.4 + 0.55 * ((hybrid - hybrid.min()) / (hybrid.max() - hybrid.min() + 1e-9))
-		else:
-			hybrid_normalized = np.full_like(hybrid, 0.5)
+	def _scored_frame(self, rows: np.ndarray, scores: np.ndarray, lean: bool) -> pd.DataFrame:
+		# A result frame from stored row positions and SCORE_COLUMNS (quick table, pages)
+		out = self._result_frame(rows, lean)
+		content, eligibility, hybrid = np.asarray(scores, dtype=np.float64).T  # SCORE_COLUMNS order
+		out["score_content"] = content
+		out["score_eligibility"] = eligibility
+		out["score_popularity"] = self.popularity[rows]
+		out["score_hybrid"] = hybrid
+		return out
 
-		# Top-k indices relative to filtered df
-		indices = np.argsort(-hybrid_normalized)[:top_k]
-		out = df.iloc[indices].copy()
-		
-		# Store original scores for transparency
-		out["score_content"] = content_scores[indices]
-		out["score_eligibility"] = elig_scores[indices]
-		out["score_popularity"] = pop_scores[indices]
-		# Use normalized hybrid score for final ranking
-		out["score_hybrid"] = hybrid_normalized[indices]
+	def build_quick_table(
+		self,
+		depth: int = 50,
+		candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+		**axes,
+	) -> QuickTable:
+		"""Rank every coarse quick-recommendation profile once and keep the top ``depth``.
+
+		``axes`` overrides the states, genders, castes or occupations enumerated (see
+		quick_table.build_quick_table). The table is saved with the model.
+		"""
+		scheme_df, cache = self.scheme_df, self.result_cache
+		# Rank against a positional index so each result frame's index is the row positions
+		self.scheme_df, self.result_cache = scheme_df.reset_index(drop=True), None
+		try:
+			def rank_batch(profiles: List[Dict[str, Any]], k: int):
+				frames = self.recommend_batch([UserProfile(**p) for p in profiles], top_k=k, candidate_budget=candidate_budget, lean=True)
+				return [(frame.index.to_numpy(), frame[list(SCORE_COLUMNS)].to_numpy()) for frame in frames]
+
+			table = build_quick_table(rank_batch, len(scheme_df), depth, **axes)
+		finally:
+			self.scheme_df, self.result_cache = scheme_df, cache
+		self.quick_table = table
+		return table
+
+	def recommend_quick(
+		self,
+		profile: UserProfile,
+		top_k: int = 10,
+		candidate_budget: Optional[int] = DEFAULT_CANDIDATE_BUDGET,
+		hard_filter: bool = False,
+		lean: bool = False,
+	) -> pd.DataFrame:
+		"""recommend() for quick-recommendation profiles, served from the quick table.
+
+		Profiles the table does not cover (other interests or income, an unlisted
+		occupation, top_k beyond its depth, ...) are ranked live as usual;
+		``out.attrs["quick_table"]`` says which happened.
+		"""
+		out = self.lookup_quick(profile, top_k, hard_filter, lean)
+		if out is None:
+			out = self.recommend(profile, top_k=top_k, candidate_budget=candidate_budget, hard_filter=hard_filter, lean=lean)
+			out.attrs["quick_table"] = False
+		return out
 
+	def lookup_quick(
+		self, profile: UserProfile, top_k: int = 10, hard_filter: bool = False, lean: bool = False,
+	) -> Optional[pd.DataFrame]:
+		"""The quick table's top-k for a profile, or None when the table does not cover it.
+
+		With ``hard_filter`` ineligible schemes are dropped from the stored ranking; when
+		that leaves fewer than top_k of a full-depth entry the profile is not covered.
+		"""
+		table = self.quick_table
+		entry = table.entry(profile) if table is not None and top_k <= table.depth else None
+		if entry is None:
+			return None
+		rows = np.asarray(table.rows[entry])
+		keep = rows >= 0
+		if hard_filter:
+			complete = not keep.all()  # a padded entry already holds every scheme
+			keep &= self.constraints.mask(profile)[np.maximum(rows, 0)]
+			if keep.sum() < top_k and not complete:
+				return None
+		keep = np.flatnonzero(keep)[:top_k]
+		out = self._scored_frame(rows[keep], np.asarray(table.scores[entry])[keep], lean)
+		out.attrs["quick_table"] = True
 		return out
 
+	def _result_frame(self, rows: np.ndarray, lean: bool) -> pd.DataFrame:
+		# The catalogue rows a result is built on, before its score columns are added.
+		# take() copies only those rows, once; a lean frame reads two fields from the store
+		if not lean:
+			return self.scheme_df.take(rows)
+		store = self.scheme_store
+		columns = {field: store.column(field, rows) for field in LEAN_FIELDS if field in store.buffers}
+		labels = self._scheme_df.index[rows] if self._scheme_df is not None else self._frame_layout.labels(rows)
+		return pd.DataFrame(columns, index=labels)
+
+	def build_related(self, depth: int = 20, workers: Optional[int] = None, block_mb: float = 64.0) -> RelatedSchemes:
+		"""Find every scheme's ``depth`` most similar schemes once, for similar().
+
+		Similarity is the cosine of the schemes' TF-IDF rows. The work is done in blocks
+		of rows spread over ``workers`` processes, each using about ``block_mb`` of memory
+		(see related.build_related). The table is saved with the model.
+		"""
+		self.related = build_related(self.tfidf_matrix, depth, workers, block_mb, self.removed)
+		return self.related
+
+	def similar(self, slug: str, k: int = 10, lean: bool = False) -> pd.DataFrame:
+		"""The k schemes most similar to a scheme, most similar first, with score_similarity.
+
+		Read from the related table when the model has one that is deep enough (k row
+		reads, no scoring); otherwise, e.g. for a model loaded from a delta, that one
+		scheme's similarities are computed directly. ``out.attrs["related_table"]`` says
+		which happened. Raises KeyError for an unknown or removed slug.
+		"""
+		row = self.scheme_store.position(slug)
+		if row is None or (self.removed is not None and self.removed[row]):
+			raise KeyError(f"Unknown or removed scheme: {slug!r}")
+		table = self.related is not None and k <= self.related.depth
+		if table:
+			rows, scores = self.related.neighbours(row, k)
+		else:
+			rows, scores = neighbours_of(self.tfidf_matrix, row, k, self.removed)
+		out = self._result_frame(rows.astype(np.int64), lean)
+		out["score_similarity"] = scores.astype(np.float64)
+		out.attrs["related_table"] = table
+		return out
 
-	def save(self, path: str):
-		assert self.scheme_df is not None and self.tfidf_matrix is not None
-		joblib.dump({
-			"vectorizer": self.vectorizer,
+	def get_schemes(self, slugs: List[str], fields: Optional[List[str]] = None) -> List[Optional[Dict[str, Any]]]:
+		"""Stored text fields (default: all of scheme_store.fields) of schemes by slug.
+
+		One dict per slug, in the order given; None for unknown or removed slugs.
+		"""
+		positions = [self.scheme_store.position(slug) for slug in slugs]
+		if self.removed is not None:
+			positions = [None if p is None or self.removed[p] else p for p in positions]
+		found = iter(self.scheme_store.records([p for p in positions if p is not None], fields))
+		return [None if p is None else next(found) for p in positions]
+
+	def _artifact_vectorizer(self, matrix: sp.csr_matrix) -> Tuple[TfidfVectorizer, Optional[np.ndarray]]:
+		# Shallow copy for the artifact: vocabulary as arrays, no stop_words_ and, when the
+		# document counts of matrix reproduce it exactly, no IDF (load() recomputes it)
+		vectorizer = copy.copy(self.vectorizer)
+		vectorizer.vocabulary_ = ArrayVocabulary.from_dict(self.vectorizer.vocabulary_)
+		vectorizer.__dict__.pop("stop_words_", None)
+		counts = idf_document_frequencies(self.vectorizer, matrix)
+		tfidf = getattr(self.vectorizer, "_tfidf", None)
+		if counts is None or tfidf is None or "idf_" not in vars(tfidf):
+			return vectorizer, None
+		vectorizer._tfidf = copy.copy(tfidf)
+		del vectorizer._tfidf.idf_
+		return vectorizer, counts
+
+	def save(self, path: str, float32: bool = False):
+		"""Write the model as a format 2 artifact (see ARTIFACT_VERSION).
+
+		The file is written under a temporary name and renamed into place, so ``path``
+		always holds a complete artifact; artifacts.publish() adds versioning on top.
+		``float32=True`` stores the TF-IDF matrix and postings as float32, halving their
+		size on disk and in memory; content scores then differ from the float64 model's
+		from about the seventh significant digit, which can swap near-tied schemes.
+		"""
+		assert self.tfidf_matrix is not None
+		matrix = sp.csr_matrix(self.tfidf_matrix)
+		dtype = np.float32 if float32 else matrix.dtype
+		vectorizer, document_counts = self._artifact_vectorizer(matrix)
+		if self._scheme_df is None:
+			# Loaded from a format 2 artifact and unchanged since: the store has it all
+			store, layout = self.scheme_store, self._frame_layout
+		else:
+			store = SchemeStore.build(self._scheme_df)
+			layout = FrameLayout.of(self._scheme_df, store)
+		# Store the raw CSR arrays (uncompressed) so load() can memory-map them
+		_dump_atomic({
+			"format": ARTIFACT_FORMAT,
+			"format_version": ARTIFACT_VERSION,
+			"vectorizer": vectorizer,
+			"idf_document_counts": document_counts,
+			"idf_documents": matrix.shape[0],
 			"columns": self.text_columns,
-			"scheme_df": self.scheme_df,
-			"tfidf_shape": self.tfidf_matrix.shape,
+			"scheme_frame": layout,
+			"tfidf_shape": matrix.shape,
+			"tfidf_data": matrix.data.astype(dtype, copy=False),
+			"tfidf_indices": matrix.indices,
+			"tfidf_indptr": matrix.indptr,
+			"postings_data": self.term_postings.data.astype(dtype, copy=False),
+			"postings_indices": self.term_postings.indices,
+			"postings_indptr": self.term_postings.indptr,
+			"eligibility_engine": self.eligibility_engine,
+			"constraints": self.constraints,
+			"state_index": self.state_index,
+			"scheme_store": store,
 			"popularity_col": self.popularity_col,
+			"removed": None if self.removed is None else np.flatnonzero(self.removed),
+			"lsa_term_vectors": self.lsa_term_vectors,
+			"lsa_embeddings": self.lsa_embeddings,
+			"content_scorer": self.content_scorer,
+			"quick_table": self.quick_table,
+			"related": self.related,
 		}, path)
+		self.model_version = artifact_hash(path)
+		self.base_path, self.base_version, self.base_rows = path, self.model_version, matrix.shape[0]
+
+	def save_delta(self, path: str) -> None:
+		"""Save only the changes since the base artifact (the last full save() or load()).
+
+		The delta holds the appended rows and the tombstoned positions, plus the base's
+		path (relative to the delta) and content hash; load() applies it on top of the
+		base. Deltas are cumulative, so only the latest one needs publishing.
+		"""
+		if self.base_path is None:
+			raise ValueError("No base artifact to save a delta against; save() the full model first")
+		base_rel = os.path.relpath(os.path.abspath(self.base_path), os.path.dirname(os.path.abspath(path)))
+		_dump_atomic({
+			"format": ARTIFACT_FORMAT,
+			"format_version": ARTIFACT_VERSION,
+			"delta_of": base_rel,
+			"base_version": self.base_version,
+			"base_rows": self.base_rows,
+			"added": self.scheme_df.iloc[self.base_rows:].drop(columns="__popularity__"),
+			"removed": np.array([], dtype=np.int64) if self.removed is None else np.flatnonzero(self.removed),
+		}, path)
+		self.model_version = artifact_hash(path)
+
+	@staticmethod
+	def load(path: str, mmap_mode: Optional[str] = "r", timings: bool = False) -> "SchemeRecommender":
+		"""Load a saved model (full artifact or delta).
+
+		With ``timings=True`` (or a timing sink installed) per-stage load times in
+		milliseconds are kept in ``rec.load_timings``.
+		"""
+		timer = timing.start(timings)
+		with timing.maybe_profile("load"):
+			rec = SchemeRecommender._load(path, mmap_mode, timer)
+		rec.load_timings = timer.result() or None
+		if rec.load_timings:
+			timing.emit("load", rec.load_timings)
+		return rec
 
 	@staticmethod
-	def load(path: str) -> "SchemeRecommender":
-		blob = joblib.load(path)
+	def _load(path: str, mmap_mode: Optional[str], timer) -> "SchemeRecommender":
+		# With mmap_mode="r" the numeric arrays are mapped read-only from the file, so
+		# load time does not grow with the corpus and worker processes share the pages
+		with timer.span("read"):
+			blob = joblib.load(path, mmap_mode=mmap_mode)
+		if blob.get("format", ARTIFACT_FORMAT) != ARTIFACT_FORMAT or blob.get("format_version", 1) > ARTIFACT_VERSION:
+			raise ValueError(
+				f"{path} is a {blob.get('format')!r} format {blob.get('format_version')} artifact; "
+				f"this version reads {ARTIFACT_FORMAT!r} formats up to {ARTIFACT_VERSION}"
+			)
+		if "delta_of" in blob:
+			return SchemeRecommender._load_delta(path, blob, mmap_mode, timer)
 		rec = SchemeRecommender(
 			text_columns=blob["columns"],
 			popularity_col=blob.get("popularity_col"),
 		)
 		rec.vectorizer = blob["vectorizer"]
-		rec.scheme_df = blob["scheme_df"]
-		# We will lazily rebuild tfidf_matrix from vectorizer and texts if needed on demand
-		concatenated_text = ColumnConcatenator(rec.text_columns).transform(rec.scheme_df)
-		rec.tfidf_matrix = rec.vectorizer.transform(concatenated_text)
+		if blob.get("idf_document_counts") is not None:
+			rec.vectorizer.idf_ = idf_from_document_frequencies(
+				blob["idf_document_counts"], blob["idf_documents"], rec.vectorizer.smooth_idf,
+			)
+		rec.scheme_store = blob.get("scheme_store")
+		if blob.get("scheme_frame") is not None:
+			# Format 2: scheme_df is rebuilt from the store when first read
+			rec._frame_layout = blob["scheme_frame"]
+			rec.popularity = rec._frame_layout.arrays["__popularity__"]
+		else:
+			rec.scheme_df = blob["scheme_df"]
+			rec.popularity = rec.scheme_df["__popularity__"].to_numpy()
+		with timer.span("tfidf_matrix"):
+			if "tfidf_data" in blob:
+				rec.tfidf_matrix = sp.csr_matrix(
+					(blob["tfidf_data"], blob["tfidf_indices"], blob["tfidf_indptr"]),
+					shape=tuple(blob["tfidf_shape"]),
+				)
+			else:
+				# Artifacts saved before the matrix was persisted: rebuild it from the texts
+				concatenated_text = ColumnConcatenator(rec.text_columns).transform(rec.scheme_df)
+				rec.tfidf_matrix = rec.vectorizer.transform(concatenated_text)
+		with timer.span("term_postings"):
+			if "postings_data" in blob:
+				rec.term_postings = sp.csc_matrix(
+					(blob["postings_data"], blob["postings_indices"], blob["postings_indptr"]),
+					shape=tuple(blob["tfidf_shape"]),
+				)
+			else:
+				rec.term_postings = sp.csc_matrix(rec.tfidf_matrix)
+		with timer.span("eligibility_engine"):
+			rec.eligibility_engine = blob.get("eligibility_engine")
+			if rec.eligibility_engine is None:
+				rec.eligibility_engine = SchemeRecommender.build_eligibility_engine(rec.scheme_df)
+		with timer.span("artifact_hash"):
+			rec.model_version = artifact_hash(path)
+		rec.fuzzy_max_chars = rec.eligibility_engine.fuzzy_max_chars
+		rec.fuzzy_workers = rec.eligibility_engine.fuzzy_workers
+		if blob.get("lsa_term_vectors") is not None:
+			rec.lsa_term_vectors = blob["lsa_term_vectors"]
+			rec.lsa_embeddings = blob["lsa_embeddings"]
+			rec.lsa_components = rec.lsa_term_vectors.shape[1]
+		rec.content_scorer = blob.get("content_scorer", "tfidf")
+		with timer.span("state_index"):
+			rec.state_index = blob.get("state_index")
+			if rec.state_index is None:
+				rec.state_index = SchemeRecommender.build_state_index(rec.scheme_df)
+		with timer.span("constraints"):
+			rec.constraints = blob.get("constraints")
+			if rec.constraints is None:
+				rec.constraints = SchemeRecommender.build_constraints(rec.scheme_df)
+		with timer.span("scheme_store"):
+			if rec.scheme_store is None:
+				rec.scheme_store = SchemeStore.build(rec.scheme_df)
+		# Artifacts do not carry the engine's texts; it reads them from the store when first used
+		rec.eligibility_engine.text_source = rec._stored_eligibility_texts
+		if blob.get("removed") is not None:
+			rec._tombstone(blob["removed"])
+		rec.quick_table = blob.get("quick_table")
+		rec.related = blob.get("related")
+		rec.base_path, rec.base_version, rec.base_rows = path, rec.model_version, rec.tfidf_matrix.shape[0]
+		return rec
+
+	@staticmethod
+	def _load_delta(path: str, blob: Dict[str, Any], mmap_mode: Optional[str], timer) -> "SchemeRecommender":
+		base_path = os.path.join(os.path.dirname(os.path.abspath(path)), blob["delta_of"])
+		rec = SchemeRecommender._load(base_path, mmap_mode, timer)
+		if rec.base_version != blob["base_version"] or rec.base_rows != blob["base_rows"]:
+			raise ValueError(f"{path} is a delta against a different version of {base_path}")
+		with timer.span("apply_delta"):
+			if len(blob["added"]):
+				rec._append(blob["added"])
+			if len(blob["removed"]):
+				rec._tombstone(blob["removed"])
+			rec._refresh_popularity()
+		with timer.span("artifact_hash"):
+			rec.model_version = artifact_hash(path)
 		return rec
 
 
@@ -483,14 +1448,151 @@ def load_dataset(csv_path: str) -> pd.DataFrame:
 	return df
 
 
-def train_and_save(csv_path: str, model_out: str, popularity_col: Optional[str] = None) -> None:
-	df = load_dataset(csv_path)
-	rec = SchemeRecommender(popularity_col=popularity_col)
-	rec.fit(df)
-	rec.save(model_out)
+# Read as text in every chunk so that each chunk's cleaning matches the whole file's
+_TEXT_DTYPES = {c: str for c in set(TEXT_COLUMNS_DEFAULT) | set(ELIGIBILITY_COLUMNS) | {"level", "slug", "state", "states"}}
+
+
+def _ingest_workers(workers: Optional[int]) -> int:
+	return workers if workers is not None else (os.cpu_count() or 1)
+
+
+def _clean_chunk(chunk: pd.DataFrame, text_columns: List[str]) -> Tuple[pd.DataFrame, np.ndarray, set]:
+	# Runs in a pool worker: the chunk-sized share of fit()'s preprocessing
+	cleaned = {c.strip() for c in chunk.columns if _is_text_column(chunk[c])}
+	chunk = SchemeRecommender.clean_dataframe(chunk)
+	for c in text_columns:
+		if c not in chunk.columns:
+			chunk[c] = ""
+	return chunk, ColumnConcatenator(text_columns).transform(chunk), cleaned
+
+
+def iter_clean_chunks(
+	csv_path: str, text_columns: List[str], chunksize: int = 10000, workers: Optional[int] = None
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray, set]]:
+	"""Yield (cleaned chunk, concatenated texts, cleaned text columns) in file order.
+
+	Chunks are cleaned in a pool of ``workers`` processes (default: one per core; 1
+	cleans in this process). At most two chunks per worker are read ahead, so memory
+	stays proportional to the chunk size rather than the file.
+	"""
+	workers = _ingest_workers(workers)
+	reader = pd.read_csv(csv_path, encoding="utf-8", chunksize=chunksize, dtype=_TEXT_DTYPES)
+	if workers <= 1:
+		for chunk in reader:
+			yield _clean_chunk(chunk, text_columns)
+		return
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		pending: deque = deque()
+		for chunk in reader:
+			pending.append(pool.submit(_clean_chunk, chunk, text_columns))
+			if len(pending) >= 2 * workers:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+
+
+def _dump_atomic(blob: Dict[str, Any], path: str) -> None:
+	# Write next to path, then rename over it: a process loading path (or polling it for
+	# a new version) sees the old artifact or the new one, never a partially written one
+	tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+	try:
+		joblib.dump(blob, tmp)
+		with open(tmp, "rb") as f:
+			os.fsync(f.fileno())
+		os.replace(tmp, path)
+	finally:
+		if os.path.exists(tmp):
+			os.remove(tmp)
 
 
-def recommend_cli(model_path: str, profile_json: str, top_k: int = 10) -> List[Dict[str, Any]]:
+def _peak_rss_mb() -> Optional[float]:
+	# Peak resident set size of this process and of finished pool workers (Unix only)
+	try:
+		import resource
+	except ImportError:
+		return None
+	scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+	peak = max(
+		resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+		resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+	)
+	return round(peak / scale, 1)
+
+
+def train_and_save(
+	csv_path: str,
+	model_out: str,
+	popularity_col: Optional[str] = None,
+	fuzzy_max_chars: Optional[int] = None,
+	chunksize: int = 10000,
+	workers: Optional[int] = None,
+	lsa_components: Optional[int] = None,
+	quick_table_depth: Optional[int] = None,
+	keep_versions: int = 0,
+	related_depth: Optional[int] = None,
+	related_block_mb: float = 64.0,
+) -> SchemeRecommender:
+	# keep_versions > 0 publishes model_out as a new version (see artifacts.publish),
+	# keeping that many; otherwise model_out is simply (atomically) overwritten
+	rec = SchemeRecommender(popularity_col=popularity_col, fuzzy_max_chars=fuzzy_max_chars, lsa_components=lsa_components)
+	rec.fit_csv(csv_path, chunksize=chunksize, workers=workers)
+	if quick_table_depth:
+		rec.build_quick_table(depth=quick_table_depth)
+	if related_depth:
+		rec.build_related(depth=related_depth, workers=workers, block_mb=related_block_mb)
+	if keep_versions:
+		from artifacts import publish
+		publish(rec, model_out, keep=keep_versions)
+	else:
+		rec.save(model_out)
+	return rec
+
+
+def update_and_save(
+	model_path: str, out: str, add_csv: Optional[str] = None, remove_slugs: Optional[List[str]] = None, compact: bool = False
+) -> SchemeRecommender:
+	# Rows of add_csv whose slug is already live replace that scheme
+	rec = SchemeRecommender.load(model_path)
+	# Deltas carry no quick or related table (quick requests are ranked live and similar
+	# schemes found directly until the next full save)
+	quick_depth = rec.quick_table.depth if rec.quick_table is not None else None
+	related_depth = rec.related.depth if rec.related is not None else None
+	if remove_slugs:
+		rec.remove_schemes(remove_slugs)
+	if add_csv:
+		df = load_dataset(add_csv)
+		if "slug" in df.columns and "slug" in rec.scheme_df.columns:
+			live = rec.scheme_df["slug"] if rec.removed is None else rec.scheme_df["slug"][~rec.removed]
+			replaced = sorted(set(df["slug"].dropna()) & set(live))
+			if replaced:
+				rec.remove_schemes(replaced)
+		rec.add_schemes(df)
+	if compact:
+		rec.compact()
+		if quick_depth:
+			rec.build_quick_table(depth=quick_depth)
+		if related_depth:
+			rec.build_related(depth=related_depth)
+		rec.save(out)
+	else:
+		rec.save_delta(out)
+	return rec
+
+
+def convert_artifact(model_path: str, out: str, float32: bool = False, related_depth: Optional[int] = None) -> SchemeRecommender:
+	"""Rewrite any saved model (older format, or a delta with its base) as a format 2 artifact.
+
+	``related_depth`` also builds (or rebuilds) its related-schemes table that deep.
+	"""
+	# Read fully into memory, so out may be the same path as model_path
+	rec = SchemeRecommender.load(model_path, mmap_mode=None)
+	if related_depth:
+		rec.build_related(depth=related_depth)
+	rec.save(out, float32=float32)
+	return rec
+
+
+def recommend_cli(model_path: str, profile_json: str, top_k: int = 10, hard_filter: bool = False) -> List[Dict[str, Any]]:
 	rec = SchemeRecommender.load(model_path)
 	profile_dict = json.loads(profile_json)
 	profile = UserProfile(
@@ -505,7 +1607,7 @@ def recommend_cli(model_path: str, profile_json: str, top_k: int = 10) -> List[D
 		interests=profile_dict.get("interests"),
 		previous_applications=profile_dict.get("previous_applications"),
 	)
-	df = rec.recommend(profile, top_k=top_k)
+	df = rec.recommend(profile, top_k=top_k, hard_filter=hard_filter)
 	cols = [c for c in [
 		"scheme_name", "slug", "level", "schemeCategory", "tags",
 		"details", "benefits", "eligibility", "application", "documents",
@@ -515,6 +1617,12 @@ def recommend_cli(model_path: str, profile_json: str, top_k: int = 10) -> List[D
 	return result
 
 
+def similar_cli(model_path: str, slug: str, top_k: int = 10, lean: bool = False) -> List[Dict[str, Any]]:
+	rec = SchemeRecommender.load(model_path)
+	df = rec.similar(slug, k=top_k, lean=lean)
+	return df.to_dict(orient="records")
+
+
 if __name__ == "__main__":
 	import argparse
 	parser = argparse.ArgumentParser(description="Train or run scheme recommender")
@@ -524,19 +1632,103 @@ if __name__ == "__main__":
 	t.add_argument("--data", required=True, help="Path to CSV")
 	t.add_argument("--out", default="artifacts/scheme_recommender.joblib", help="Output model path")
 	t.add_argument("--popularity_col", default=None, help="Optional popularity column in CSV")
+	t.add_argument("--fuzzy_max_chars", type=int, default=None,
+		help="Truncate scheme texts to this many characters for fuzzy eligibility matching (default: full text, exact scores)")
+	t.add_argument("--chunksize", type=int, default=10000, help="CSV rows cleaned per chunk")
+	t.add_argument("--workers", type=int, default=None, help="Processes cleaning chunks (default: one per core)")
+	t.add_argument("--lsa_components", type=int, default=None,
+		help="Also fit an LSA index of this many dimensions and use it as the content scorer")
+	t.add_argument("--quick_table", type=int, default=None, metavar="DEPTH",
+		help="Precompute the top DEPTH schemes of every quick-recommendation profile (e.g. 50)")
+	t.add_argument("--keep_versions", type=int, default=0, metavar="N",
+		help="Publish --out as a new timestamped version next to it, keeping the newest N (0: overwrite --out)")
+	t.add_argument("--related", type=int, default=None, metavar="DEPTH",
+		help="Precompute every scheme's DEPTH most similar schemes for `similar` (e.g. 20); uses --workers processes")
+	t.add_argument("--related_block_mb", type=float, default=64.0,
+		help="Working memory per process while finding similar schemes")
+
+	u = sub.add_parser("update", help="Add/replace/remove schemes without retraining; writes a delta")
+	u.add_argument("--model", required=True, help="Path to saved joblib (full artifact or delta)")
+	u.add_argument("--out", required=True, help="Output delta path (full model path with --compact)")
+	u.add_argument("--add", default=None, help="CSV of schemes to add; rows with an existing slug replace it")
+	u.add_argument("--remove", nargs="*", default=[], help="Slugs of schemes to remove")
+	u.add_argument("--compact", action="store_true", help="Drop removed rows, refit the vocabulary and save a full model")
+
+	c = sub.add_parser("convert", help="Rewrite a saved model (older format or delta) in the current compact format")
+	c.add_argument("--model", required=True, help="Path to saved joblib (full artifact or delta)")
+	c.add_argument("--out", required=True, help="Output model path (may be the same as --model)")
+	c.add_argument("--float32", action="store_true",
+		help="Store the TF-IDF matrices as float32 (half the size; scores change in about the 7th digit)")
+	c.add_argument("--related", type=int, default=None, metavar="DEPTH",
+		help="Also precompute every scheme's DEPTH most similar schemes")
 
 	r = sub.add_parser("recommend", help="Recommend using saved model")
 	r.add_argument("--model", required=True, help="Path to saved joblib")
 	r.add_argument("--profile", required=True, help="User profile as JSON string")
 	r.add_argument("--top_k", type=int, default=10)
+	r.add_argument("--hard_filter", action="store_true", help="Leave out schemes whose age/income/caste/gender/state limits exclude the profile")
+
+	s = sub.add_parser("similar", help="Schemes most similar to a scheme, using saved model")
+	s.add_argument("--model", required=True, help="Path to saved joblib")
+	s.add_argument("--slug", required=True, help="Slug of the scheme")
+	s.add_argument("--top_k", type=int, default=10)
+	s.add_argument("--lean", action="store_true", help="Only return the listing fields")
+
+	b = sub.add_parser("bulk-score", help="Recommend for every profile of a JSONL file into resumable output shards")
+	b.add_argument("--model", required=True, help="Path to saved joblib")
+	b.add_argument("--profiles", required=True, help="JSONL file, one user profile per line")
+	b.add_argument("--out_dir", required=True, help="Directory for part-NNNNN.jsonl shards and checkpoint.json")
+	b.add_argument("--top_k", type=int, default=10)
+	b.add_argument("--workers", type=int, default=None, help="Scoring processes, each with the model loaded (default: one per core)")
+	b.add_argument("--batch_size", type=int, default=64, help="Profiles scored together")
+	b.add_argument("--shard_size", type=int, default=100000, help="Input lines per output shard")
+	b.add_argument("--checkpoint_every", type=int, default=10000, help="Input lines between checkpoints")
+	b.add_argument("--format", choices=["jsonl", "compact"], default="jsonl",
+		help="jsonl: result records per profile; compact: slugs and hybrid scores only")
+	b.add_argument("--lean", action="store_true", help="Only slugs, names and scores in jsonl records")
+	b.add_argument("--hard_filter", action="store_true", help="Leave out schemes whose age/income/caste/gender/state limits exclude the profile")
+	b.add_argument("--candidate_budget", type=int, default=DEFAULT_CANDIDATE_BUDGET, help="Max schemes fully scored per profile (0 scores every scheme)")
+	b.add_argument("--id_field", default="id", help="Profile field copied to each output line to identify the user")
+	b.add_argument("--restart", action="store_true", help="Discard an unfinished run in --out_dir instead of resuming it")
+	b.add_argument("--progress_seconds", type=float, default=10.0, help="Seconds between progress lines on stderr")
 
 	args = parser.parse_args()
 
 	if args.cmd == "train":
-		train_and_save(args.data, args.out, args.popularity_col)
+		rec = train_and_save(
+			args.data, args.out, args.popularity_col, args.fuzzy_max_chars, args.chunksize, args.workers, args.lsa_components,
+			args.quick_table, args.keep_versions, args.related, args.related_block_mb,
+		)
 		print(f"Saved model to {args.out}")
+		if rec.quick_table is not None:
+			print(f"Quick table: {len(rec.quick_table.rows)} profiles x {rec.quick_table.depth} ({rec.quick_table.nbytes / 1e6:.1f} MB)")
+		if rec.related is not None:
+			print(f"Related schemes: {len(rec.related.rows)} schemes x {rec.related.depth} ({rec.related.nbytes / 1e6:.1f} MB)")
+		print(json.dumps(rec.ingest_stats))
+	elif args.cmd == "update":
+		rec = update_and_save(args.model, args.out, args.add, args.remove, args.compact)
+		live = len(rec.scheme_df) - (0 if rec.removed is None else int(rec.removed.sum()))
+		print(f"Saved {'model' if args.compact else 'delta'} to {args.out} ({live} live schemes)")
+	elif args.cmd == "convert":
+		before = os.path.getsize(args.model)
+		convert_artifact(args.model, args.out, args.float32, args.related)
+		print(f"Saved format {ARTIFACT_VERSION} model to {args.out} ({before / 1e6:.1f} MB -> {os.path.getsize(args.out) / 1e6:.1f} MB)")
 	elif args.cmd == "recommend":
-		recs = recommend_cli(args.model, args.profile, top_k=args.top_k)
+		recs = recommend_cli(args.model, args.profile, top_k=args.top_k, hard_filter=args.hard_filter)
+		print(json.dumps(recs, ensure_ascii=False, indent=2))
+	elif args.cmd == "bulk-score":
+		from bulk_scoring import bulk_score
+
+		state = bulk_score(
+			args.model, args.profiles, args.out_dir, top_k=args.top_k, workers=args.workers, batch_size=args.batch_size,
+			shard_size=args.shard_size, checkpoint_every=args.checkpoint_every, output_format=args.format, lean=args.lean,
+			hard_filter=args.hard_filter, candidate_budget=args.candidate_budget or None, id_field=args.id_field,
+			restart=args.restart, progress=lambda report: print(json.dumps(report), file=sys.stderr, flush=True),
+			progress_seconds=args.progress_seconds,
+		)
+		print(f"Scored {state['scored']} profiles ({state['errors']} errors) into {state['shard'] + 1} shard(s) in {args.out_dir}")
+	elif args.cmd == "similar":
+		recs = similar_cli(args.model, args.slug, top_k=args.top_k, lean=args.lean)
 		print(json.dumps(recs, ensure_ascii=False, indent=2))
 	else:
 		parser.print_help()
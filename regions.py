@@ -0,0 +1,135 @@
+import re
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+# Canonical state / union territory name -> (other spellings, official abbreviations).
+# Spellings are searched for in scheme text; abbreviations are only trusted when they are
+# a whole entry of a `state`/`states` cell or what a user typed as their state, since
+# codes such as "up" or "ka" occur inside ordinary words.
+STATES: Dict[str, tuple] = {
+	"andhra pradesh": ((), ("ap",)),
+	"arunachal pradesh": ((), ("ar",)),
+	"assam": ((), ("as",)),
+	"bihar": ((), ("br",)),
+	"chhattisgarh": (("chattisgarh", "chhatisgarh"), ("cg", "ct")),
+	"goa": ((), ("ga",)),
+	"gujarat": (("gujrat",), ("gj",)),
+	"haryana": ((), ("hr",)),
+	"himachal pradesh": ((), ("hp",)),
+	"jharkhand": ((), ("jh",)),
+	"karnataka": ((), ("ka",)),
+	"kerala": (("keralam",), ("kl",)),
+	"madhya pradesh": ((), ("mp",)),
+	"maharashtra": ((), ("mh",)),
+	"manipur": ((), ("mn",)),
+	"meghalaya": ((), ("ml",)),
+	"mizoram": ((), ("mz",)),
+	"nagaland": ((), ("nl",)),
+	"odisha": (("orissa",), ("od", "or")),
+	"punjab": ((), ("pb",)),
+	"rajasthan": ((), ("rj",)),
+	"sikkim": ((), ("sk",)),
+	"tamil nadu": (("tamilnadu",), ("tn",)),
+	"telangana": ((), ("ts", "tg")),
+	"tripura": ((), ("tr",)),
+	"uttar pradesh": ((), ("up",)),
+	"uttarakhand": (("uttaranchal",), ("uk", "ut")),
+	"west bengal": ((), ("wb",)),
+	"andaman and nicobar islands": (("andaman & nicobar", "andaman and nicobar"), ("an",)),
+	"chandigarh": ((), ("ch",)),
+	"dadra and nagar haveli and daman and diu": (
+		("dadra and nagar haveli", "dadra & nagar haveli", "daman and diu", "daman & diu"), ("dn", "dd", "dnh"),
+	),
+	"delhi": (("new delhi", "nct of delhi"), ("dl",)),
+	"jammu and kashmir": (("jammu & kashmir", "j&k"), ("jk",)),
+	"ladakh": ((), ("la",)),
+	"lakshadweep": ((), ("ld",)),
+	"puducherry": (("pondicherry",), ("py",)),
+}
+
+CENTRAL = "central"
+
+_ALIASES: Dict[str, str] = {}
+for _canonical, (_spellings, _codes) in STATES.items():
+	for _name in (_canonical,) + _spellings + _codes:
+		_ALIASES[_name] = _canonical
+
+_CELL_SPLIT = re.compile(r"[,;/|]")
+
+# Any canonical name or spelling as whole words ("goa" but not "goat" or "goal"); longer
+# names first, so "new delhi" or a full union territory name wins over a name inside it
+_NAME_PATTERN = re.compile(r"\b(" + "|".join(
+	re.escape(name) for name in sorted(
+		{name for canonical, (spellings, _) in STATES.items() for name in (canonical,) + spellings},
+		key=len, reverse=True,
+	)
+) + r")\b")
+
+
+def normalize_state(state: Optional[str]) -> Optional[str]:
+	"""Canonical state name for a user-supplied state, name variant or code (None if unknown)."""
+	if not state:
+		return None
+	key = re.sub(r"\s+", " ", str(state).lower()).strip()
+	if key.startswith("state of "):
+		key = key[len("state of "):]
+	return _ALIASES.get(key)
+
+
+def states_mentioned(text: str) -> Set[str]:
+	"""Canonical names of the states lower-cased ``text`` names in full (codes are not searched)."""
+	return {_ALIASES[match.group(1)] for match in _NAME_PATTERN.finditer(text)}
+
+
+class StateIndex:
+	"""Inverted index from canonical state (and "central") to scheme row positions.
+
+	A scheme is listed under a state when its state/states columns or its text name the
+	state (as whole words, see states_mentioned()), and under "central" when its level says so, the same columns
+	recommend() used to scan per request.
+	"""
+
+	def __init__(self, postings: Dict[str, np.ndarray], n_schemes: int):
+		self.postings = postings
+		self.n_schemes = n_schemes
+
+	@classmethod
+	def build(cls, levels: Sequence[str], state_cells: Sequence[str], texts: Sequence[str]) -> "StateIndex":
+		"""Index schemes from lower-cased level, state/states cell and searchable text strings."""
+		n = len(texts)
+		members: Dict[str, List[int]] = {name: [] for name in STATES}
+		for i in range(n):
+			entries = {e.strip() for e in _CELL_SPLIT.split(state_cells[i]) if e.strip()}
+			named = states_mentioned(texts[i])
+			named.update(canonical for canonical, (_, codes) in STATES.items() if any(code in entries for code in codes))
+			for canonical in named:
+				members[canonical].append(i)
+		postings = {name: np.asarray(rows, dtype=np.int32) for name, rows in members.items()}
+		postings[CENTRAL] = np.flatnonzero([CENTRAL in lvl for lvl in levels]).astype(np.int32)
+		return cls(postings, n)
+
+	def append(self, other: "StateIndex") -> None:
+		"""Add the schemes of another index after this one's (positions shifted accordingly)."""
+		for name in set(self.postings) | set(other.postings):
+			self.postings[name] = np.concatenate([
+				self.positions(name), other.positions(name) + np.int32(self.n_schemes),
+			]).astype(np.int32)
+		self.n_schemes += other.n_schemes
+
+	def positions(self, state: str) -> np.ndarray:
+		"""Sorted positions of schemes listed under a canonical state name or "central"."""
+		return self.postings.get(state, np.array([], dtype=np.int32))
+
+	def regional_mask(self, state: Optional[str]) -> np.ndarray:
+		"""Boolean mask over all schemes: central, or mentioning the given canonical state.
+
+		Only the central schemes for a state the index does not know (None, or not a
+		canonical name).
+		"""
+		mask = np.zeros(self.n_schemes, dtype=bool)
+		mask[self.positions(CENTRAL)] = True
+		if state != CENTRAL:
+			mask[self.positions(state)] = True
+		return mask
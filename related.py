@@ -0,0 +1,160 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+
+# Bytes of working memory per similarity entry while a block is ranked: the sparse
+# product (value + column index), its dense copy and argpartition's index array
+BYTES_PER_ENTRY = 28
+
+# The matrix workers rank against and its transpose; set once per worker by _init_worker
+_MATRIX: Optional[sp.csr_matrix] = None
+_MATRIX_T: Optional[sp.csr_matrix] = None
+
+
+class RelatedSchemes:
+	"""Each scheme's nearest neighbours by TF-IDF cosine similarity.
+
+	``rows`` (schemes x depth, int32, -1 padded) holds neighbour row positions, most
+	similar first, and ``scores`` (schemes x depth, float32) their cosine similarities.
+	A scheme is never its own neighbour, and schemes sharing no term with it are left
+	out, so an entry can be shorter than depth. Reading a scheme's top k is one row
+	slice; both arrays are memory-mapped and shared like the other model arrays.
+	"""
+
+	def __init__(self, rows: np.ndarray, scores: np.ndarray):
+		self.rows = rows
+		self.scores = scores
+
+	@property
+	def depth(self) -> int:
+		return self.rows.shape[1]
+
+	@property
+	def nbytes(self) -> int:
+		return self.rows.nbytes + self.scores.nbytes
+
+	def neighbours(self, row: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""Row positions and similarities of up to k neighbours of a scheme row."""
+		rows = np.asarray(self.rows[row, :k])
+		keep = rows >= 0
+		return rows[keep], np.asarray(self.scores[row, :k])[keep]
+
+
+def build_related(
+	matrix: sp.csr_matrix,
+	depth: int = 20,
+	workers: Optional[int] = None,
+	block_mb: float = 64.0,
+	exclude: Optional[np.ndarray] = None,
+) -> RelatedSchemes:
+	"""Top ``depth`` neighbours of every row of a (row-normalised) TF-IDF matrix.
+
+	Rows are ranked in blocks: a block's similarities to every scheme are one sparse
+	product, ranked and discarded before the next, so the N x N similarity matrix is
+	never built. Blocks are sized so each uses about ``block_mb`` of working memory, and
+	are spread over ``workers`` processes (default: one per core; 1 ranks in this
+	process), with at most two blocks per worker in flight. ``exclude`` (a boolean mask
+	of tombstoned rows) are neither ranked nor anyone's neighbour.
+	"""
+	n = matrix.shape[0]
+	matrix = _normalised(matrix)
+	if exclude is not None and exclude.any():
+		# Zeroed rows share no term with anything, so they drop out of every ranking
+		matrix = sp.diags((~exclude).astype(matrix.dtype)) @ matrix
+	block_rows = int(max(1, min(n, block_mb * (1 << 20) // (max(n, 1) * BYTES_PER_ENTRY))))
+	rows = np.full((n, depth), -1, dtype=np.int32)
+	scores = np.zeros((n, depth), dtype=np.float32)
+	blocks = [(start, min(start + block_rows, n)) for start in range(0, n, block_rows)]
+	workers = workers if workers is not None else (os.cpu_count() or 1)
+	if workers <= 1 or len(blocks) <= 1:
+		_init_worker(matrix)
+		try:
+			for start, stop in blocks:
+				rows[start:stop], scores[start:stop] = _rank_block(start, stop, depth)
+		finally:
+			_init_worker(None)
+		return RelatedSchemes(rows, scores)
+	# Workers get the matrix once, at start-up (inherited, not copied, where fork is used)
+	with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrix,)) as pool:
+		pending: deque = deque()
+		for start, stop in blocks:
+			pending.append((start, stop, pool.submit(_rank_block, start, stop, depth)))
+			if len(pending) >= 2 * workers:
+				_collect(pending.popleft(), rows, scores)
+		while pending:
+			_collect(pending.popleft(), rows, scores)
+	return RelatedSchemes(rows, scores)
+
+
+def neighbours_of(
+	matrix: sp.csr_matrix, row: int, k: int, exclude: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""One row's build_related() entry (cut to k), computed directly: one sparse product."""
+	norms = _row_norms(matrix)
+	sims = np.asarray((matrix @ matrix[row].T).toarray()).ravel()
+	with np.errstate(divide="ignore", invalid="ignore"):
+		sims = np.where(norms > 0, sims / (norms * norms[row]), 0.0)
+	if exclude is not None:
+		sims[exclude] = 0.0
+	sims[row] = -np.inf
+	rows, scores = _top(sims[None, :], min(k, len(sims) - 1), k)
+	keep = rows[0] >= 0
+	return rows[0][keep], scores[0][keep]
+
+
+def _row_norms(matrix: sp.csr_matrix) -> np.ndarray:
+	return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+
+def _normalised(matrix: sp.csr_matrix) -> sp.csr_matrix:
+	# TfidfVectorizer rows are already unit length unless norm=None was configured
+	norms = _row_norms(matrix)
+	if np.allclose(norms[norms > 0], 1.0):
+		return sp.csr_matrix(matrix)
+	with np.errstate(divide="ignore"):
+		scale = np.where(norms > 0, 1.0 / norms, 0.0)
+	return sp.csr_matrix(sp.diags(scale) @ matrix)
+
+
+def _init_worker(matrix: Optional[sp.csr_matrix]) -> None:
+	global _MATRIX, _MATRIX_T
+	_MATRIX = matrix
+	# Transposed once, as CSR, so each block's product does not convert it again
+	_MATRIX_T = matrix.T.tocsr() if matrix is not None else None
+
+
+def _rank_block(start: int, stop: int, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+	# Similarities of rows start..stop to every row, ranked and cut to depth
+	sims = (_MATRIX[start:stop] @ _MATRIX_T).toarray()
+	n = sims.shape[1]
+	local = np.arange(stop - start)
+	sims[local, local + start] = -np.inf  # never a scheme's own neighbour
+	return _top(sims, min(depth, n - 1), depth)
+
+
+def _top(sims: np.ndarray, k: int, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+	# The k most similar columns of each row of sims, -1/0 padded to depth
+	rows = np.full((len(sims), depth), -1, dtype=np.int32)
+	scores = np.zeros((len(sims), depth), dtype=np.float32)
+	if k <= 0:
+		return rows, scores
+	best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+	best_scores = np.take_along_axis(sims, best, axis=1)
+	# Most similar first; ties to the earlier catalogue row
+	order = np.lexsort((best, -best_scores), axis=1)
+	best = np.take_along_axis(best, order, axis=1)
+	best_scores = np.take_along_axis(best_scores, order, axis=1)
+	found = best_scores > 0
+	rows[:, :k] = np.where(found, best, -1)
+	scores[:, :k] = np.where(found, best_scores, 0.0)
+	return rows, scores
+
+
+def _collect(task, rows: np.ndarray, scores: np.ndarray) -> None:
+	start, stop, future = task
+	rows[start:stop], scores[start:stop] = future.result()
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+
+# Profile fields the eligibility rules read directly; name and phone never affect a ranking
+PROFILE_FIELDS = ["age", "income", "caste_group", "occupation", "gender", "state", "interests"]
+
+
+def profile_fingerprint(
+	profile: Any,
+	top_k: int,
+	weights: Sequence[float],
+	candidate_budget: Optional[int],
+	content_scorer: str = "tfidf",
+	hard_filter: bool = False,
+	lean: bool = False,
+) -> str:
+	"""Canonical key for a recommend() call: everything the ranking depends on, hashed.
+
+	The query text is lower-cased and whitespace-normalised (the vectorizer and fuzzy
+	matching both lower-case it); the eligibility fields are kept as given.
+	"""
+	payload = {
+		"query": re.sub(r"\s+", " ", profile.to_query_text()).strip().lower(),
+		"fields": {name: getattr(profile, name, None) for name in PROFILE_FIELDS},
+		"top_k": top_k,
+		"weights": [float(w) for w in weights],
+		"candidate_budget": candidate_budget,
+		"content_scorer": content_scorer,
+		"hard_filter": hard_filter,
+		"lean": lean,
+	}
+	encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+	return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def artifact_hash(path: str, chunk_size: int = 1 << 20) -> str:
+	"""SHA-256 of a model artifact's bytes, used as its version."""
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(chunk_size), b""):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+class MemoryCacheBackend:
+	"""In-process LRU store: version-tagged entries in an OrderedDict, oldest first."""
+
+	def __init__(self, max_entries: int = 1024):
+		self.max_entries = max_entries
+		self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: str):
+		"""(version, created_at, value) for a key, or None; marks the entry as recently used."""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+			return entry
+
+	def put(self, key: str, version: str, created_at: float, value: Any) -> int:
+		"""Store an entry and return how many least-recently-used entries were evicted."""
+		with self._lock:
+			self._entries[key] = (version, created_at, value)
+			self._entries.move_to_end(key)
+			evicted = 0
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+				evicted += 1
+			return evicted
+
+	def delete(self, key: str) -> None:
+		with self._lock:
+			self._entries.pop(key, None)
+
+	def drop_other_versions(self, version: str) -> int:
+		with self._lock:
+			stale = [k for k, entry in self._entries.items() if entry[0] != version]
+			for k in stale:
+				del self._entries[k]
+			return len(stale)
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+class SqliteCacheBackend:
+	"""On-disk LRU store in a sqlite file, shareable between worker processes.
+
+	Values are pickled, so the file should only be shared between processes that
+	trust each other (it holds nothing but our own recommendation frames).
+	"""
+
+	def __init__(self, path: str, max_entries: int = 10000, timeout: float = 5.0):
+		self.path = path
+		self.max_entries = max_entries
+		self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+		self._lock = threading.Lock()
+		with self._lock:
+			self._conn.execute("PRAGMA journal_mode=WAL")
+			self._conn.execute("PRAGMA synchronous=NORMAL")
+			self._conn.execute(
+				"CREATE TABLE IF NOT EXISTS entries ("
+				"key TEXT PRIMARY KEY, version TEXT NOT NULL, created_at REAL NOT NULL, "
+				"used_at REAL NOT NULL, value BLOB NOT NULL)"
+			)
+			self._conn.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+
+	def get(self, key: str):
+		with self._lock:
+			row = self._conn.execute(
+				"SELECT version, created_at, value FROM entries WHERE key = ?", (key,)
+			).fetchone()
+			if row is None:
+				return None
+			self._conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+		return row[0], row[1], pickle.loads(row[2])
+
+	def put(self, key: str, version: str, created_at: float, value: Any) -> int:
+		blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+		with self._lock:
+			self._conn.execute(
+				"INSERT OR REPLACE INTO entries (key, version, created_at, used_at, value) VALUES (?, ?, ?, ?, ?)",
+				(key, version, created_at, time.time(), blob),
+			)
+			excess = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+			if excess <= 0:
+				return 0
+			cur = self._conn.execute(
+				"DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used_at LIMIT ?)", (excess,)
+			)
+			return cur.rowcount
+
+	def delete(self, key: str) -> None:
+		with self._lock:
+			self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+	def drop_other_versions(self, version: str) -> int:
+		with self._lock:
+			return self._conn.execute("DELETE FROM entries WHERE version != ?", (version,)).rowcount
+
+	def __len__(self) -> int:
+		with self._lock:
+			return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+	def close(self) -> None:
+		with self._lock:
+			self._conn.close()
+
+
+class ResultCache:
+	"""LRU/TTL cache of recommendation results keyed by profile fingerprint and model version.
+
+	Every entry is tagged with the version (artifact content hash) of the model that
+	produced it. An entry from another version is never returned, and the first lookup
+	under a new version drops all entries of older ones. Counters are per process, also
+	when the backend is a shared sqlite file.
+	"""
+
+	def __init__(self, backend=None, ttl_seconds: Optional[float] = 600.0):
+		self.backend = backend if backend is not None else MemoryCacheBackend()
+		self.ttl_seconds = ttl_seconds
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+		self.invalidations = 0
+		self._version: Optional[str] = None
+		self._lock = threading.Lock()
+
+	def _check_version(self, version: str) -> None:
+		if version == self._version:
+			return
+		dropped = self.backend.drop_other_versions(version)
+		with self._lock:
+			self._version = version
+			self.invalidations += dropped
+
+	def get(self, version: str, key: str) -> Optional[Any]:
+		self._check_version(version)
+		entry = self.backend.get(key)
+		if entry is not None:
+			entry_version, created_at, value = entry
+			expired = self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+			if entry_version == version and not expired:
+				with self._lock:
+					self.hits += 1
+				return value
+			self.backend.delete(key)
+			with self._lock:
+				if expired:
+					self.expirations += 1
+				else:
+					self.invalidations += 1
+		with self._lock:
+			self.misses += 1
+		return None
+
+	def put(self, version: str, key: str, value: Any) -> None:
+		self._check_version(version)
+		evicted = self.backend.put(key, version, time.time(), value)
+		with self._lock:
+			self.evictions += evicted
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"backend": type(self.backend).__name__,
+				"entries": len(self.backend),
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_rate": self.hits / lookups if lookups else 0.0,
+				"evictions": self.evictions,
+				"expirations": self.expirations,
+				"invalidations": self.invalidations,
+				"model_version": self._version,
+			}
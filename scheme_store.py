@@ -0,0 +1,241 @@
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vocabulary import ArrayVocabulary
+
+
+# Scheme fields served in results and by get_schemes(), in response order
+RECORD_FIELDS = [
+	"scheme_name", "slug", "level", "schemeCategory", "tags",
+	"details", "benefits", "eligibility", "application", "documents",
+]
+# What a lean result carries besides its scores
+LEAN_FIELDS = ["slug", "scheme_name"]
+
+# Fields averaging at least this many bytes per scheme are stored zlib-compressed, in
+# blocks of about COMPRESS_BLOCK_BYTES (uncompressed) that each hold whole rows
+COMPRESS_MIN_MEAN_BYTES = 128
+COMPRESS_BLOCK_BYTES = 4096
+
+
+class SchemeStore:
+	"""Scheme text fields stored column by column, addressable by row position or slug.
+
+	Each field is one UTF-8 byte stream plus int64 offsets, one entry per scheme row, so
+	reading a few fields of a few schemes decodes only those strings and never touches
+	the catalogue frame. Long fields (not the LEAN_FIELDS every lean result reads) are
+	kept as zlib blocks of whole rows: ``blocks[field]`` holds each block's first row and
+	its start in the compressed buffer, and a read decompresses only the blocks it
+	needs. Missing values are recorded in ``nulls`` and read back as "". Slugs map to
+	the last row that carries them (an updated scheme is appended after its tombstoned
+	original). Every array is a plain numpy array, so the store is memory-mapped and
+	shared like the other model arrays.
+	"""
+
+	def __init__(
+		self,
+		buffers: Dict[str, np.ndarray],
+		offsets: Dict[str, np.ndarray],
+		slugs: ArrayVocabulary,
+		blocks: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+		nulls: Optional[Dict[str, np.ndarray]] = None,
+	):
+		self.buffers = buffers
+		self.offsets = offsets
+		self.slugs = slugs
+		self.blocks = blocks if blocks is not None else {}
+		self.nulls = nulls if nulls is not None else {}
+
+	def __setstate__(self, state):
+		# Stores pickled before compression and null tracking
+		state.setdefault("blocks", {})
+		state.setdefault("nulls", {})
+		self.__dict__.update(state)
+
+	@classmethod
+	def build(cls, df: pd.DataFrame, fields: Optional[Sequence[str]] = None) -> "SchemeStore":
+		"""Store of the given fields (default: RECORD_FIELDS, then df's other text columns)."""
+		if fields is None:
+			fields = [f for f in RECORD_FIELDS if f in df.columns]
+			fields += [c for c in df.columns if c not in fields and _is_text(df[c])]
+		buffers, offsets, blocks, nulls = {}, {}, {}, {}
+		for field in fields:
+			if field not in df.columns:
+				continue
+			values = df[field].tolist()
+			missing = np.array([_is_missing(v) for v in values], dtype=bool)
+			if missing.any():
+				nulls[field] = missing
+			encoded = [b"" if m else str(v).encode("utf-8") for v, m in zip(values, missing)]
+			offsets[field] = np.zeros(len(encoded) + 1, dtype=np.int64)
+			np.cumsum([len(b) for b in encoded], out=offsets[field][1:])
+			data = b"".join(encoded)
+			if field not in LEAN_FIELDS and len(encoded) and len(data) / len(encoded) >= COMPRESS_MIN_MEAN_BYTES:
+				buffers[field], blocks[field] = _compress(data, offsets[field])
+			else:
+				buffers[field] = np.frombuffer(data, dtype=np.uint8)
+		store = cls(buffers, offsets, ArrayVocabulary.from_dict({}), blocks, nulls)
+		store.slugs = store._slug_index()
+		return store
+
+	def _slug_index(self) -> ArrayVocabulary:
+		if "slug" not in self.buffers:
+			return ArrayVocabulary.from_dict({})
+		slugs = self.column("slug", range(len(self)))
+		positions = {slug: i for i, slug in enumerate(slugs)}
+		positions.pop("", None)
+		return ArrayVocabulary.from_dict(positions)
+
+	def __len__(self) -> int:
+		return len(next(iter(self.offsets.values()))) - 1 if self.offsets else 0
+
+	@property
+	def fields(self) -> List[str]:
+		return list(self.buffers)
+
+	@property
+	def nbytes(self) -> int:
+		arrays = list(self.buffers.values()) + list(self.offsets.values()) + list(self.nulls.values())
+		arrays += [a for pair in self.blocks.values() for a in pair]
+		return sum(a.nbytes for a in arrays) + self.slugs.nbytes
+
+	def _data(self, field: str) -> bytes:
+		# The field's whole uncompressed byte stream
+		if field not in self.blocks:
+			return self.buffers[field].tobytes()
+		starts = self.blocks[field][1]
+		buffer = self.buffers[field]
+		return b"".join(zlib.decompress(buffer[starts[b]:starts[b + 1]].tobytes()) for b in range(len(starts) - 1))
+
+	def append(self, other: "SchemeStore") -> None:
+		"""Add another store's rows after this one's (fields missing on either side read as "")."""
+		n, m = len(self), len(other)
+		for field in list(self.buffers) + [f for f in other.buffers if f not in self.buffers]:
+			mine = self.offsets.get(field, np.zeros(n + 1, dtype=np.int64))
+			theirs = other.offsets.get(field, np.zeros(m + 1, dtype=np.int64))
+			data = other._data(field) if field in other.buffers else b""
+			if field in self.blocks:
+				first_rows, starts = self.blocks[field]
+				buffer, (new_rows, new_starts) = _compress(data, theirs)
+				self.blocks[field] = (
+					np.concatenate([first_rows[:-1], new_rows + n]),
+					np.concatenate([starts[:-1], new_starts + starts[-1]]),
+				)
+			else:
+				buffer = np.frombuffer(data, dtype=np.uint8)
+			self.buffers[field] = np.concatenate([self.buffers.get(field, np.empty(0, dtype=np.uint8)), buffer])
+			self.offsets[field] = np.concatenate([mine, theirs[1:] + mine[-1]])
+			if field in self.nulls or field in other.nulls:
+				self.nulls[field] = np.concatenate([
+					self.nulls.get(field, np.zeros(n, dtype=bool)),
+					other.nulls.get(field, np.zeros(m, dtype=bool)),
+				])
+		self.slugs = self._slug_index()
+
+	def column(self, field: str, rows: Sequence[int]) -> List[str]:
+		"""One field of the given row positions ("" for each if the field is not stored)."""
+		if field not in self.buffers:
+			return [""] * len(rows)
+		buffer, bounds = self.buffers[field], self.offsets[field]
+		if field not in self.blocks:
+			return [buffer[bounds[i]:bounds[i + 1]].tobytes().decode("utf-8") for i in rows]
+		first_rows, starts = self.blocks[field]
+		rows = np.asarray(rows, dtype=np.int64)
+		which = np.searchsorted(first_rows, rows, side="right") - 1
+		decoded: Dict[int, bytes] = {}
+		out = []
+		for i, b in zip(rows.tolist(), which.tolist()):
+			block = decoded.get(b)
+			if block is None:
+				block = decoded[b] = zlib.decompress(buffer[starts[b]:starts[b + 1]].tobytes())
+			base = bounds[first_rows[b]]
+			out.append(block[bounds[i] - base:bounds[i + 1] - base].decode("utf-8"))
+		return out
+
+	def values(self, field: str) -> List[Optional[str]]:
+		"""Every row of one stored field, None where the value was missing."""
+		bounds = self.offsets[field].tolist()
+		data = self._data(field)
+		values = [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+		for i in np.flatnonzero(self.nulls[field]) if field in self.nulls else ():
+			values[i] = None
+		return values
+
+	def position(self, slug: str) -> Optional[int]:
+		return self.slugs.get(slug)
+
+	def records(self, rows: Sequence[int], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+		"""Dicts of the requested fields (default: the stored RECORD_FIELDS) for row positions."""
+		fields = [f for f in (fields or RECORD_FIELDS) if f in self.buffers]
+		columns = [self.column(f, rows) for f in fields]
+		return [dict(zip(fields, values)) for values in zip(*columns)] if fields else [{} for _ in rows]
+
+
+class FrameLayout:
+	"""What a SchemeStore does not hold of the catalogue frame, so it can be rebuilt.
+
+	Column order and dtypes, the non-text columns as arrays and the index (None for the
+	default 0..n-1). Saved in place of the pickled frame: the text is stored once, in
+	the store, and scheme_df is only rebuilt when something needs it.
+	"""
+
+	def __init__(self, columns: List[str], dtypes: Dict[str, Any], arrays: Dict[str, np.ndarray], index: Optional[np.ndarray]):
+		self.columns = columns
+		self.dtypes = dtypes
+		self.arrays = arrays
+		self.index = index
+
+	@classmethod
+	def of(cls, df: pd.DataFrame, store: SchemeStore) -> "FrameLayout":
+		missing = [c for c in df.columns if c not in store.buffers and _is_text(df[c])]
+		if missing:
+			raise ValueError(f"Text columns not in the scheme store: {missing}")
+		default_index = isinstance(df.index, pd.RangeIndex) and df.index.equals(pd.RangeIndex(len(df)))
+		return cls(
+			columns=list(df.columns),
+			dtypes={c: df[c].dtype for c in df.columns},
+			arrays={c: df[c].to_numpy() for c in df.columns if c not in store.buffers},
+			index=None if default_index else df.index.to_numpy(),
+		)
+
+	def labels(self, rows: np.ndarray) -> pd.Index:
+		"""Index labels of row positions."""
+		return pd.Index(rows) if self.index is None else pd.Index(self.index[rows])
+
+	def frame(self, store: SchemeStore) -> pd.DataFrame:
+		n = len(store) if store.offsets else len(next(iter(self.arrays.values()), []))
+		index = pd.RangeIndex(n) if self.index is None else pd.Index(np.array(self.index))
+		data = {}
+		for c in self.columns:
+			# Copies, so the frame never points into a read-only memory map
+			values = store.values(c) if c in store.buffers else np.array(self.arrays[c])
+			data[c] = pd.Series(values, index=index, dtype=self.dtypes[c])
+		return pd.DataFrame(data, index=index)
+
+
+def _compress(data: bytes, offsets: np.ndarray) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+	# Cut the stream at row boundaries into blocks of about COMPRESS_BLOCK_BYTES
+	first_rows, pieces = [], []
+	n = len(offsets) - 1
+	row = 0
+	while row < n:
+		end = int(np.searchsorted(offsets, offsets[row] + COMPRESS_BLOCK_BYTES, side="left"))
+		end = min(max(end, row + 1), n)
+		first_rows.append(row)
+		pieces.append(zlib.compress(data[offsets[row]:offsets[end]], 6))
+		row = end
+	first_rows.append(n)
+	starts = np.zeros(len(pieces) + 1, dtype=np.int64)
+	np.cumsum([len(p) for p in pieces], out=starts[1:])
+	return np.frombuffer(b"".join(pieces), dtype=np.uint8), (np.array(first_rows, dtype=np.int64), starts)
+
+
+def _is_text(col: pd.Series) -> bool:
+	return col.dtype == object or pd.api.types.is_string_dtype(col.dtype)
+
+
+def _is_missing(value: Any) -> bool:
+	return value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA
@@ -10,7 +10,8 @@ const router = express.Router();
 // @access  Private
 router.post('/', [
   auth,
-  body('top_k').optional().isInt({ min: 1, max: 50 }).withMessage('top_k must be between 1 and 50')
+  body('top_k').optional().isInt({ min: 1, max: 50 }).withMessage('top_k must be between 1 and 50'),
+  body('cursor').optional().isString().withMessage('cursor must be a string')
 ], async (req, res) => {
   try {
     const errors = validationResult(req);
@@ -21,8 +22,7 @@ router.post('/', [
       });
     }
 
-    const { top_k = 10 } = req.body;
-    const fetchSize = Math.min(50, Math.max(top_k * 3, top_k + 10));
+    const { top_k = 10, cursor } = req.body;
     const userProfile = req.user.profile;
 
     // Check if user profile is complete
@@ -42,17 +42,34 @@ router.post('/', [
       });
     }
 
-    // Get recommendations from ML service
-    const rawRecommendations = await mlService.getRecommendations(userProfile, fetchSize);
-
-    // Post-filter recommendations using hard eligibility checks
-    const filteredRecommendations = applyEligibilityFilter(rawRecommendations, req.user.profile);
-    let recommendations = filteredRecommendations.slice(0, top_k);
-    // Fallback: if strict filter removed everything, return raw top results
-    if ((!recommendations || recommendations.length === 0) && Array.isArray(rawRecommendations)) {
-      recommendations = rawRecommendations.slice(0, top_k);
+    // Get recommendations from ML service; ineligible schemes are masked before ranking.
+    // With the persistent service each response carries a cursor for the next page ("show
+    // more"), which is a slice of the same ranking: no rescoring, and no reshuffled pages
+    let rawRecommendations;
+    let nextCursor = null;
+    if (mlService.persistent) {
+      let page;
+      try {
+        page = cursor
+          ? await mlService.getPage(cursor, top_k)
+          : await mlService.getRecommendations(userProfile, top_k, { hardFilter: true, paginate: true });
+      } catch (error) {
+        if (cursor && String(error.message).includes('CursorExpired:')) {
+          return res.status(410).json({ message: 'These results have expired. Please reload your recommendations.' });
+        }
+        throw error;
+      }
+      rawRecommendations = page.results;
+      nextCursor = page.next_cursor;
+    } else {
+      rawRecommendations = await mlService.getRecommendations(userProfile, top_k, { hardFilter: true });
     }
 
+    // The hard eligibility checks already ran in Python (hardFilter), so every page is
+    // full; here schemes naming another caste are only down-ranked, never dropped
+    const rankedRecommendations = applyCasteDownRank(rawRecommendations, req.user.profile);
+    const recommendations = rankedRecommendations.slice(0, top_k);
+
     res.json({
       message: 'Recommendations generated successfully',
       recommendations,
@@ -64,7 +81,8 @@ router.post('/', [
         interests: userProfile.interests
       },
       totalRecommendations: recommendations.length,
-      availableRecommendations: filteredRecommendations.length
+      availableRecommendations: rankedRecommendations.length,
+      nextCursor
     });
 
   } catch (error) {
@@ -76,6 +94,29 @@ router.post('/', [
   }
 });
 
+// @route   GET /api/recommendations/similar/:slug
+// @desc    Get schemes similar to a scheme
+// @access  Private
+router.get('/similar/:slug', auth, async (req, res) => {
+  try {
+    const topK = parseInt(req.query.top_k, 10) || 10;
+    if (topK < 1 || topK > 50) {
+      return res.status(400).json({ message: 'top_k must be between 1 and 50' });
+    }
+    const similar = await mlService.getSimilar(req.params.slug, topK, { lean: req.query.lean === 'true' });
+    res.json({ slug: req.params.slug, similar });
+  } catch (error) {
+    if (String(error.message).includes('KeyError:')) {
+      return res.status(404).json({ message: 'Scheme not found' });
+    }
+    console.error('Similar schemes error:', error);
+    res.status(500).json({
+      message: 'Failed to get similar schemes',
+      error: process.env.NODE_ENV === 'development' ? error.message : undefined
+    });
+  }
+});
+
 // @route   GET /api/recommendations/status
 // @desc    Get recommendation service status
 // @access  Private
@@ -185,8 +226,6 @@ router.post('/quick', [
     })();
 
     const top_k = req.body.top_k ? parseInt(req.body.top_k) : 10; // Match default of regular endpoint
-    // Restore robust candidate size for better chances post-filter
-    const fetchSize = Math.min(50, Math.max(top_k * 3, top_k + 10));
 
     // Create a minimal profile for quick recommendations
     const quickProfile = {
@@ -214,28 +253,24 @@ router.post('/quick', [
     let rawRecommendations;
     try {
       // First attempt allows cold-start
-      rawRecommendations = await mlService.getRecommendations(quickProfile, fetchSize, { timeoutMs: 6000 });
+      rawRecommendations = await mlService.getRecommendations(quickProfile, top_k, { timeoutMs: 6000, quick: true, hardFilter: true });
     } catch (e) {
       // Fallback: try a very small fetch size quickly
       try {
-        rawRecommendations = await mlService.getRecommendations(quickProfile, Math.max(top_k, 10), { timeoutMs: 2500 });
+        rawRecommendations = await mlService.getRecommendations(quickProfile, Math.max(top_k, 10), { timeoutMs: 2500, quick: true, hardFilter: true });
       } catch (e2) {
         // Final fallback: one last moderate attempt
         try {
-          rawRecommendations = await mlService.getRecommendations(quickProfile, Math.max(top_k, 10), { timeoutMs: 8000 });
+          rawRecommendations = await mlService.getRecommendations(quickProfile, Math.max(top_k, 10), { timeoutMs: 8000, quick: true, hardFilter: true });
         } catch (e3) {
           rawRecommendations = [];
         }
       }
     }
 
-    // Post-filter with whatever data is known (quick profile has limited fields)
-    const filteredRecommendations = applyEligibilityFilter(rawRecommendations, quickProfile);
-    let recommendations = filteredRecommendations.slice(0, top_k);
-    // Fallback: if strict filter removed everything, return raw top results (quick must be snappy)
-    if ((!recommendations || recommendations.length === 0) && Array.isArray(rawRecommendations)) {
-      recommendations = rawRecommendations.slice(0, top_k);
-    }
+    // Ineligible schemes were already left out in Python (hardFilter); only down-rank here
+    const rankedRecommendations = applyCasteDownRank(rawRecommendations, quickProfile);
+    let recommendations = rankedRecommendations.slice(0, top_k);
 
     // Final safety net: if still empty, fetch using a generic profile to avoid "no results" toast
     if (!recommendations || recommendations.length === 0) {
@@ -250,10 +285,8 @@ router.post('/quick', [
         previous_applications: []
       };
       try {
-        const genericRaw = await mlService.getRecommendations(genericProfile, Math.max(top_k, 10), { timeoutMs: 6000 });
-        const genericFiltered = applyEligibilityFilter(genericRaw, genericProfile);
-        const genericRecs = (genericFiltered && genericFiltered.length > 0 ? genericFiltered : genericRaw) || [];
-        recommendations = genericRecs.slice(0, top_k);
+        const genericRaw = await mlService.getRecommendations(genericProfile, Math.max(top_k, 10), { timeoutMs: 6000, quick: true, hardFilter: true });
+        recommendations = applyCasteDownRank(genericRaw, genericProfile).slice(0, top_k);
       } catch (_) {
         // ignore; we'll return whatever we have (possibly empty)
       }
@@ -264,7 +297,7 @@ router.post('/quick', [
       recommendations: recommendations || [],
       profile: quickProfile,
       totalRecommendations: recommendations?.length || 0,
-      availableRecommendations: filteredRecommendations.length
+      availableRecommendations: rankedRecommendations.length
     });
 
   } catch (error) {
@@ -279,191 +312,42 @@ router.post('/quick', [
 module.exports = router;
 
 /**
- * Apply strict eligibility filtering and conservative down-ranking based on
- * user profile vs scheme eligibility text. This prevents obviously wrong matches
- * (e.g. scheme only for SC/ST with user caste General; income > threshold).
+ * Soft caste down-ranking of results Python has already hard-filtered.
+ *
+ * The hard eligibility rules (age, income, reserved caste groups, gender, state) are
+ * parsed from each scheme at training time and applied before ranking (hardFilter; see
+ * EligibilityConstraints in constraints.py), so nothing is removed here and pages stay
+ * full. A scheme whose eligibility text names caste groups the user is not in, without
+ * the parser having read it as a reservation, loses 0.5 of its hybrid score, and the
+ * results are re-sorted by score.
  */
-function applyEligibilityFilter(recommendations, profile) {
+function applyCasteDownRank(recommendations, profile) {
   if (!Array.isArray(recommendations)) return [];
 
-  const user = {
-    caste: String(profile.caste_group || '').toLowerCase(),
-    income: Number(profile.income || 0),
-    gender: String(profile.gender || '').toLowerCase(),
-    occupation: String(profile.occupation || '').toLowerCase(),
-    age: Number(profile.age || 0),
-    state: String(profile.state || '').toLowerCase(),
-  };
-
-  const filtered = [];
-
-  for (const rec of recommendations) {
+  const caste = String(profile.caste_group || '').toLowerCase();
+  const ranked = recommendations.map((rec) => {
     const eligibilityText = String(rec.eligibility || rec.Eligibility || '').toLowerCase();
-    const combinedText = [
-      eligibilityText,
-      String(rec.details || '').toLowerCase(),
-      String(rec.scheme_name || '').toLowerCase(),
-      String(rec.tags || '').toLowerCase(),
-      String(rec.schemeCategory || '').toLowerCase()
-    ].join(' ');
-
-    // If no eligibility text, allow but do not alter.
-    if (!eligibilityText || eligibilityText.trim().length < 5) {
-      filtered.push(rec);
-      continue;
+    if (!caste || eligibilityText.trim().length < 5 || typeof rec.score_hybrid !== 'number') {
+      return rec;
     }
-
-    // 1) Caste constraints (strict)
-    // Detect mentions like "only for sc/st", "reserved for sc", etc.
-    const mentionsSC = /\b(sc|scheduled caste)\b/.test(eligibilityText);
-    const mentionsST = /\b(st|scheduled tribe)\b/.test(eligibilityText);
-    const mentionsOBC = /\bobc\b/.test(eligibilityText);
-    const mentionsEBC = /\bebc\b/.test(eligibilityText);
-    const mentionsEWS = /\bews\b/.test(eligibilityText);
-
-    // If the text contains explicit caste-only language, enforce it
-    const casteOnly = /(only|exclusively|reserved)\s+(for|to)/.test(eligibilityText);
-    if (casteOnly) {
-      let allowed = false;
-      if (mentionsSC && user.caste.includes('sc')) allowed = true;
-      if (mentionsST && user.caste.includes('st')) allowed = true;
-      if (mentionsOBC && user.caste.includes('obc')) allowed = true;
-      if (mentionsEBC && user.caste.includes('ebc')) allowed = true;
-      if (mentionsEWS && user.caste.includes('ews')) allowed = true;
-      if (!allowed) {
-        // Hard reject
-        continue;
-      }
-    } else {
-      // If a single caste is clearly specified without "only", softly filter when it clearly excludes
-      if ((mentionsSC || mentionsST || mentionsOBC || mentionsEBC || mentionsEWS) && user.caste) {
-        const casteMatches =
-          (mentionsSC && user.caste.includes('sc')) ||
-          (mentionsST && user.caste.includes('st')) ||
-          (mentionsOBC && user.caste.includes('obc')) ||
-          (mentionsEBC && user.caste.includes('ebc')) ||
-          (mentionsEWS && user.caste.includes('ews'));
-        if (!casteMatches) {
-          // Down-rank heavily by reducing hybrid score if present; otherwise skip
-          if (typeof rec.score_hybrid === 'number') {
-            rec.score_hybrid = Math.max(0, rec.score_hybrid - 0.5);
-          } else {
-            continue;
-          }
-        }
-      }
-    }
-
-    // 2) Income thresholds
-    // Look for patterns like "income below/less than/not exceed/upto 500000"
-    const incomeMatch = eligibilityText.match(/(income|annual income|family income)[^0-9]{0,30}([₹rs\.\s]*)(\d[\d,\.]+)/i);
-    if (incomeMatch) {
-      const raw = incomeMatch[3] || '';
-      const threshold = parseInt(raw.replace(/[^\d]/g, ''), 10);
-      if (!Number.isNaN(threshold) && threshold > 0) {
-        const isUpperBound = /(below|less than|not exceed|upto|up to|<=|less or equal|not more than)/.test(eligibilityText);
-        const isLowerBound = /(above|at least|minimum|>=|more than)/.test(eligibilityText);
-        if (isUpperBound && user.income && user.income > threshold) {
-          continue;
-        }
-        if (isLowerBound && user.income && user.income < threshold) {
-          continue;
-        }
-      }
-    }
-
-    // 3) Gender constraints
-    const mentionsWomenOnly = /(women only|only for women|girls only|only for girls|female candidates only)/.test(eligibilityText);
-    const mentionsMenOnly = /(men only|only for men|boys only|only for boys|male candidates only)/.test(eligibilityText);
-    const mentionsTransgender = /\btransgender(s)?\b|\bthird gender\b|\btrans[-\s]?person\b/.test(combinedText);
-    const userIsTrans = /\btrans|non[-\s]?binary|genderqueer|third gender\b/.test(user.gender);
-
-    // Girl child specific
-    const mentionsGirlChild = /\bgirl\s*child\b|\bonly for girls\b|\bgirls only\b/.test(combinedText);
-    // Boy specific (rare, but handle)
-    const mentionsBoyChild = /\bboy\s*child\b|\bonly for boys\b|\bboys only\b/.test(combinedText);
-    // Pregnancy/maternity/lactating
-    const mentionsMaternity = /\bpregnan(t|cy)\b|\bmaternity\b|\blactating\b|\banganwadi\s*helper\b/.test(combinedText);
-    // Widow/single woman oriented
-    const mentionsWomenExclusive = /\b(unmarried woman|widow|married women|self help group women|girl\s*child)\b/.test(combinedText);
-
-    if (mentionsTransgender && !userIsTrans) {
-      continue;
-    }
-    if (mentionsWomenOnly && user.gender && !user.gender.includes('female')) {
-      continue;
-    }
-    if (mentionsMenOnly && user.gender && !user.gender.includes('male')) {
-      continue;
-    }
-    if (mentionsGirlChild) {
-      // Must be female and plausibly a child/teen
-      if (!user.gender.includes('female')) continue;
-      if (user.age && user.age > 18) continue;
-    }
-    if (mentionsBoyChild) {
-      if (!user.gender.includes('male')) continue;
-      if (user.age && user.age > 18) continue;
-    }
-    if (mentionsMaternity || mentionsWomenExclusive) {
-      if (!user.gender.includes('female')) continue;
-    }
-
-    // 4) Age constraints (simple)
-    // Detect "between 18 and 35", "minimum 21", "not above 30"
-    const between = eligibilityText.match(/between\s+(\d{1,3})\s+(?:and|to)\s+(\d{1,3})/);
-    if (between && user.age) {
-      const minA = parseInt(between[1], 10);
-      const maxA = parseInt(between[2], 10);
-      if (!Number.isNaN(minA) && !Number.isNaN(maxA)) {
-        if (user.age < minA || user.age > maxA) continue;
-      }
-    }
-    const minAge = eligibilityText.match(/(minimum|at least|>=)\s+(\d{1,3})\s*(years|yrs)?/);
-    if (minAge && user.age) {
-      const val = parseInt(minAge[2], 10);
-      if (!Number.isNaN(val) && user.age < val) continue;
-    }
-    const maxAge = eligibilityText.match(/(maximum|not above|<=)\s+(\d{1,3})\s*(years|yrs)?/);
-    if (maxAge && user.age) {
-      const val = parseInt(maxAge[2], 10);
-      if (!Number.isNaN(val) && user.age > val) continue;
-    }
-
-    // 5) Education status heuristics based on age and phrases
-    // If scheme is for school students or specific classes, enforce plausible age window
-    const mentionsSpecificClass = /(class|std\.?|standard)\s*(ix|x|xi|xii|9|10|11|12)\b/.test(combinedText);
-    const mentionsSchoolStudent = /\bschool\s+student\b|\bpre-?matric\b|\bsecondary school\b|\bsenior secondary\b|\bhigher secondary\b/.test(combinedText);
-    const mentionsCollegeStudent = /\bcollege\s+student\b|\bundergraduate\b|\bpost-?matric\b|\bdegree\b|\bpursuing (b\.|bcom|bsc|ba|btech|be|b\.tech|b\.e)\b/.test(combinedText);
-    const mentionsCurrentlyStudying = /\b(currently|presently)\s+(studying|pursuing|enrolled)\b/.test(combinedText);
-
-    if (user.age) {
-      // School window ~10-20
-      if ((mentionsSpecificClass || mentionsSchoolStudent) && (user.age < 10 || user.age > 20)) {
-        continue;
-      }
-      // College window ~16-30
-      if (mentionsCollegeStudent && (user.age < 16 || user.age > 30)) {
-        continue;
-      }
-      // Generic "currently studying" with school/college hints
-      if (mentionsCurrentlyStudying && (mentionsSpecificClass || mentionsSchoolStudent) && (user.age < 10 || user.age > 22)) {
-        continue;
-      }
-      if (mentionsCurrentlyStudying && mentionsCollegeStudent && (user.age < 16 || user.age > 32)) {
-        continue;
-      }
+    const mentions = {
+      sc: /\b(sc|scheduled caste)\b/.test(eligibilityText),
+      st: /\b(st|scheduled tribe)\b/.test(eligibilityText),
+      obc: /\bobc\b/.test(eligibilityText),
+      ebc: /\bebc\b/.test(eligibilityText),
+      ews: /\bews\b/.test(eligibilityText)
+    };
+    const named = Object.keys(mentions).filter((group) => mentions[group]);
+    if (named.length === 0 || named.some((group) => caste.includes(group))) {
+      return rec;
     }
+    return { ...rec, score_hybrid: Math.max(0, rec.score_hybrid - 0.5) };
+  });
 
-    filtered.push(rec);
-  }
-
-  // Re-rank: if score_hybrid exists, sort by it; else keep order
-  filtered.sort((a, b) => {
+  // Array sort is stable: equal scores keep the order Python ranked them in
+  return ranked.sort((a, b) => {
     const sa = typeof a.score_hybrid === 'number' ? a.score_hybrid : 0;
     const sb = typeof b.score_hybrid === 'number' ? b.score_hybrid : 0;
     return sb - sa;
   });
-
-  return filtered;
 }
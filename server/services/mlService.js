@@ -3,8 +3,124 @@ const path = require('path');
 
 class MLService {
   constructor() {
-    this.modelPath = path.join(__dirname, '../../artifacts/scheme_recommender.joblib');
+    // Full model or a delta written by `recommender.py update`
+    this.modelPath = process.env.ML_MODEL_PATH || path.join(__dirname, '../../artifacts/scheme_recommender.joblib');
     this.pythonPath = process.env.PYTHON_PATH || 'python';
+    // Keep one inference process alive (model loaded once) unless explicitly disabled
+    this.persistent = process.env.ML_PERSISTENT !== 'false';
+    // Result cache used by the persistent process: none, memory or sqlite
+    this.cacheBackend = process.env.ML_CACHE || 'memory';
+    // Coalesce concurrent requests into batched scoring passes in the persistent process
+    this.microBatch = process.env.ML_MICRO_BATCH === 'true';
+    // Worker processes (sharing one copy of the model) the persistent process scores in; 0 = in-process
+    this.processes = parseInt(process.env.ML_PROCESSES || '0', 10);
+    // Seconds between checks for a newly published model, which is then hot-reloaded; 0 = never
+    this.reloadInterval = parseFloat(process.env.ML_RELOAD_INTERVAL || '0');
+    this.server = null;
+    this.pending = new Map();
+    this.nextRequestId = 1;
+  }
+
+  /**
+   * Start (or reuse) the long-lived `inference.py --serve stdio` process.
+   * Requests and responses are newline-delimited JSON matched up by id.
+   * @returns {ChildProcess} The running inference server
+   */
+  _ensureServer() {
+    if (this.server) return this.server;
+
+    const args = [
+      path.join(__dirname, '../../inference.py'),
+      '--model', this.modelPath,
+      '--serve', 'stdio',
+      '--cache', this.cacheBackend
+    ];
+    if (this.microBatch) args.push('--micro_batch');
+    if (this.processes > 0) args.push('--processes', String(this.processes));
+    if (this.reloadInterval > 0) args.push('--reload_interval', String(this.reloadInterval));
+    const serverProcess = spawn(this.pythonPath, args, {
+      cwd: path.join(__dirname, '../..'),
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+
+    let buffered = '';
+    serverProcess.stdout.on('data', (data) => {
+      buffered += data.toString();
+      let newline;
+      while ((newline = buffered.indexOf('\n')) >= 0) {
+        const line = buffered.slice(0, newline).trim();
+        buffered = buffered.slice(newline + 1);
+        if (line) this._handleServerLine(line);
+      }
+    });
+
+    serverProcess.stderr.on('data', (data) => {
+      console.error('ML server:', data.toString().trim());
+    });
+
+    const onExit = (reason) => {
+      if (this.server !== serverProcess) return;
+      this.server = null;
+      for (const { reject, timer } of this.pending.values()) {
+        if (timer) clearTimeout(timer);
+        reject(new Error(`ML inference server stopped: ${reason}`));
+      }
+      this.pending.clear();
+    };
+    serverProcess.on('exit', (code, signal) => onExit(signal || `code ${code}`));
+    serverProcess.on('error', (error) => {
+      console.error('Failed to start Python process:', error);
+      onExit(error.message);
+    });
+    serverProcess.stdin.on('error', (error) => onExit(error.message));
+
+    this.server = serverProcess;
+    return serverProcess;
+  }
+
+  _handleServerLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (parseError) {
+      console.error('Failed to parse ML output:', line);
+      return;
+    }
+    const entry = this.pending.get(message.id);
+    if (!entry) return;
+    this.pending.delete(message.id);
+    if (entry.timer) clearTimeout(entry.timer);
+    if (message.ok) {
+      entry.resolve(message.result);
+    } else {
+      entry.reject(new Error(`ML inference failed: ${message.error}`));
+    }
+  }
+
+  _request(payload, timeoutMs) {
+    return new Promise((resolve, reject) => {
+      const serverProcess = this._ensureServer();
+      const id = this.nextRequestId++;
+      let timer;
+      if (typeof timeoutMs === 'number' && timeoutMs > 0) {
+        // Only this request is abandoned; the server keeps running for others
+        timer = setTimeout(() => {
+          this.pending.delete(id);
+          reject(new Error('ML inference timed out'));
+        }, timeoutMs);
+      }
+      this.pending.set(id, { resolve, reject, timer });
+      serverProcess.stdin.write(JSON.stringify({ id, ...payload }) + '\n');
+    });
+  }
+
+  /**
+   * Stop the persistent inference server, letting in-flight requests finish.
+   */
+  shutdown() {
+    if (this.server) {
+      this.server.stdin.end();
+    }
   }
 
   /**
@@ -14,27 +130,109 @@ class MLService {
    * @returns {Promise<Array>} Array of recommended schemes
    */
   async getRecommendations(profile, topK = 10, options = {}) {
+    // quick: answer from the model's precomputed quick-recommendation table when it covers the profile
+    // hardFilter: leave out schemes whose parsed age/income/caste/gender/state limits exclude the profile
+    // lean: return only slug, scheme_name and scores; fetch the rest with getSchemes() when needed
+    // paginate: return the first page as { results, next_cursor }; getPage(next_cursor) gets the next one
+    const { timeoutMs, quick = false, hardFilter = false, lean = false, paginate = false } = options;
+    // Prepare the profile data for the ML model
+    const profileData = {
+      age: profile.age,
+      income: profile.income,
+      caste_group: profile.caste_group,
+      occupation: profile.occupation,
+      gender: profile.gender,
+      state: profile.state,
+      interests: profile.interests || [],
+      previous_applications: profile.previous_applications || []
+    };
+
+    if (this.persistent) {
+      return this._request({ op: 'recommend', profile: profileData, top_k: topK, quick, hard_filter: hardFilter, lean, paginate }, timeoutMs);
+    }
+    if (paginate) throw new Error('Pagination needs ML_PERSISTENT=true');
+    return this._runOnce([
+      '--profile', JSON.stringify(profileData),
+      '--top_k', topK.toString(),
+      ...(quick ? ['--quick'] : []),
+      ...(hardFilter ? ['--hard_filter'] : []),
+      ...(lean ? ['--lean'] : [])
+    ], timeoutMs);
+  }
+
+  /**
+   * Get the next page of a paginated ranking, sliced from the ranking kept by the server
+   * @param {string} cursor - next_cursor of the previous page
+   * @param {number} topK - Page size
+   * @returns {Promise<Object>} { results, next_cursor }, next_cursor null after the last page;
+   *   rejects with a "CursorExpired: ..." error once the ranking is gone (start again from page one)
+   */
+  async getPage(cursor, topK = 10, options = {}) {
+    const { timeoutMs, lean = false } = options;
+    if (!this.persistent) throw new Error('Pagination needs ML_PERSISTENT=true');
+    return this._request({ op: 'page', cursor, top_k: topK, lean }, timeoutMs);
+  }
+
+  /**
+   * Get stored fields of schemes by slug (e.g. details for lean results the client shows)
+   * @param {Array<string>} slugs - Scheme slugs
+   * @param {Array<string>} [fields] - Fields to return (default: all)
+   * @returns {Promise<Array>} One object per slug, null for unknown or removed schemes
+   */
+  async getSchemes(slugs, fields = null, options = {}) {
+    const { timeoutMs } = options;
+    if (!slugs.length) return [];
+    if (this.persistent) {
+      return this._request({ op: 'schemes', slugs, fields }, timeoutMs);
+    }
+    return this._runOnce(['--schemes', ...slugs, ...(fields ? ['--fields', ...fields] : [])], timeoutMs);
+  }
+
+  /**
+   * Get the schemes most similar to a scheme (its "related schemes")
+   * @param {string} slug - Scheme slug
+   * @param {number} topK - Number of schemes to return
+   * @returns {Promise<Array>} Scheme objects with score_similarity, most similar first;
+   *   rejects with a "KeyError: ..." error for unknown or removed schemes
+   */
+  async getSimilar(slug, topK = 10, options = {}) {
+    const { timeoutMs, lean = false } = options;
+    if (this.persistent) {
+      return this._request({ op: 'similar', slug, top_k: topK, lean }, timeoutMs);
+    }
+    return this._runOnce(['--similar', slug, '--top_k', String(topK), ...(lean ? ['--lean'] : [])], timeoutMs);
+  }
+
+  /**
+   * Load, warm up and swap in the model artifact now, without interrupting requests
+   * @param {boolean} [force] - Reload even if the artifact has not changed
+   * @returns {Promise<Object>} Reload stats (duration, memory high-water mark, last error)
+   */
+  async reloadModel(force = false) {
+    if (!this.persistent) throw new Error('Model reload needs ML_PERSISTENT=true');
+    return this._request({ op: 'reload', force });
+  }
+
+  /**
+   * Swap the model that the last reload replaced back in
+   * @returns {Promise<Object>} Reload stats
+   */
+  async rollbackModel() {
+    if (!this.persistent) throw new Error('Model rollback needs ML_PERSISTENT=true');
+    return this._request({ op: 'rollback' });
+  }
+
+  /**
+   * Run a single inference in a fresh Python process (used when ML_PERSISTENT=false)
+   */
+  _runOnce(extraArgs, timeoutMs) {
     return new Promise((resolve, reject) => {
       try {
-        const { timeoutMs } = options;
-        // Prepare the profile data for the ML model
-        const profileData = {
-          age: profile.age,
-          income: profile.income,
-          caste_group: profile.caste_group,
-          occupation: profile.occupation,
-          gender: profile.gender,
-          state: profile.state,
-          interests: profile.interests || [],
-          previous_applications: profile.previous_applications || []
-        };
-
         // Spawn Python process to run the ML inference
         const pythonProcess = spawn(this.pythonPath, [
           path.join(__dirname, '../../inference.py'),
           '--model', this.modelPath,
-          '--profile', JSON.stringify(profileData),
-          '--top_k', topK.toString()
+          ...extraArgs
         ], {
           cwd: path.join(__dirname, '../..'),
           stdio: ['pipe', 'pipe', 'pipe']
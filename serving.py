@@ -0,0 +1,707 @@
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import artifacts
+import inference
+from batching import MicroBatcher, QueueFull
+from ranking_cache import CursorExpired, RankingCache
+from result_cache import artifact_hash
+from worker_pool import WorkerPool
+
+
+# Canned requests run through a newly loaded model before it replaces the serving one:
+# they page in its mapped arrays and fill its query-fragment cache and catalogue frame
+WARMUP_PROFILES = [
+    {"age": 21, "gender": "female", "caste_group": "SC", "occupation": "student", "state": "Kerala", "interests": ["scholarship", "education"]},
+    {"age": 45, "income": 120000, "occupation": "farmer", "state": "Maharashtra", "interests": ["crop insurance", "loan"]},
+    {"age": 67, "gender": "male", "occupation": "retired", "interests": ["pension", "health"]},
+    {"age": 30, "gender": "female", "caste_group": "OBC", "occupation": "entrepreneur", "interests": ["business loan"]},
+    {},
+]
+
+
+class ServiceNotReady(RuntimeError):
+    pass
+
+
+class _Generation:
+    """One loaded model version and the worker pool serving it, if any."""
+
+    def __init__(self, model, pool: Optional[WorkerPool]):
+        self.model = model
+        self.pool = pool
+        self.version = model.model_version
+        # Requests running against this generation; a replaced generation's pool is
+        # closed once they have all finished
+        self.in_flight = 0
+        self.retired = False
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+
+class RecommendationService:
+    """Loads the model once and answers many recommendation requests against it.
+
+    reload() (or watch(), which calls it when the artifact at model_path changes) loads
+    and warms a new model next to the serving one and then swaps it in. Each request
+    runs start to finish on the generation that was current when it began, so nothing
+    in flight is blocked or cut off. The replaced model is kept for rollback(). With
+    worker processes, requests pause only while the new pool is forked.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        ready_timeout: float = 120.0,
+        cache=None,
+        batching: Optional[Dict[str, Any]] = None,
+        processes: int = 0,
+        cache_spec: Optional[Dict[str, Any]] = None,
+        warmup_profiles: Optional[List[Dict[str, Any]]] = None,
+        ranking_cache: Optional[RankingCache] = None,
+    ):
+        self.model_path = model_path
+        self.ready_timeout = ready_timeout
+        self.cache = cache
+        # processes > 0 scores in that many pre-forked workers sharing the loaded model;
+        # each builds its own result cache from cache_spec (inference.make_cache kwargs)
+        self.processes = processes
+        self.cache_spec = cache_spec
+        self.warmup_profiles = WARMUP_PROFILES if warmup_profiles is None else warmup_profiles
+        # Rankings behind pagination cursors; shared by reloaded models (its entries are
+        # tagged with the model version) and kept here, not in the worker processes
+        self.ranking_cache = ranking_cache
+        self._current: Optional[_Generation] = None
+        self._previous: Optional[_Generation] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[artifacts.ArtifactWatcher] = None
+        self._stop_watching = threading.Event()
+        self.reload_stats: Dict[str, Any] = {
+            "watch_interval": None, "reloads": 0, "rollbacks": 0, "previous_version": None,
+            "last_reload": None, "last_error": None,
+        }
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.started_at = time.time()
+        self.draining = False
+        self.requests_served = 0
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # Set while a worker pool is forked: new requests wait on _quiet until it is done
+        self._forking = False
+        self._quiet = threading.Condition(self._lock)
+        # With batching (MicroBatcher keyword arguments), concurrent requests are coalesced
+        # and scored together instead of one recommend() call each
+        self.batcher: Optional[MicroBatcher] = None
+        # Paginate and page requests, which bypass the batcher, then run on these threads
+        # so that handle_async() never ranks on its caller's thread
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if batching is not None:
+            self.batcher = MicroBatcher(self._score_batch, **batching).start()
+            self._executor = ThreadPoolExecutor(max_workers=max(processes, 4), thread_name_prefix="paginate")
+
+    @property
+    def model(self):
+        return self._current.model if self._current is not None else None
+
+    @property
+    def pool(self) -> Optional[WorkerPool]:
+        return self._current.pool if self._current is not None else None
+
+    def load(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            with self._reload_lock:
+                self._current = self._prepare(warm=False)
+        except Exception as e:
+            self.load_error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.load_seconds = time.perf_counter() - t0
+            self._ready.set()
+
+    def load_in_background(self) -> threading.Thread:
+        def _run():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Failed to load model from {self.model_path}: {e}", file=sys.stderr, flush=True)
+
+        thread = threading.Thread(target=_run, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def _prepare(self, warm: bool = True) -> _Generation:
+        # Load model_path and get it ready to serve: warmed up first, so that forked
+        # workers inherit the warm state too
+        t0 = time.perf_counter()
+        model = inference.load_model(self.model_path, cache=self.cache, ranking_cache=self.ranking_cache)
+        t1 = time.perf_counter()
+        if warm:
+            for profile in self.warmup_profiles:
+                inference.recommend(model, profile)
+                inference.recommend(model, profile, lean=True, hard_filter=True)
+        t2 = time.perf_counter()
+        generation = _Generation(model, self._fork_pool(model))
+        generation.load_seconds, generation.warmup_seconds = t1 - t0, t2 - t1
+        return generation
+
+    def _fork_pool(self, model) -> Optional[WorkerPool]:
+        # A fork copies every lock another thread holds at that moment, held, into each
+        # worker: new requests wait and the running ones finish before the workers are
+        # forked, so no request thread is inside the model, numpy or a cache meanwhile
+        if not self.processes:
+            return None
+        with self._lock:
+            self._forking = True
+            self._quiet.wait_for(lambda: self._in_flight == 0)
+        try:
+            return WorkerPool(model, self.processes, self.cache_spec)
+        finally:
+            with self._lock:
+                self._forking = False
+                self._quiet.notify_all()
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Load the artifact at model_path, warm it up and swap it in; returns reload_stats.
+
+        Unless ``force``, nothing is loaded when the artifact's content hash is the serving
+        model's version. If loading or warming up fails the serving model stays, and the
+        error is in reload_stats["last_error"].
+        """
+        with self._reload_lock:
+            seen = artifacts.signature(self.model_path)
+            try:
+                current = self._current
+                if not force and current is not None and artifact_hash(self.model_path) == current.version:
+                    return self.reload_stats
+                reset = _reset_high_water()
+                rss_before = _rss_mb()
+                t0 = time.perf_counter()
+                generation = self._prepare()
+                seconds = time.perf_counter() - t0
+            except Exception as e:
+                self.reload_stats["last_error"] = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                if self._watcher is not None:
+                    self._watcher.seen(seen)
+            self._swap(generation)
+            self.reload_stats["reloads"] += 1
+            self.reload_stats["last_error"] = None
+            self.reload_stats["last_reload"] = {
+                "at": time.time(),
+                "seconds": round(seconds, 3),
+                "load_ms": round(generation.load_seconds * 1000, 1),
+                "warmup_ms": round(generation.warmup_seconds * 1000, 1),
+                "warmup_profiles": len(self.warmup_profiles),
+                "rss_before_mb": rss_before,
+                "rss_after_mb": _rss_mb(),
+                # Peak during this reload where the kernel lets us reset it, else since start
+                "rss_high_water_mb": _high_water_mb(),
+                "rss_high_water_since": "reload" if reset else "start",
+            }
+            return self.reload_stats
+
+    def rollback(self) -> Dict[str, Any]:
+        """Swap the previous model back in; the one it replaces becomes the previous one."""
+        with self._reload_lock:
+            previous = self._previous
+            if previous is None:
+                raise ValueError("No previous model to roll back to")
+            # The previous generation's workers were shut down when it was replaced
+            self._swap(_Generation(previous.model, self._fork_pool(previous.model)))
+            self.reload_stats["rollbacks"] += 1
+            return self.reload_stats
+
+    def _swap(self, generation: _Generation) -> None:
+        idle = False
+        with self._lock:
+            old, self._current = self._current, generation
+            self._previous = old
+            if old is not None:
+                old.retired = True
+                idle = old.in_flight == 0
+        self.reload_stats["previous_version"] = old.version if old is not None else None
+        if old is not None and idle:
+            self._shut_down(old)
+
+    def _shut_down(self, generation: _Generation) -> None:
+        # Its model stays (as _previous) for rollback; its worker processes do not
+        with self._lock:
+            pool, generation.pool = generation.pool, None
+        if pool is not None:
+            pool.close()
+
+    def watch(self, interval: float) -> threading.Thread:
+        """Poll model_path every ``interval`` seconds and reload() when it changes."""
+        self._watcher = artifacts.ArtifactWatcher(self.model_path)
+        self.reload_stats["watch_interval"] = interval
+
+        def _run():
+            while not self._stop_watching.wait(interval):
+                if not self._watcher.poll():
+                    continue
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Reloading {self.model_path} failed, still serving the previous model: {e}", file=sys.stderr, flush=True)
+
+        thread = threading.Thread(target=_run, name="model-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def _acquire(self, n: int = 1) -> _Generation:
+        self._wait_ready()
+        with self._lock:
+            self._quiet.wait_for(lambda: not self._forking)
+            generation = self._current
+            generation.in_flight += n
+            self._in_flight += n
+        return generation
+
+    def _release(self, generation: _Generation, n: int = 1, served: bool = True) -> None:
+        with self._lock:
+            generation.in_flight -= n
+            self._in_flight -= n
+            if served:
+                self.requests_served += n
+            if self._in_flight == 0:
+                self._quiet.notify_all()
+            drained = generation.retired and generation.in_flight == 0
+        if drained:
+            self._shut_down(generation)
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self.model is not None and not self.draining
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "status": "draining" if self.draining else "ok",
+            "ready": self.is_ready(),
+            "model_path": self.model_path,
+            "model_version": self.model.model_version if self.model is not None else None,
+            "load_seconds": self.load_seconds,
+            "load_error": self.load_error,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "in_flight": in_flight,
+            "requests_served": self.requests_served,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "batching": self.batcher.stats() if self.batcher is not None else None,
+            "workers": self.pool.memory() if self.pool is not None else None,
+            "pages": self.ranking_cache.stats() if self.ranking_cache is not None else None,
+            "reload": self.reload_stats,
+        }
+
+    def _wait_ready(self) -> None:
+        # Requests that arrive while the model is still loading wait for it instead of failing
+        if not self._ready.wait(self.ready_timeout):
+            raise ServiceNotReady("model is still loading")
+        if self.model is None:
+            raise ServiceNotReady(self.load_error or "model failed to load")
+
+    def recommend(self, profile: Dict[str, Any], top_k: int = 10, timings: bool = False, quick: bool = False, hard_filter: bool = False, lean: bool = False, paginate: bool = False):
+        if paginate:
+            return self._paginate(profile, top_k, timings, hard_filter, lean)
+        if quick:
+            answer = self._quick(profile, top_k, timings, hard_filter, lean)
+            if answer is not None:
+                return answer
+        if self.batcher is not None:
+            return self.batcher.submit_threadsafe(profile, top_k, timings, hard_filter, lean).result()
+        generation = self._acquire()
+        try:
+            if generation.pool is not None:
+                return generation.pool.recommend(profile, top_k=top_k, timings=timings, hard_filter=hard_filter, lean=lean)
+            return inference.recommend(generation.model, profile, top_k=top_k, timings=timings, hard_filter=hard_filter, lean=lean)
+        finally:
+            self._release(generation)
+
+    def _quick(self, profile: Dict[str, Any], top_k: int, timings: bool, hard_filter: bool = False, lean: bool = False):
+        # Quick-table lookups are cheap enough to answer on the calling thread, without
+        # queueing for the batcher or a worker process
+        generation = self._acquire()
+        records = None
+        try:
+            records = inference.quick_lookup(generation.model, profile, top_k, hard_filter, lean)
+        finally:
+            # A miss is not served here but ranked by the caller
+            self._release(generation, served=records is not None)
+        if records is None:
+            return None
+        return {"results": records, "timings": None} if timings else records
+
+    def _paginate(self, profile: Dict[str, Any], top_k: int, timings: bool, hard_filter: bool = False, lean: bool = False) -> Dict[str, Any]:
+        # The ranking goes straight to the model (or a worker) rather than the batcher, and
+        # is kept in this process so any later page request can slice it
+        if self.ranking_cache is None:
+            raise ValueError("Pagination is not enabled for this service")
+        generation = self._acquire()
+        try:
+            if generation.pool is None:
+                return inference.recommend(generation.model, profile, top_k=top_k, timings=timings, hard_filter=hard_filter, lean=lean, paginate=True)
+            ranking, spans = generation.pool.rank_for_pages(profile, self.ranking_cache.depth, timings, hard_filter)
+            return inference.paginate(generation.model, ranking, top_k, lean, spans if timings else None)
+        finally:
+            self._release(generation)
+
+    def page(self, cursor: str, top_k: int = 10, lean: bool = False) -> Dict[str, Any]:
+        # A slice of a kept ranking: answered on the calling thread, like store lookups
+        if self.ranking_cache is None:
+            raise ValueError("Pagination is not enabled for this service")
+        generation = self._acquire()
+        try:
+            return inference.recommend_page(generation.model, cursor, top_k, lean)
+        finally:
+            self._release(generation)
+
+    def similar(self, slug: str, top_k: int = 10, lean: bool = False) -> List[Dict[str, Any]]:
+        # Related-table reads are answered on the calling thread too; a model without a
+        # (deep enough) table scores the one scheme here, a single sparse product
+        generation = self._acquire()
+        try:
+            return inference.similar(generation.model, slug, top_k, lean)
+        finally:
+            self._release(generation)
+
+    def schemes(self, slugs: List[str], fields: Optional[List[str]] = None) -> List[Optional[Dict[str, Any]]]:
+        # Store lookups, like quick-table ones, are answered on the calling thread
+        generation = self._acquire()
+        try:
+            return inference.get_schemes(generation.model, slugs, fields)
+        finally:
+            self._release(generation)
+
+    def _score_batch(self, profiles: List[Dict[str, Any]], top_k: int, timings: bool, hard_filter: bool = False, lean: bool = False) -> List[Any]:
+        # Runs on the batcher's scoring thread, one call per coalesced batch
+        generation = self._acquire(len(profiles))
+        try:
+            if generation.pool is not None:
+                return generation.pool.recommend_batch(profiles, top_k=top_k, timings=timings, hard_filter=hard_filter, lean=lean)
+            return inference.recommend_batch(generation.model, profiles, top_k=top_k, batch_size=len(profiles), timings=timings, hard_filter=hard_filter, lean=lean)
+        finally:
+            self._release(generation, len(profiles))
+
+    def close(self) -> None:
+        self._stop_watching.set()
+        if self.batcher is not None:
+            self.batcher.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for generation in (self._current, self._previous):
+            if generation is not None:
+                self._shut_down(generation)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one protocol message.
+
+        Recommend: {"id", "op": "recommend", "profile", "top_k", "timings", "quick",
+        "hard_filter", "lean", "paginate"}; with "paginate" the result is {"results",
+        "next_cursor"} and {"id", "op": "page", "cursor", "top_k", "lean"} gets the next
+        page. Scheme fields: {"id", "op": "schemes", "slugs", "fields"}. Similar schemes:
+        {"id", "op": "similar", "slug", "top_k", "lean"}.
+        Model versions: {"id", "op": "reload", "force"} and {"id", "op": "rollback"}.
+        """
+        return self.handle_async(request).result()
+
+    def handle_async(self, request: Dict[str, Any]) -> Future:
+        """Like handle(), but returns a Future of the response.
+
+        With batching, a recommend request is queued without blocking the caller, and
+        paginate and page requests run on the service's own threads. Reload
+        and rollback always run on a background thread, so loading and warming up a model
+        holds up no other request; everything else is answered before this returns.
+        """
+        req_id = request.get("id")
+        op = request.get("op", "recommend")
+        response: Future = Future()
+        try:
+            if op == "health":
+                result = self.health()
+            elif op == "ready":
+                result = {"ready": self.is_ready()}
+            elif op == "reload":
+                return _in_background(req_id, "model-reload", self.reload, bool(request.get("force")))
+            elif op == "rollback":
+                return _in_background(req_id, "model-reload", self.rollback)
+            elif op == "page":
+                cursor = request.get("cursor")
+                if not isinstance(cursor, str):
+                    raise ValueError("'cursor' must be a string")
+                top_k, lean = int(request.get("top_k", 10)), bool(request.get("lean"))
+                if self._executor is not None:
+                    return _resolve(req_id, self._executor.submit(self.page, cursor, top_k, lean))
+                result = self.page(cursor, top_k, lean)
+            elif op == "schemes":
+                slugs = request.get("slugs")
+                if not isinstance(slugs, list):
+                    raise ValueError("'slugs' must be a JSON array")
+                result = self.schemes([str(s) for s in slugs], request.get("fields"))
+            elif op == "similar":
+                slug = request.get("slug")
+                if not isinstance(slug, str):
+                    raise ValueError("'slug' must be a string")
+                result = self.similar(slug, int(request.get("top_k", 10)), bool(request.get("lean")))
+            elif op == "recommend":
+                profile = request.get("profile")
+                if not isinstance(profile, dict):
+                    raise ValueError("'profile' must be a JSON object")
+                top_k, timings = int(request.get("top_k", 10)), bool(request.get("timings"))
+                quick, hard_filter = bool(request.get("quick")), bool(request.get("hard_filter"))
+                lean, paginate = bool(request.get("lean")), bool(request.get("paginate"))
+                if paginate:
+                    if self._executor is not None:
+                        return _resolve(req_id, self._executor.submit(self._paginate, profile, top_k, timings, hard_filter, lean))
+                    result = self._paginate(profile, top_k, timings, hard_filter, lean)
+                    response.set_result({"id": req_id, "ok": True, "result": result})
+                    return response
+                result = self._quick(profile, top_k, timings, hard_filter, lean) if quick else None
+                if result is not None:
+                    response.set_result({"id": req_id, "ok": True, "result": result})
+                    return response
+                if self.batcher is not None:
+                    return _resolve(req_id, self.batcher.submit_threadsafe(profile, top_k, timings, hard_filter, lean))
+                result = self.recommend(profile, top_k=top_k, timings=timings, hard_filter=hard_filter, lean=lean)
+            else:
+                raise ValueError(f"Unknown op: {op}")
+            response.set_result({"id": req_id, "ok": True, "result": result})
+        except Exception as e:
+            response.set_result({"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"})
+        return response
+
+
+def _rss_mb() -> Optional[float]:
+    # Current resident set size from /proc (Linux)
+    return _proc_status_mb("VmRSS")
+
+
+def _high_water_mb() -> Optional[float]:
+    # Peak resident set size: VmHWM on Linux, else the process-lifetime ru_maxrss
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def _reset_high_water() -> bool:
+    # Linux >= 4.0 resets VmHWM to the current RSS when "5" is written to clear_refs
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _response(req_id: Any, result: Future) -> Dict[str, Any]:
+    error = result.exception()
+    if error is not None:
+        return {"id": req_id, "ok": False, "error": f"{type(error).__name__}: {error}"}
+    return {"id": req_id, "ok": True, "result": result.result()}
+
+
+def _resolve(req_id: Any, pending: Future) -> Future:
+    # A Future of the response to a request whose result `pending` will hold
+    response: Future = Future()
+    pending.add_done_callback(lambda f: response.set_result(_response(req_id, f)))
+    return response
+
+
+def _in_background(req_id: Any, name: str, fn, *args) -> Future:
+    # Runs fn on its own daemon thread and resolves the returned Future with its response
+    response: Future = Future()
+
+    def _run():
+        try:
+            response.set_result({"id": req_id, "ok": True, "result": fn(*args)})
+        except Exception as e:
+            response.set_result({"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    threading.Thread(target=_run, name=name, daemon=True).start()
+    return response
+
+
+class _Shutdown(Exception):
+    pass
+
+
+def _install_shutdown_handler(callback) -> None:
+    def _handler(signum, frame):
+        callback(signum)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, _handler)
+
+
+def serve_stdio(service: RecommendationService, workers: int = 4, stdin=None, stdout=None) -> None:
+    """Newline-delimited JSON: one request per input line, one response per output line.
+
+    Responses are written as soon as each request finishes, so they may come back out
+    of order; callers match them up by ``id``. EOF or SIGTERM stops reading and drains
+    in-flight requests before returning.
+    """
+    # By default read and write through private copies of fds 0 and 1: a worker pool
+    # forked on reload would otherwise inherit sys.stdin's lock held by the blocked read
+    # below (or sys.stdout's by a writing thread) and hang when it closes or flushes them
+    stdin = stdin or open(os.dup(sys.stdin.fileno()), encoding=sys.stdin.encoding)
+    stdout = stdout or open(os.dup(sys.stdout.fileno()), "w", encoding=sys.stdout.encoding)
+    write_lock = threading.Lock()
+
+    def _write(message: Dict[str, Any]) -> None:
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with write_lock:
+            stdout.write(line + "\n")
+            stdout.flush()
+
+    def _process(request: Dict[str, Any]) -> None:
+        _write(service.handle(request))
+
+    # With batching the reader thread queues requests itself so that concurrent ones
+    # reach the batcher together; `pending` lets shutdown wait for their responses
+    pending = set()
+
+    def _submit(request: Dict[str, Any]) -> None:
+        response = service.handle_async(request)
+        with write_lock:
+            pending.add(response)
+
+        def _done(f: Future) -> None:
+            _write(f.result())
+            with write_lock:
+                pending.discard(f)
+
+        response.add_done_callback(_done)
+
+    def _on_signal(signum):
+        if service.draining:
+            return
+        service.draining = True
+        raise _Shutdown()
+
+    _install_shutdown_handler(_on_signal)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recommend")
+    try:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                _write({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+                continue
+            if service.batcher is not None:
+                _submit(request)
+            else:
+                executor.submit(_process, request)
+    except _Shutdown:
+        pass
+    finally:
+        service.draining = True
+        executor.shutdown(wait=True)
+        with write_lock:
+            outstanding = list(pending)
+        for response in outstanding:
+            response.result()
+        service.close()
+
+
+class _RecommendationHandler(BaseHTTPRequestHandler):
+    service: RecommendationService = None  # set by serve_http
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send_json(200, self.service.health())
+        elif self.path == "/readyz":
+            ready = self.service.is_ready()
+            self._send_json(200 if ready else 503, {"ready": ready})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        op = {"/recommend": "recommend", "/schemes": "schemes", "/page": "page", "/similar": "similar", "/reload": "reload", "/rollback": "rollback"}.get(self.path)
+        if op is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        if self.service.draining:
+            self._send_json(503, {"error": "server is shutting down"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+        response = self.service.handle({**request, "op": op})
+        if response["ok"]:
+            self._send_json(200, response["result"])
+        else:
+            busy = (ServiceNotReady.__name__, QueueFull.__name__)
+            status = 503 if response["error"].startswith(busy) else 400
+            if response["error"].startswith(CursorExpired.__name__):
+                status = 410
+            elif op == "similar" and response["error"].startswith(KeyError.__name__):
+                status = 404
+            self._send_json(status, {"error": response["error"]})
+
+    def log_message(self, format, *args):
+        sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+
+
+def serve_http(service: RecommendationService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Serve POST /recommend, /page, /similar, /schemes, /reload and /rollback plus GET /healthz and /readyz until SIGTERM/SIGINT."""
+    handler = type("RecommendationHandler", (_RecommendationHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    # Join request threads on close so in-flight requests finish during shutdown
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def _on_signal(signum):
+        service.draining = True
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    _install_shutdown_handler(_on_signal)
+    print(f"Serving recommendations on http://{host}:{server.server_port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,140 @@
+import cProfile
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Optional
+
+
+# RECOMMENDER_TIMINGS=stderr (or a file path) installs a sink that logs every timed call;
+# RECOMMENDER_PROFILE=<directory> dumps a cProfile .prof file per recommend/load call
+TIMINGS_ENV = "RECOMMENDER_TIMINGS"
+PROFILE_ENV = "RECOMMENDER_PROFILE"
+
+Sink = Callable[[str, Dict[str, float]], None]
+
+
+class Timer:
+	"""Wall time per named stage, in milliseconds; repeated spans of a stage add up."""
+
+	def __init__(self):
+		self.spans: Dict[str, float] = {}
+		self._start = time.perf_counter()
+
+	@contextmanager
+	def span(self, name: str):
+		t0 = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.spans[name] = self.spans.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+	def result(self) -> Dict[str, float]:
+		out = {name: round(ms, 3) for name, ms in self.spans.items()}
+		out["total"] = round((time.perf_counter() - self._start) * 1000, 3)
+		return out
+
+
+class _NullTimer:
+	"""Stand-in used when nobody asked for timings: spans cost one no-op context manager."""
+
+	_context = nullcontext()
+
+	def span(self, name: str):
+		return self._context
+
+	def result(self) -> Dict[str, float]:
+		return {}
+
+
+NULL_TIMER = _NullTimer()
+
+_sink: Optional[Sink] = None
+
+
+def set_sink(sink: Optional[Sink]) -> None:
+	"""Install a callable receiving (event, spans) for every timed call; None removes it."""
+	global _sink
+	_sink = sink
+
+
+def get_sink() -> Optional[Sink]:
+	return _sink
+
+
+def start(requested: bool = False):
+	"""A Timer if the caller asked for timings or a sink is installed, else NULL_TIMER."""
+	return Timer() if requested or _sink is not None else NULL_TIMER
+
+
+def emit(event: str, spans: Dict[str, float]) -> None:
+	if _sink is not None and spans:
+		_sink(event, spans)
+
+
+def stream_sink(stream) -> Sink:
+	"""Sink writing one JSON line per event to a text stream."""
+	lock = threading.Lock()
+
+	def _write(event: str, spans: Dict[str, float]) -> None:
+		line = json.dumps({"event": event, "ts": time.time(), "timings_ms": spans})
+		with lock:
+			stream.write(line + "\n")
+			stream.flush()
+
+	return _write
+
+
+def file_sink(path: str) -> Sink:
+	"""Sink appending JSON lines to a file."""
+	return stream_sink(open(path, "a", encoding="utf-8", buffering=1))
+
+
+_profile_lock = threading.Lock()
+_profile_counter = itertools.count()
+
+
+@contextmanager
+def profile_to(path: str):
+	"""Run the block under cProfile and dump the stats to ``path``.
+
+	Only one profiler can be active per process, so a block entered while another is
+	being profiled runs unprofiled.
+	"""
+	if not _profile_lock.acquire(blocking=False):
+		yield
+		return
+	profiler = cProfile.Profile()
+	try:
+		profiler.enable()
+		try:
+			yield
+		finally:
+			profiler.disable()
+			profiler.dump_stats(path)
+	finally:
+		_profile_lock.release()
+
+
+def maybe_profile(event: str):
+	"""profile_to() a fresh file in $RECOMMENDER_PROFILE if it is set, else a no-op."""
+	directory = os.environ.get(PROFILE_ENV)
+	if not directory:
+		return NULL_TIMER._context
+	os.makedirs(directory, exist_ok=True)
+	return profile_to(os.path.join(directory, f"{event}-{os.getpid()}-{next(_profile_counter)}.prof"))
+
+
+def _sink_from_env() -> Optional[Sink]:
+	target = os.environ.get(TIMINGS_ENV)
+	if not target:
+		return None
+	if target == "stderr":
+		return stream_sink(sys.stderr)
+	return file_sink(target)
+
+
+set_sink(_sink_from_env())
@@ -8,8 +8,10 @@ def main():
 	model_out = os.path.join("artifacts", "scheme_recommender.joblib")
 	# If your CSV has an applications/popularity column, set popularity_col here
 	popularity_col = None
-	train_and_save(data_path, model_out, popularity_col)
-	print(f"Model saved to {model_out}")
+	# Published as a new version (the last 3 are kept) and swapped in with one rename, so a
+	# running server picks it up with --reload_interval instead of reading a partial file
+	train_and_save(data_path, model_out, popularity_col, keep_versions=3)
+	print(f"Model published to {model_out}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class ArrayVocabulary(Mapping):
+	"""Read-only term -> column mapping backed by two numpy arrays instead of a dict.
+
+	Terms are kept UTF-8 encoded in one sorted fixed-width bytes array and looked up by
+	binary search. Unlike a dict of str objects, nothing here has a reference count, so
+	the pages stay shared between forked workers and can be memory-mapped from disk.
+	It is a drop-in for ``TfidfVectorizer.vocabulary_``: transform() only needs
+	``vocabulary[term]`` raising KeyError for unknown terms.
+	"""
+
+	def __init__(self, terms: np.ndarray, columns: np.ndarray):
+		self.terms = terms
+		self.columns = columns
+
+	@classmethod
+	def from_dict(cls, vocabulary: Mapping) -> "ArrayVocabulary":
+		if isinstance(vocabulary, ArrayVocabulary):
+			return vocabulary
+		encoded = sorted((term.encode("utf-8"), column) for term, column in vocabulary.items())
+		terms = np.array([term for term, _ in encoded], dtype=bytes)
+		columns = np.array([column for _, column in encoded], dtype=np.int32)
+		return cls(terms, columns)
+
+	def __getitem__(self, term: str) -> int:
+		key = term.encode("utf-8")
+		i = int(np.searchsorted(self.terms, key))
+		if i < len(self.terms) and self.terms[i] == key:
+			return int(self.columns[i])
+		raise KeyError(term)
+
+	def __contains__(self, term) -> bool:
+		try:
+			self[term]
+		except (KeyError, AttributeError):
+			return False
+		return True
+
+	def __iter__(self) -> Iterator[str]:
+		return (term.decode("utf-8") for term in self.terms)
+
+	def __len__(self) -> int:
+		return len(self.terms)
+
+	@property
+	def nbytes(self) -> int:
+		return self.terms.nbytes + self.columns.nbytes
+
+
+def idf_document_frequencies(vectorizer, matrix) -> Optional[np.ndarray]:
+	"""Per-term document counts (int32) of matrix's rows, if they reproduce ``vectorizer.idf_``.
+
+	A fitted vectorizer's IDF is a function of these counts and the number of fit
+	documents, so storing the counts (half the size of the float64 weights) loses
+	nothing. The fit corpus is only known to be matrix's rows when no rows were added
+	since; if the weights do not come back bit for bit, None.
+	"""
+	if not getattr(vectorizer, "use_idf", False) or not hasattr(vectorizer, "idf_"):
+		return None
+	counts = np.bincount(np.asarray(matrix.indices), minlength=len(vectorizer.idf_)).astype(np.int32)
+	if len(counts) != len(vectorizer.idf_):
+		return None
+	idf = idf_from_document_frequencies(counts, matrix.shape[0], vectorizer.smooth_idf)
+	return counts if np.array_equal(idf, np.asarray(vectorizer.idf_)) else None
+
+
+def idf_from_document_frequencies(counts: np.ndarray, n_documents: int, smooth_idf: bool = True) -> np.ndarray:
+	# The same float64 operations, in the same order, as TfidfTransformer.fit
+	df = counts.astype(np.float64) + float(smooth_idf)
+	idf = np.full_like(df, fill_value=n_documents + int(smooth_idf), dtype=np.float64)
+	idf /= df
+	np.log(idf, out=idf)
+	idf += 1.0
+	return idf
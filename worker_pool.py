@@ -0,0 +1,134 @@
+import gc
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import inference
+import timing
+from ranking_cache import Ranking
+from recommender import SchemeRecommender
+
+# The model workers score with; set in the parent before forking so every worker
+# inherits the same pages instead of loading (or unpickling) a copy of its own
+_MODEL: Optional[SchemeRecommender] = None
+
+# Pools not yet closed. gc.freeze() is process-wide, so the objects frozen for one pool
+# are only unfrozen once no pool (say a reloaded model's, next to the one it replaces)
+# still has workers relying on them
+_live_pools = 0
+_live_lock = threading.Lock()
+
+
+def _init_worker(cache_spec: Optional[Dict[str, Any]]) -> None:
+    # Caches are per worker (memory) or reopened per worker (sqlite): a sqlite
+    # connection inherited across fork must not be used
+    _MODEL.result_cache = inference.make_cache(**cache_spec) if cache_spec else None
+
+
+def _recommend_batch(profiles: List[Dict[str, Any]], top_k: int, timings: bool, hard_filter: bool = False, lean: bool = False) -> List[Any]:
+    return inference.recommend_batch(_MODEL, profiles, top_k=top_k, batch_size=max(len(profiles), 1), timings=timings, hard_filter=hard_filter, lean=lean)
+
+
+def _rank_for_pages(profile: Dict[str, Any], depth: int, timings: bool, hard_filter: bool) -> Tuple[Ranking, Optional[Dict[str, float]]]:
+    timer = timing.start(timings)
+    ranking = _MODEL.rank_for_pages(inference.to_user_profile(profile), hard_filter=hard_filter, depth=depth, timer=timer)
+    return ranking, timer.result()
+
+
+def _noop() -> None:
+    return None
+
+
+class WorkerPool:
+    """Pre-forked recommender processes sharing one loaded model.
+
+    The parent loads the model once (numeric arrays memory-mapped read-only from the
+    artifact), swaps the vocabulary dict for arrays and moves every object it made into
+    the permanent GC generation, then forks all workers at once. Workers only read the
+    model, so the mapped arrays and most of the parent's heap stay shared copy-on-write
+    instead of being duplicated per process.
+
+    Fork is required (Unix only). Create the pool before starting request threads, or
+    while none of them is running (RecommendationService pauses requests to fork one).
+    """
+
+    def __init__(self, model: SchemeRecommender, workers: int, cache_spec: Optional[Dict[str, Any]] = None):
+        global _MODEL, _live_pools
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("WorkerPool needs the fork start method, which this platform lacks")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        model.compact_vocabulary()
+        # A model loaded from a format 2 artifact builds its catalogue frame and eligibility
+        # texts on first use; build them here so the workers share one copy instead of
+        # each making its own
+        model.scheme_df
+        model.eligibility_engine.texts
+        model.result_cache = None
+        _MODEL = model
+        # A collection in a worker would write to the GC headers of every tracked object
+        # (and so copy the pages holding them); frozen objects are never scanned
+        with _live_lock:
+            _live_pools += 1
+        self._closed = False
+        gc.collect()
+        gc.freeze()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(cache_spec,),
+        )
+        # With fork every worker is started on the first submit; do it now, before the
+        # caller starts threads whose locks a fork could copy in a held state
+        self._executor.submit(_noop).result()
+        self.pids = sorted(self._executor._processes)
+
+    def submit_batch(self, profiles: List[Dict[str, Any]], top_k: int = 10, timings: bool = False, hard_filter: bool = False, lean: bool = False) -> Future:
+        return self._executor.submit(_recommend_batch, profiles, top_k, timings, hard_filter, lean)
+
+    def recommend(self, profile: Dict[str, Any], top_k: int = 10, timings: bool = False, hard_filter: bool = False, lean: bool = False) -> Any:
+        return self.submit_batch([profile], top_k, timings, hard_filter, lean).result()[0]
+
+    def recommend_batch(self, profiles: List[Dict[str, Any]], top_k: int = 10, timings: bool = False, hard_filter: bool = False, lean: bool = False) -> List[Any]:
+        return self.submit_batch(profiles, top_k, timings, hard_filter, lean).result()
+
+    def rank_for_pages(self, profile: Dict[str, Any], depth: int, timings: bool = False, hard_filter: bool = False) -> Tuple[Ranking, Optional[Dict[str, float]]]:
+        """A worker's SchemeRecommender.rank_for_pages() and its stage timings (None unless timed).
+
+        Only the ranking's arrays come back; the parent keeps them behind the cursors.
+        """
+        return self._executor.submit(_rank_for_pages, profile, depth, timings, hard_filter).result()
+
+    def memory(self) -> Dict[str, Any]:
+        """Per-worker memory in MB from /proc (Linux): RSS, PSS and private (unshared) pages."""
+        return {"workers": [{"pid": pid, **_memory_mb(pid)} for pid in self.pids]}
+
+    def close(self) -> None:
+        global _live_pools
+        self._executor.shutdown(wait=True)
+        with _live_lock:
+            if self._closed:
+                return
+            self._closed = True
+            _live_pools -= 1
+            if _live_pools == 0:
+                gc.unfreeze()
+
+
+def _memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Private_Clean": "private_mb", "Private_Dirty": "private_mb"}
+    out: Dict[str, Optional[float]] = {"rss_mb": None, "pss_mb": None, "private_mb": None}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return out
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in fields:
+            key = fields[name]
+            out[key] = round((out[key] or 0.0) + int(value.split()[0]) / 1024, 1)
+    return out